@@ -0,0 +1,127 @@
+# Admission control for upload endpoints
+#
+# Heavy endpoints (everything that accepts files) go through
+# AdmissionMiddleware before FastAPI parses the body:
+#   - at most ANALYZER_MAX_CONCURRENT_UPLOADS of them run at once; more get
+#     429 with Retry-After instead of piling request bodies into memory;
+#   - the body size limit is checked against Content-Length and enforced
+#     again while the body streams in, so chunked uploads can't bypass it;
+#   - each request is logged with its body size, the API process's RSS and
+#     how far it pushed the worker's peak RSS.
+# check_upload() then verifies the file's magic bytes before any parsing.
+#
+# Configuration (environment variables):
+#   ANALYZER_MAX_UPLOAD_BYTES         body limit for single-file endpoints (default: 10 MB)
+#   ANALYZER_MAX_BATCH_UPLOAD_BYTES   body limit for multi-file endpoints (default: 200 MB)
+#   ANALYZER_MAX_CONCURRENT_UPLOADS   heavy requests handled at once (default: 16)
+import logging
+import time
+
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse
+
+from extraction import upload_error
+from metrics import peak_rss_bytes, rss_bytes, start_request_memory
+from workers import RETRY_AFTER_SECONDS, _env_int
+
+
+MAX_UPLOAD_BYTES = _env_int("ANALYZER_MAX_UPLOAD_BYTES", 10 * 1024 * 1024)
+MAX_BATCH_UPLOAD_BYTES = _env_int("ANALYZER_MAX_BATCH_UPLOAD_BYTES", 200 * 1024 * 1024)
+MAX_CONCURRENT_UPLOADS = _env_int("ANALYZER_MAX_CONCURRENT_UPLOADS", 16)
+
+SINGLE_FILE_PATHS = {"/analyze", "/analyze/jobs", "/generate_resume", "/analysis/export", "/analysis/job",
+                     "/analysis/pool/coverage"}
+BATCH_PATHS = {"/analysis/compare", "/analysis/bulk", "/analysis/match", "/analysis/index"}
+
+logger = logging.getLogger(__name__)
+
+
+def check_upload(filename, data):
+    """Reject an upload whose name or content is not a PDF/DOCX (400)"""
+    error = upload_error(filename, data)
+    if error:
+        raise HTTPException(status_code=400, detail=error)
+
+
+def _mb(value, sign=""):
+    return "n/a" if value is None else f"{sign}{value / 1024 / 1024:.1f} MB"
+
+
+def _too_large_detail(limit):
+    return f"Upload too large (limit {_mb(limit)})"
+
+
+class AdmissionMiddleware:
+    """ASGI middleware limiting concurrency and body size of the upload endpoints"""
+
+    def __init__(self, app, max_upload_bytes=MAX_UPLOAD_BYTES,
+                 max_batch_upload_bytes=MAX_BATCH_UPLOAD_BYTES,
+                 max_concurrent=MAX_CONCURRENT_UPLOADS):
+        self.app = app
+        self.max_upload_bytes = max_upload_bytes
+        self.max_batch_upload_bytes = max_batch_upload_bytes
+        self.max_concurrent = max_concurrent
+        self.active = 0
+
+    def body_limit(self, path):
+        return self.max_batch_upload_bytes if path in BATCH_PATHS else self.max_upload_bytes
+
+    async def __call__(self, scope, receive, send):
+        path = scope.get("path")
+        if (scope["type"] != "http" or scope["method"] != "POST"
+                or (path not in SINGLE_FILE_PATHS and path not in BATCH_PATHS)):
+            await self.app(scope, receive, send)
+            return
+
+        if self.max_concurrent and self.active >= self.max_concurrent:
+            response = JSONResponse(
+                {"detail": "Too many uploads in progress, please retry shortly"},
+                status_code=429,
+                headers={"Retry-After": str(RETRY_AFTER_SECONDS)},
+            )
+            await response(scope, receive, send)
+            return
+
+        limit = self.body_limit(path)
+        declared = dict(scope["headers"]).get(b"content-length")
+        if limit and declared is not None and declared.isdigit() and int(declared) > limit:
+            response = JSONResponse({"detail": _too_large_detail(limit)}, status_code=413)
+            await response(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if limit and received > limit:
+                    # Raised into the endpoint's body parsing; FastAPI turns it into a 413
+                    raise HTTPException(status_code=413, detail=_too_large_detail(limit))
+            return message
+
+        status = None
+
+        async def tracked_send(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        self.active += 1
+        memory = start_request_memory()
+        peak_before = peak_rss_bytes()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, limited_receive, tracked_send)
+        finally:
+            self.active -= 1
+            peak_after = peak_rss_bytes()
+            peak_growth = (peak_after - peak_before
+                           if peak_after is not None and peak_before is not None else None)
+            logger.info(
+                "%s %s -> %s in %.0f ms: body %.0f KB, api rss %s (peak %s), worker peak %s",
+                scope["method"], path, status, (time.perf_counter() - start) * 1000,
+                received / 1024, _mb(rss_bytes()), _mb(peak_growth, "+"), _mb(memory["worker_peak_bytes"], "+"),
+            )
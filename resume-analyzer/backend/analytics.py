@@ -0,0 +1,305 @@
+# Vectorized analytics over the indexed resume pool
+#
+# The advanced_skill_extractor skills stored with every indexed resume form
+# a resumes x skills matrix weighted by confidence (float32, one column per
+# taxonomy skill). It is built from the search index in one query and kept
+# until the index changes; similarity, nearest neighbours, coverage of a
+# job's skills and k-means clustering are then matrix operations over the
+# whole pool, so a pool of thousands of resumes is answered in well under a
+# second.
+#
+# Similarities are cosine similarities of the confidence rows: two resumes
+# are alike when they name the same skills with similar emphasis. Clusters
+# are spherical k-means (k-means++ seeding, fixed seed) on the same rows.
+import threading
+
+import numpy as np
+from fastapi import HTTPException
+
+from analyzer import SKILLS_DATABASE
+
+# Pool rows compared against the whole pool at once by most_similar_pairs
+# (1024 x 5000 similarities take 20 MB)
+BLOCK_ROWS = 1024
+
+# A skill counts as covered from one whole-word mention (exact matches score 0.8)
+MIN_CONFIDENCE = 0.8
+# Target skills held by a smaller share of the pool are reported as gaps
+GAP_SHARE = 0.1
+
+KMEANS_MAX_ITER = 100
+KMEANS_SEED = 0
+
+_CATEGORIES = {skill: category for category, skills in SKILLS_DATABASE.items() for skill in skills}
+
+
+class SkillMatrix:
+    """Confidence of every skill (columns) in every indexed resume (rows)"""
+
+    def __init__(self, resume_ids, filenames, skills, weights):
+        self.resume_ids = resume_ids
+        self.filenames = filenames
+        self.skills = skills
+        self.weights = weights
+        # Unit-length rows make dot products cosine similarities; rows without skills stay zero
+        norms = np.linalg.norm(weights, axis=1, keepdims=True)
+        self.unit = weights / np.maximum(norms, np.float32(1e-12))
+        self._rows = {resume_id: row for row, resume_id in enumerate(resume_ids)}
+        self._columns = {skill: column for column, skill in enumerate(skills)}
+
+    def __len__(self):
+        return len(self.resume_ids)
+
+    def row(self, resume_id):
+        """Row of an indexed resume (404 if it is not in the index)"""
+        row = self._rows.get(resume_id)
+        if row is None:
+            raise HTTPException(status_code=404, detail=f"Resume not found in index: {resume_id}")
+        return row
+
+    def column(self, skill):
+        return self._columns.get(skill)
+
+    def entry(self, row):
+        return {"resume_id": self.resume_ids[row], "filename": self.filenames[row]}
+
+    def shared_skills(self, row, other, limit=10):
+        """Skills both resumes name, strongest shared confidence first"""
+        both = np.minimum(self.weights[row], self.weights[other])
+        columns = np.flatnonzero(both)
+        columns = columns[np.argsort(-both[columns], kind="stable")][:limit]
+        return [self.skills[column] for column in columns]
+
+
+def build_skill_matrix(resumes, skill_rows):
+    """SkillMatrix from ResumeIndex.skill_table() output"""
+    skills = list(_CATEGORIES)
+    columns = {skill: column for column, skill in enumerate(skills)}
+    # Skills no longer in the taxonomy (indexed under older rules) get their own columns
+    for _, skill, _ in skill_rows:
+        if skill not in columns:
+            columns[skill] = len(skills)
+            skills.append(skill)
+
+    positions = {rowid: row for row, (rowid, _, _) in enumerate(resumes)}
+    weights = np.zeros((len(resumes), len(skills)), dtype=np.float32)
+    entries = [(positions[rowid], columns[skill], confidence)
+               for rowid, skill, confidence in skill_rows if rowid in positions]
+    if entries:
+        rows, cols, confidences = zip(*entries)
+        weights[np.array(rows), np.array(cols)] = confidences
+    return SkillMatrix(
+        [resume_id for _, resume_id, _ in resumes],
+        [filename for _, _, filename in resumes],
+        skills,
+        weights,
+    )
+
+
+def _round(value, digits=4):
+    return round(float(value), digits)
+
+
+def similarity_matrix(matrix, resume_ids):
+    """Pairwise cosine similarities of the given resumes"""
+    rows = [matrix.row(resume_id) for resume_id in resume_ids]
+    unit = matrix.unit[rows]
+    similarities = (unit @ unit.T).astype(np.float64)
+    return {
+        "resumes": [matrix.entry(row) for row in rows],
+        "similarity": np.round(similarities, 4).tolist(),
+    }
+
+
+def most_similar_pairs(matrix, k=20, min_similarity=0.0):
+    """The k most similar pairs of resumes in the pool (likely duplicates first)"""
+    n = len(matrix)
+    best_scores = np.empty(0, dtype=np.float32)
+    best_pairs = np.empty((0, 2), dtype=np.intp)
+    columns = np.arange(n)
+    for start in range(0, n, BLOCK_ROWS):
+        block = matrix.unit[start:start + BLOCK_ROWS] @ matrix.unit.T
+        # Each pair once: only columns after the row
+        block[columns[None, :] <= columns[start:start + len(block), None]] = -1
+        flat = block.ravel()
+        take = min(k, flat.size)
+        top = np.argpartition(flat, flat.size - take)[flat.size - take:]
+        scores = np.concatenate([best_scores, flat[top]])
+        pairs = np.concatenate([best_pairs, np.column_stack((top // n + start, top % n))])
+        keep = np.argsort(-scores, kind="stable")[:k]
+        best_scores, best_pairs = scores[keep], pairs[keep]
+
+    results = []
+    for score, (row, other) in zip(best_scores, best_pairs):
+        if score <= 0 or score < min_similarity:
+            continue
+        results.append({
+            "resumes": [matrix.entry(row), matrix.entry(other)],
+            "similarity": _round(score),
+            "shared_skills": matrix.shared_skills(row, other),
+        })
+    return {"pairs": results}
+
+
+def nearest_neighbors(matrix, resume_id, k=10):
+    """The k resumes whose skill profiles are most similar to resume_id's"""
+    row = matrix.row(resume_id)
+    similarities = matrix.unit @ matrix.unit[row]
+    similarities[row] = -1
+    take = min(k, len(matrix) - 1)
+    top = np.argpartition(-similarities, take - 1)[:take] if take > 0 else np.empty(0, dtype=np.intp)
+    top = top[np.argsort(-similarities[top], kind="stable")]
+    return {
+        "resume": matrix.entry(row),
+        "neighbors": [
+            dict(matrix.entry(other), similarity=_round(similarities[other]),
+                 shared_skills=matrix.shared_skills(row, other))
+            for other in top if similarities[other] > 0
+        ],
+    }
+
+
+def skill_coverage(matrix, targets, min_confidence=MIN_CONFIDENCE, gap_share=GAP_SHARE, k=10):
+    """How the pool covers a role's skills.
+
+    targets are (skill, weight) pairs, e.g. the skill targets of a compiled
+    job description. Reports per skill how many resumes hold it (confidence
+    of at least min_confidence), the skills held by less than gap_share of
+    the pool, and the k resumes covering the most target weight.
+    """
+    columns = [matrix.column(skill) for skill, _ in targets]
+    target_weights = np.array([weight for _, weight in targets], dtype=np.float32)
+    # Skills nobody in the pool has even a column for are held by no one
+    present = np.array([column is not None for column in columns])
+    confidences = np.zeros((len(matrix), len(targets)), dtype=np.float32)
+    confidences[:, present] = matrix.weights[:, [column for column in columns if column is not None]]
+
+    held = confidences >= min_confidence
+    counts = held.sum(axis=0)
+    totals = np.where(held, confidences, 0).sum(axis=0)
+    shares = counts / max(len(matrix), 1)
+
+    skills = []
+    for index, (skill, weight) in enumerate(targets):
+        skills.append({
+            "skill": skill,
+            "category": _CATEGORIES.get(skill),
+            "weight": weight,
+            "candidates": int(counts[index]),
+            "share": _round(shares[index]),
+            "mean_confidence": _round(totals[index] / counts[index], 2) if counts[index] else 0.0,
+        })
+    gaps = [skills[index]["skill"] for index in np.argsort(shares, kind="stable") if shares[index] < gap_share]
+
+    scores = held @ target_weights / max(float(target_weights.sum()), 1e-12)
+    take = min(k, len(matrix))
+    top = np.argpartition(-scores, take - 1)[:take] if take > 0 else np.empty(0, dtype=np.intp)
+    top = top[np.argsort(-scores[top], kind="stable")]
+    candidates = [
+        dict(matrix.entry(row), coverage=_round(scores[row]),
+             missing=[skill for (skill, _), has in zip(targets, held[row]) if not has])
+        for row in top
+    ]
+
+    return {
+        "skills": skills,
+        "gaps": gaps,
+        "fully_covered": int(held.all(axis=1).sum()) if targets else 0,
+        "top_candidates": candidates,
+    }
+
+
+def _kmeans_plus_plus(points, k, rng):
+    """k-means++ seeding on unit rows (distance 1 - cosine)"""
+    centroids = [points[rng.integers(len(points))]]
+    distances = np.clip(1 - points @ centroids[0], 0, None)
+    for _ in range(1, k):
+        weights = distances ** 2
+        total = weights.sum()
+        choice = rng.choice(len(points), p=weights / total) if total > 0 else rng.integers(len(points))
+        centroids.append(points[choice])
+        distances = np.minimum(distances, np.clip(1 - points @ points[choice], 0, None))
+    return np.array(centroids)
+
+
+def kmeans_clusters(matrix, k=5, members=10, max_iter=KMEANS_MAX_ITER, seed=KMEANS_SEED):
+    """Group the pool into k clusters of similar skill profiles.
+
+    Each cluster lists its size, cohesion (mean similarity to its centre),
+    the skills that characterize it and its most representative members.
+    Resumes without any skills are not clustered.
+    """
+    rows = np.flatnonzero(matrix.weights.any(axis=1))
+    points = matrix.unit[rows]
+    k = min(k, len(rows))
+    if k == 0:
+        return {"clusters": [], "iterations": 0, "converged": True, "unclustered": len(matrix)}
+
+    rng = np.random.default_rng(seed)
+    centroids = _kmeans_plus_plus(points, k, rng)
+    labels = None
+    converged = False
+    for iteration in range(1, max_iter + 1):
+        similarities = points @ centroids.T
+        new_labels = similarities.argmax(axis=1)
+        if labels is not None and np.array_equal(labels, new_labels):
+            converged = True
+            break
+        labels = new_labels
+        assignment = np.zeros((k, len(points)), dtype=np.float32)
+        assignment[labels, np.arange(len(points))] = 1
+        sums = assignment @ points
+        # Empty clusters restart at the points that fit their own cluster worst
+        empty = np.flatnonzero(assignment.sum(axis=1) == 0)
+        if len(empty):
+            fit = similarities[np.arange(len(points)), labels]
+            for cluster, worst in zip(empty, np.argsort(fit, kind="stable")):
+                sums[labels[worst]] -= points[worst]
+                sums[cluster] = points[worst]
+                labels[worst] = cluster
+        centroids = sums / np.maximum(np.linalg.norm(sums, axis=1, keepdims=True), np.float32(1e-12))
+
+    fit = (points * centroids[labels]).sum(axis=1)
+    clusters = []
+    for cluster in range(k):
+        indexes = np.flatnonzero(labels == cluster)
+        if not len(indexes):
+            continue
+        weights = matrix.weights[rows[indexes]]
+        mean_confidence = weights.mean(axis=0)
+        top_skills = np.argsort(-mean_confidence, kind="stable")[:5]
+        representative = indexes[np.argsort(-fit[indexes], kind="stable")][:members]
+        clusters.append({
+            "size": len(indexes),
+            "cohesion": _round(fit[indexes].mean()),
+            "top_skills": [
+                {"skill": matrix.skills[column], "mean_confidence": _round(mean_confidence[column], 2),
+                 "share": _round((weights[:, column] > 0).mean())}
+                for column in top_skills if mean_confidence[column] > 0
+            ],
+            "members": [dict(matrix.entry(rows[index]), similarity=_round(fit[index]))
+                        for index in representative],
+        })
+    clusters.sort(key=lambda cluster: -cluster["size"])
+    return {
+        "clusters": clusters,
+        "iterations": iteration,
+        "converged": converged,
+        "unclustered": len(matrix) - len(rows),
+    }
+
+
+_matrix = None
+_matrix_key = None
+_matrix_lock = threading.Lock()
+
+
+def get_skill_matrix(index):
+    """SkillMatrix of a ResumeIndex, rebuilt only after the index changed"""
+    global _matrix, _matrix_key
+    with _matrix_lock:
+        key = (index.path, index.generation())
+        if _matrix is None or key != _matrix_key:
+            _matrix = build_skill_matrix(*index.skill_table())
+            _matrix_key = key
+        return _matrix
@@ -1,8 +1,14 @@
 # Advanced Resume Analyzer
 import re
+import hashlib
+import json
 import math
-from collections import Counter, defaultdict
+import threading
+from collections import Counter, OrderedDict, defaultdict
 from datetime import datetime
+from layout import build_layout
+from matcher import SkillMatcher
+from metrics import stage
 
 # Enhanced skills database with categories and synonyms
 SKILLS_DATABASE = {
@@ -73,53 +79,224 @@ SECTIONS = {
     "certifications": ["certifications", "certificates", "credentials", "licenses"]
 }
 
-def advanced_skill_extractor(text):
+# Synonyms that only name a section next to a noun ("Professional Experience"):
+# a heading of these alone ("Professional Resume") names no section
+HEADING_QUALIFIERS = {"professional", "personal", "technical"}
+
+# ATS check patterns, compiled once at import
+ATS_CHECK_PATTERNS = {
+    "has_contact_info": re.compile(r'(email|phone|address|linkedin)'),
+    "has_summary": re.compile(r'(summary|profile|objective)'),
+    "has_skills_section": re.compile(r'(skills|technical|technologies)'),
+    "has_experience": re.compile(r'(experience|work|employment)'),
+    "has_education": re.compile(r'(education|degree|university)'),
+    "has_quantifiable_results": re.compile(r'(\d+%|\$\d+|\d+\+|\d+x)'),
+    "has_action_verbs": re.compile(r'(developed|created|managed|led|implemented|achieved)'),
+    "proper_formatting": re.compile(r'(•|\*|\d+\.)')  # Bullet points or numbered lists
+}
+
+# ATS checks answered by the document layout when it has section headings
+ATS_SECTION_CHECKS = {
+    "has_contact_info": "contact",
+    "has_summary": "summary",
+    "has_skills_section": "skills",
+    "has_experience": "experience",
+    "has_education": "education"
+}
+
+# Contact details in the lines above the first heading
+_CONTACT_PATTERN = re.compile(r'[\w.+-]+@[\w-]+\.\w|\+?\d[\d ().-]{6,}\d|linkedin', re.IGNORECASE)
+
+ACTION_VERBS = ["achieved", "developed", "created", "managed", "led", "implemented",
+                "designed", "built", "improved", "increased", "reduced", "optimized"]
+
+_NUMBER_PATTERN = re.compile(r'\d+')
+_WORD_PATTERN = re.compile(r'\w+')
+# Tokens for n-gram counting; keeps "c++" and "c#" intact
+_NGRAM_TOKEN = re.compile(r'[\w+#]+')
+
+# Words that never make useful job-description keywords
+STOPWORDS = {
+    "a", "about", "all", "also", "an", "and", "any", "are", "as", "at", "be", "been", "but",
+    "by", "can", "do", "for", "from", "has", "have", "in", "including", "into", "is", "it",
+    "its", "looking", "more", "must", "of", "on", "or", "our", "other", "plus", "should",
+    "such", "that", "the", "their", "this", "to", "us", "we", "what", "who", "will", "with",
+    "work", "working", "you", "your", "years", "year", "experience", "ability", "strong",
+    "team", "role", "job", "candidate", "required", "preferred", "skills", "knowledge",
+    "need", "needs", "needed", "want", "wants", "seeking", "ideal", "ideally", "able",
+    "etc", "well", "across", "within", "using", "join", "help", "someone"
+}
+
+# Bump when analyzer logic changes in a way that alters results
+ANALYZER_VERSION = 3
+
+# Compiled once per taxonomy, see get_skill_matcher()
+_skill_matcher = None
+_rules_version = None
+
+# Compiled keyword tables, keyed by their contents
+_keyword_patterns = {}
+
+class AnalysisContext:
+    """Per-document state shared by the analyzer functions.
+
+    Lowercasing and tokenizing happen once when the context is built, and
+    every analyzer memoizes its result here, so one request never repeats
+    the same scan. All analyzer functions accept either raw text or a context.
+    line_styles are the extractor's per-line style codes for the layout model.
+    """
+
+    def __init__(self, text, line_styles=None):
+        self.text = text
+        self.line_styles = line_styles
+        self.text_lower = text.lower()
+        self.tokens = self.text_lower.split()
+        self.word_count = len(self.tokens)
+        self._token_counts = None
+        self._layout = None
+        self._results = {}
+
+    @property
+    def layout(self):
+        """Headings, bullets and section spans of the document (see layout.py)"""
+        if self._layout is None:
+            self._layout = build_layout(self.text, self.line_styles, section_headings())
+        return self._layout
+
+    @property
+    def token_counts(self):
+        if self._token_counts is None:
+            self._token_counts = Counter(self.tokens)
+        return self._token_counts
+
+    def ngram_counts(self, max_n):
+        """Counter of all 1..max_n word n-grams (space-joined), built in one pass"""
+        return self.memo(("ngrams", max_n), lambda: count_ngrams(self.text_lower, max_n))
+
+    def memo(self, key, compute):
+        """Return the cached result for key, computing it on first access"""
+        if key not in self._results:
+            self._results[key] = compute()
+        return self._results[key]
+
+def count_ngrams(text_lower, max_n):
+    """Count every 1..max_n word n-gram of the text"""
+    tokens = _NGRAM_TOKEN.findall(text_lower)
+    counts = Counter(tokens)
+    for n in range(2, max_n + 1):
+        counts.update(" ".join(tokens[i:i + n]) for i in range(len(tokens) - n + 1))
+    return counts
+
+def get_context(text, line_styles=None):
+    """Wrap raw text in an AnalysisContext (contexts are passed through)"""
+    if isinstance(text, AnalysisContext):
+        return text
+    return AnalysisContext(text, line_styles)
+
+def section_headings():
+    """Heading synonym -> section name (the first section listing a synonym wins)"""
+    headings = {}
+    for section_name, synonyms in SECTIONS.items():
+        for synonym in synonyms:
+            if synonym not in HEADING_QUALIFIERS:
+                headings.setdefault(synonym, section_name)
+    return headings
+
+def get_skill_matcher():
+    """Return the compiled matcher for SKILLS_DATABASE, building it on first use"""
+    global _skill_matcher
+    if _skill_matcher is None:
+        _skill_matcher = SkillMatcher(SKILLS_DATABASE)
+    return _skill_matcher
+
+def reset_skill_matcher():
+    """Drop compiled rule state so the next call picks up rule table changes"""
+    global _skill_matcher, _rules_version
+    _skill_matcher = None
+    _rules_version = None
+    with _job_indexes_lock:
+        _job_indexes.clear()
+
+def rules_version():
+    """Short hash of the rule tables; changes whenever analysis results could change"""
+    global _rules_version
+    if _rules_version is None:
+        payload = json.dumps(
+            [ANALYZER_VERSION, SKILLS_DATABASE, ATS_KEYWORDS, SECTIONS, sorted(HEADING_QUALIFIERS)],
+            sort_keys=True, ensure_ascii=False
+        )
+        _rules_version = hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+    return _rules_version
+
+def warmup():
+    """Build the lazily compiled rule tables now instead of on the first request"""
+    get_skill_matcher()
+    _compile_keywords(ATS_KEYWORDS)
+    rules_version()
+
+def _compile_keywords(target_keywords):
+    """Compile (and cache) the word-boundary patterns of a keyword table"""
+    key = tuple((keyword, tuple(variations)) for keyword, variations in target_keywords.items())
+    compiled = _keyword_patterns.get(key)
+    if compiled is None:
+        compiled = [
+            (keyword, [re.compile(r'\b' + re.escape(variation) + r'\b') for variation in variations])
+            for keyword, variations in key
+        ]
+        _keyword_patterns[key] = compiled
+    return key, compiled
+
+def advanced_skill_extractor(text, matcher=None):
     """Enhanced skill extraction with confidence scoring and categorization"""
-    text_lower = text.lower()
-    detected_skills = []
-    
-    for category, skills in SKILLS_DATABASE.items():
-        for skill_name, variations in skills.items():
-            confidence = 0
-            matches = []
-            
-            for variation in variations:
-                # Exact word matches (higher confidence)
-                if re.search(r'\b' + re.escape(variation) + r'\b', text_lower):
-                    confidence += 0.8
-                    matches.append(variation)
-                # Partial matches (lower confidence)
-                elif variation in text_lower:
-                    confidence += 0.4
-                    matches.append(variation)
-            
-            if confidence > 0.3:  # threshold for detection
-                detected_skills.append({
-                    "skill": skill_name,
-                    "category": category,
-                    "confidence": round(confidence, 2),
-                    "matches": matches,
-                    "variations_found": len(matches)
-                })
-    
-    # Sort by confidence
-    detected_skills.sort(key=lambda x: x["confidence"], reverse=True)
-    return detected_skills
+    ctx = get_context(text)
+    if matcher is None:
+        matcher = get_skill_matcher()
+    # Exact word matches score 0.8, partial (substring) matches 0.4
+    return ctx.memo(("skills", id(matcher)), lambda: matcher.extract(ctx.text_lower))
 
 def detect_sections_advanced(text):
     """Advanced section detection with synonyms"""
-    text_lower = text.lower()
+    ctx = get_context(text)
+    return ctx.memo("sections", lambda: _detect_sections(ctx))
+
+def _detect_sections(ctx):
+    # Without recognizable headings, fall back to any mention of a synonym
+    return _layout_sections(ctx) or _section_lists(_sections_present(ctx.text_lower))
+
+def _layout_sections(ctx):
+    """(found, missing) from the layout's section headings, or None if it has none"""
+    return ctx.memo("layout_sections", lambda: _sections_from_layout(ctx.layout))
+
+def _sections_from_layout(layout):
+    names = {name for section in layout.sections for name in section.names if name in SECTIONS}
+    if not names:
+        return None
+    header = layout.sections[0]
+    if header.heading is None and _CONTACT_PATTERN.search(layout.section_text(header)):
+        names.add("contact")
+    return _section_lists(names)
+
+def _layout_checks(ctx):
+    """ATS checks the layout answers: sections from headings, formatting from bullet lines"""
+    checks = {"proper_formatting": ctx.layout.bullet_count > 0}
+    sections = _layout_sections(ctx)
+    if sections is not None:
+        for check, section_name in ATS_SECTION_CHECKS.items():
+            checks[check] = section_name in sections[0]
+    return checks
+
+def _sections_present(text_lower):
+    return {
+        section_name for section_name, synonyms in SECTIONS.items()
+        if any(synonym in text_lower for synonym in synonyms)
+    }
+
+def _section_lists(present):
     found_sections = []
     missing_sections = []
     
-    for section_name, synonyms in SECTIONS.items():
-        found = False
-        for synonym in synonyms:
-            if synonym in text_lower:
-                found = True
-                break
-        
-        if found:
+    for section_name in SECTIONS:
+        if section_name in present:
             found_sections.append(section_name)
         else:
             missing_sections.append(section_name)
@@ -128,15 +305,23 @@ def detect_sections_advanced(text):
 
 def analyze_keyword_density(text, target_keywords):
     """Analyze keyword density for ATS optimization"""
-    text_lower = text.lower()
-    word_count = len(text_lower.split())
+    ctx = get_context(text)
+    key, compiled = _compile_keywords(target_keywords)
+    return ctx.memo(("keyword_density", key), lambda: _keyword_density(ctx, compiled))
+
+def _keyword_density(ctx, compiled):
+    return _density_table(_keyword_counts(ctx.text_lower, compiled), ctx.word_count)
+
+def _keyword_counts(text_lower, compiled):
+    return {
+        keyword: sum(len(pattern.findall(text_lower)) for pattern in patterns)
+        for keyword, patterns in compiled
+    }
+
+def _density_table(counts, word_count):
     keyword_analysis = {}
     
-    for keyword, variations in target_keywords.items():
-        total_occurrences = 0
-        for variation in variations:
-            total_occurrences += len(re.findall(r'\b' + re.escape(variation) + r'\b', text_lower))
-        
+    for keyword, total_occurrences in counts.items():
         density = (total_occurrences / word_count * 100) if word_count > 0 else 0
         keyword_analysis[keyword] = {
             "count": total_occurrences,
@@ -148,28 +333,35 @@ def analyze_keyword_density(text, target_keywords):
 
 def calculate_ats_score(text):
     """Calculate ATS (Applicant Tracking System) optimization score"""
-    text_lower = text.lower()
-    
-    # Check for common ATS-friendly elements
+    ctx = get_context(text)
+    return ctx.memo("ats_score", lambda: _ats_score(ctx))
+
+def _ats_score(ctx):
+    # Check for common ATS-friendly elements; the structural ones come from the layout
+    layout_checks = _layout_checks(ctx)
     ats_checks = {
-        "has_contact_info": bool(re.search(r'(email|phone|address|linkedin)', text_lower)),
-        "has_summary": bool(re.search(r'(summary|profile|objective)', text_lower)),
-        "has_skills_section": bool(re.search(r'(skills|technical|technologies)', text_lower)),
-        "has_experience": bool(re.search(r'(experience|work|employment)', text_lower)),
-        "has_education": bool(re.search(r'(education|degree|university)', text_lower)),
-        "has_quantifiable_results": bool(re.search(r'(\d+%|\$\d+|\d+\+|\d+x)', text_lower)),
-        "has_action_verbs": bool(re.search(r'(developed|created|managed|led|implemented|achieved)', text_lower)),
-        "proper_formatting": bool(re.search(r'(•|\*|\d+\.)', text_lower))  # Bullet points or numbered lists
+        name: layout_checks[name] if name in layout_checks else bool(pattern.search(ctx.text_lower))
+        for name, pattern in ATS_CHECK_PATTERNS.items()
     }
-    
+    return _ats_result(ats_checks)
+
+def _ats_result(ats_checks):
     score = sum(ats_checks.values()) / len(ats_checks) * 100
     return round(score), ats_checks
 
 def analyze_content_quality(text):
     """Analyze content quality and provide insights"""
-    text_lower = text.lower()
-    word_count = len(text_lower.split())
-    
+    ctx = get_context(text)
+    return ctx.memo("content_quality", lambda: _content_quality(ctx))
+
+def _content_quality(ctx):
+    text_lower = ctx.text_lower
+    action_verb_count = sum(1 for verb in ACTION_VERBS if verb in text_lower)
+    number_count = len(_NUMBER_PATTERN.findall(text_lower))
+    keyword_density = analyze_keyword_density(ctx, ATS_KEYWORDS)
+    return _content_report(ctx.word_count, action_verb_count, number_count, keyword_density)
+
+def _content_report(word_count, action_verb_count, number_count, keyword_density):
     # Check for common issues
     issues = []
     suggestions = []
@@ -183,22 +375,16 @@ def analyze_content_quality(text):
         suggestions.append("Consider condensing content to 1-2 pages")
     
     # Check for action verbs
-    action_verbs = ["achieved", "developed", "created", "managed", "led", "implemented", 
-                   "designed", "built", "improved", "increased", "reduced", "optimized"]
-    action_verb_count = sum(1 for verb in action_verbs if verb in text_lower)
-    
     if action_verb_count < 3:
         issues.append("Limited use of action verbs")
         suggestions.append("Use more strong action verbs to describe your achievements")
     
     # Check for quantifiable results
-    numbers = re.findall(r'\d+', text_lower)
-    if len(numbers) < 2:
+    if number_count < 2:
         issues.append("Limited quantifiable achievements")
         suggestions.append("Add specific numbers, percentages, or metrics to your achievements")
     
     # Check for keywords
-    keyword_density = analyze_keyword_density(text, ATS_KEYWORDS)
     avg_density = sum(k["density"] for k in keyword_density.values()) / len(keyword_density)
     
     if avg_density < 1.0:
@@ -210,7 +396,7 @@ def analyze_content_quality(text):
         "issues": issues,
         "suggestions": suggestions,
         "action_verb_count": action_verb_count,
-        "number_count": len(numbers),
+        "number_count": number_count,
         "keyword_density": avg_density
     }
 
@@ -253,12 +439,231 @@ def calculate_completeness_advanced(found_sections, skills_detected, ats_score):
     completeness = (section_score * 0.4 + skill_score * 0.3 + ats_score_normalized * 0.3) * 100
     return round(completeness)
 
+# Incremental analysis: every analyzer above only looks for matches within a
+# line, so the text can be cut into its layout sections at line breaks, each
+# section scanned on its own (and cached by content hash), and the
+# per-section features merged into exactly the whole-text results. How well
+# the headings are recognized only affects how much is reused, never the
+# results.
+
+def section_hash(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+
+def split_sections(text, line_styles=None):
+    """Cut text into the sections of its layout (see AnalysisContext.layout).
+
+    Returns [{"name", "heading", "hash", "text"}]; the texts concatenate back
+    to the input. Whatever precedes the first heading is the "header" section,
+    and repeated names get a suffix ("experience_2").
+    """
+    layout = get_context(text, line_styles).layout
+    sections = []
+    seen = Counter()
+    for section in layout.sections:
+        seen[section.name] += 1
+        block = layout.section_text(section)
+        sections.append({
+            "name": section.name if seen[section.name] == 1 else f"{section.name}_{seen[section.name]}",
+            "heading": section.heading,
+            "hash": section_hash(block),
+            "text": block
+        })
+    return sections
+
+def section_features(text):
+    """Raw analyzer findings for one section, JSON-ready for caching.
+
+    The scans are timed under the stage names build_analysis uses, since on
+    this path the analyzers only read the merged features.
+    """
+    text_lower = text.lower()
+    _, compiled = _compile_keywords(ATS_KEYWORDS)
+    features = {}
+    with stage("skills"):
+        features["skills"] = sorted(get_skill_matcher().scan(text_lower).items())
+    with stage("keywords"):
+        features["keywords"] = _keyword_counts(text_lower, compiled)
+    with stage("content"):
+        features["words"] = len(text_lower.split())
+        features["numbers"] = len(_NUMBER_PATTERN.findall(text_lower))
+        features["verbs"] = [verb for verb in ACTION_VERBS if verb in text_lower]
+    with stage("sections"):
+        features["sections"] = sorted(_sections_present(text_lower))
+    with stage("ats"):
+        features["ats_checks"] = [name for name, pattern in ATS_CHECK_PATTERNS.items() if pattern.search(text_lower)]
+    return features
+
+def context_from_sections(text, features, line_styles=None):
+    """AnalysisContext for text with the analyzer results merged from its sections' features.
+
+    The analyzer functions return these memoized results, so build_analysis
+    on the context skips the scans entirely.
+    """
+    ctx = get_context(text, line_styles)
+    matcher = get_skill_matcher()
+    key, compiled = _compile_keywords(ATS_KEYWORDS)
+
+    found = {}
+    keyword_counts = Counter()
+    words = numbers = 0
+    verbs, present, checks = set(), set(), set()
+    for feature in features:
+        for pid, kind in feature["skills"]:
+            found[pid] = max(found.get(pid, 0), kind)
+        keyword_counts.update(feature["keywords"])
+        words += feature["words"]
+        numbers += feature["numbers"]
+        verbs.update(feature["verbs"])
+        present.update(feature["sections"])
+        checks.update(feature["ats_checks"])
+
+    with stage("keywords"):
+        density = _density_table({keyword: keyword_counts[keyword] for keyword, _ in compiled}, words)
+        ctx._results[("keyword_density", key)] = density
+    with stage("skills"):
+        ctx._results[("skills", id(matcher))] = matcher.rank(found)
+    with stage("sections"):
+        ctx._results["sections"] = _layout_sections(ctx) or _section_lists(present)
+    with stage("ats"):
+        layout_checks = _layout_checks(ctx)
+        ctx._results["ats_score"] = _ats_result({
+            name: layout_checks[name] if name in layout_checks else name in checks
+            for name in ATS_CHECK_PATTERNS
+        })
+    with stage("content"):
+        ctx._results["content_quality"] = _content_report(words, len(verbs), numbers, density)
+    return ctx
+
+# Compiled job descriptions, keyed by job_id (hash of the normalized JD text)
+JOB_INDEX_CACHE_SIZE = 128
+_job_indexes = OrderedDict()
+# Job descriptions are compiled in threads, off the event loop
+_job_indexes_lock = threading.Lock()
+
+def _ngram_form(phrase):
+    """Normalize a phrase the same way resume n-grams are counted"""
+    return " ".join(_NGRAM_TOKEN.findall(phrase.lower()))
+
+def compile_job_description(text, max_keywords=30):
+    """Compile a job description into a reusable target index.
+
+    Targets are the taxonomy skills the JD mentions (with all their
+    variations) plus its most frequent significant words and phrases. The
+    index is cached by job_id, so scoring many resumes against one posting
+    compiles it only once.
+    """
+    normalized = " ".join(text.lower().split())
+    job_id = hashlib.sha256(normalized.encode("utf-8")).hexdigest()[:16]
+    cached = get_job_index(job_id)
+    if cached is not None:
+        return cached
+
+    ctx = AnalysisContext(text)
+    counts = ctx.ngram_counts(3)
+    targets = []
+    covered = set()
+
+    # Skills from the taxonomy carry the most weight. Only whole-word mentions
+    # count here; substring hits ("ng" in "engineering") make poor targets.
+    for skill in advanced_skill_extractor(ctx):
+        variations = SKILLS_DATABASE[skill["category"]][skill["skill"]]
+        forms = sorted({_ngram_form(v) for v in variations + [skill["skill"]]} - {""})
+        if not any(counts.get(form) for form in forms):
+            continue
+        covered.update(forms)
+        covered.update(word for form in forms for word in form.split())
+        targets.append({
+            "term": skill["skill"],
+            "kind": "skill",
+            "weight": round(2.0 + min(skill["confidence"], 2.0), 2),
+            "variations": forms
+        })
+
+    # Then the JD's own vocabulary: frequent words and repeated two-word phrases
+    candidates = []
+    for term, count in counts.items():
+        words = term.split()
+        if len(words) > 2:
+            continue
+        if any(w in STOPWORDS or len(w) < 3 or w.isdigit() for w in words):
+            continue
+        if len(words) == 2 and count < 2:
+            continue
+        if term in covered:
+            continue
+        candidates.append((count, len(words), term))
+    candidates.sort(key=lambda c: (-c[0], -c[1], c[2]))
+
+    for count, _, term in candidates[:max_keywords]:
+        targets.append({
+            "term": term,
+            "kind": "keyword",
+            "weight": round(1.0 + math.log(count), 2),
+            "variations": [term]
+        })
+
+    index = {
+        "job_id": job_id,
+        "max_n": max((len(v.split()) for t in targets for v in t["variations"]), default=1),
+        "targets": targets
+    }
+    with _job_indexes_lock:
+        _job_indexes[job_id] = index
+        while len(_job_indexes) > JOB_INDEX_CACHE_SIZE:
+            _job_indexes.popitem(last=False)
+    return index
+
+def get_job_index(job_id):
+    """Return a previously compiled job index, or None if unknown/evicted"""
+    with _job_indexes_lock:
+        index = _job_indexes.get(job_id)
+        if index is not None:
+            _job_indexes.move_to_end(job_id)
+    return index
+
+def match_job_description(text, job_index):
+    """Score a resume against a compiled job index.
+
+    All targets are counted from one n-gram count of the resume, instead of a
+    regex pass per variation.
+    """
+    ctx = get_context(text)
+    counts = ctx.ngram_counts(job_index["max_n"])
+
+    matched = []
+    missing = []
+    weights = {"skill": [0, 0], "keyword": [0, 0]}  # [matched, total]
+    for target in job_index["targets"]:
+        occurrences = sum(counts.get(v, 0) for v in target["variations"])
+        weights[target["kind"]][1] += target["weight"]
+        if occurrences:
+            weights[target["kind"]][0] += target["weight"]
+            matched.append({"term": target["term"], "kind": target["kind"], "count": occurrences})
+        else:
+            missing.append({"term": target["term"], "kind": target["kind"]})
+
+    total = sum(w[1] for w in weights.values())
+    score = sum(w[0] for w in weights.values()) / total * 100 if total else 0
+    return {
+        "job_id": job_index["job_id"],
+        "score": round(score, 1),
+        "skill_coverage": round(weights["skill"][0] / weights["skill"][1] * 100) if weights["skill"][1] else None,
+        "keyword_coverage": round(weights["keyword"][0] / weights["keyword"][1] * 100) if weights["keyword"][1] else None,
+        "matched": matched,
+        "missing": missing
+    }
+
+def rank_job_matches(results):
+    """Sort match results best first (ties by filename)"""
+    return sorted(results, key=lambda r: (-r.get("score", -1), r.get("filename", "")))
+
 def simple_skill_extractor(text):
     """Legacy function for backward compatibility"""
-    skills = advanced_skill_extractor(text)
+    ctx = get_context(text)
+    skills = advanced_skill_extractor(ctx)
     return {
         "skills_found": [skill["skill"] for skill in skills],
-        "top_words": Counter(re.findall(r'\w+', text.lower())).most_common(20)
+        "top_words": Counter(_WORD_PATTERN.findall(ctx.text_lower)).most_common(20)
     }
 
 def detect_sections(text):
@@ -0,0 +1,236 @@
+# Offline bulk scoring of a resume archive, without the HTTP API
+#
+#   python -m batch /archive/resumes -o scores.jsonl [--workers 8] [--cache cache.sqlite3]
+#
+# Walks a directory tree for PDF and DOCX files and extracts and analyzes
+# them in a process pool, handing files to the workers in chunks. Each file
+# becomes one JSONL record shaped like the /analysis/export response, plus
+# its "path" relative to the directory; files that fail get
+# {"path", "filename", "error"} instead.
+#
+# The output file doubles as the checkpoint: a rerun skips every path it
+# already holds (an interrupted last line is dropped first), so a crashed or
+# cancelled nightly run continues where it stopped. Progress, throughput and
+# a final summary go to stderr.
+#
+# --cache (default: ANALYZER_CACHE_DB) names a SQLite extraction cache with
+# the same keys as the API's disk tier, so files the server or an earlier
+# run already extracted are not parsed again.
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from cache import SQLiteCache, file_digest, text_key
+from extraction import extract_document, is_supported, upload_error
+from responses import dumps
+import tasks
+
+# Seconds between progress lines
+PROGRESS_INTERVAL = 5.0
+
+# Files handed to a worker at once
+DEFAULT_CHUNKSIZE = 8
+
+# Bytes read at a time while looking for the checkpoint's last complete line
+CHECKPOINT_BLOCK = 64 * 1024
+
+_PATH_PREFIX = '{"path":'
+_decoder = json.JSONDecoder()
+
+_cache = None
+
+
+def find_resumes(root):
+    """Paths of supported files under root, relative to it, in a stable order"""
+    paths = []
+    for directory, subdirectories, filenames in os.walk(root):
+        subdirectories.sort()
+        for filename in sorted(filenames):
+            if is_supported(filename):
+                paths.append(os.path.relpath(os.path.join(directory, filename), root))
+    return paths
+
+
+def read_checkpoint(output):
+    """Paths already recorded in output, after dropping a partially written last line"""
+    if not os.path.exists(output):
+        return set()
+
+    with open(output, "rb+") as f:
+        end = _complete_length(f)
+        if end < f.seek(0, os.SEEK_END):
+            f.truncate(end)
+        f.seek(0)
+        return {_record_path(line) for line in f if line.strip()}
+
+
+def _complete_length(f):
+    """Bytes up to and including the last newline of f"""
+    position = f.seek(0, os.SEEK_END)
+    while position > 0:
+        size = min(CHECKPOINT_BLOCK, position)
+        position -= size
+        f.seek(position)
+        newline = f.read(size).rfind(b"\n")
+        if newline >= 0:
+            return position + newline + 1
+    return 0
+
+
+def _record_path(line):
+    """The "path" of an output record, without parsing the analysis behind it"""
+    text = line.decode("utf-8")
+    if text.startswith(_PATH_PREFIX):
+        # Records are written with "path" first
+        return _decoder.raw_decode(text, len(_PATH_PREFIX))[0]
+    return json.loads(text)["path"]
+
+
+def _init_worker(cache_path):
+    global _cache
+    _cache = SQLiteCache(cache_path) if cache_path else None
+
+
+def score_file(root, path):
+    """One output record for root/path; never raises"""
+    filename = os.path.basename(path)
+    try:
+        with open(os.path.join(root, path), "rb") as f:
+            data = f.read()
+        error = upload_error(filename, data)
+        if error:
+            return {"path": path, "filename": filename, "error": error}, len(data)
+
+        document = None
+        if _cache is not None:
+            key = text_key(file_digest(data), filename)
+            document = _cache.get(key)
+        if document is None:
+            document = extract_document(data, filename)
+            if _cache is not None:
+                _cache.set(key, document)
+        result, _ = tasks.build_from_document(tasks.build_export, document, filename)
+        return {"path": path, **result}, len(data)
+    except Exception as e:
+        return {"path": path, "filename": filename, "error": str(e) or type(e).__name__}, 0
+
+
+class Progress:
+    """Counts finished files and prints throughput lines to stderr"""
+
+    def __init__(self, total, skipped, stream=sys.stderr):
+        self.total = total
+        self.skipped = skipped
+        self.stream = stream
+        self.done = self.failed = self.bytes = 0
+        self.start = self._last = time.perf_counter()
+
+    def update(self, record, size):
+        self.done += 1
+        self.bytes += size
+        if "error" in record:
+            self.failed += 1
+        now = time.perf_counter()
+        if now - self._last >= PROGRESS_INTERVAL:
+            self._last = now
+            self.report()
+
+    def report(self):
+        elapsed = time.perf_counter() - self.start
+        rate = self.done / elapsed if elapsed > 0 else 0.0
+        eta = (self.total - self.done) / rate if rate > 0 else 0.0
+        percent = self.done / self.total * 100 if self.total else 100.0
+        print(
+            f"{self.done}/{self.total} ({percent:.1f}%) {rate:.1f} files/s, "
+            f"{self.bytes / elapsed / 1024 / 1024 if elapsed > 0 else 0.0:.2f} MB/s, "
+            f"{self.failed} failed, eta {eta:.0f}s",
+            file=self.stream, flush=True,
+        )
+
+    def summary(self):
+        elapsed = time.perf_counter() - self.start
+        return {
+            "total": self.total + self.skipped,
+            "scored": self.done - self.failed,
+            "failed": self.failed,
+            "skipped": self.skipped,
+            "seconds": round(elapsed, 2),
+            "files_per_second": round(self.done / elapsed, 2) if elapsed > 0 else 0.0,
+        }
+
+
+def _results(root, paths, workers, chunksize, cache_path):
+    if workers <= 0:
+        _init_worker(cache_path)
+        return (score_file(root, path) for path in paths), None
+    executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(cache_path,))
+    return executor.map(score_file, [root] * len(paths), paths, chunksize=chunksize), executor
+
+
+def run(root, output, workers=None, chunksize=DEFAULT_CHUNKSIZE, cache_path=None, resume=True):
+    """Score every resume under root into output; returns the summary dict"""
+    paths = find_resumes(root)
+    if resume:
+        done = read_checkpoint(output)
+    else:
+        done = set()
+        open(output, "wb").close()
+    pending = [path for path in paths if path not in done]
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    progress = Progress(len(pending), len(paths) - len(pending))
+    results, executor = _results(root, pending, workers, chunksize, cache_path)
+    try:
+        with open(output, "ab") as out:
+            for record, size in results:
+                # One flushed line per file: everything written survives an interruption
+                out.write(dumps(record) + b"\n")
+                out.flush()
+                progress.update(record, size)
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+    progress.report()
+    return progress.summary()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m batch",
+        description="Score every PDF/DOCX resume under a directory into a JSONL file",
+    )
+    parser.add_argument("directory")
+    parser.add_argument("-o", "--output", default="scores.jsonl",
+                        help="JSONL file written and resumed from (default: scores.jsonl)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="worker processes (default: CPU count, 0 = in this process)")
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE,
+                        help=f"files handed to a worker at once (default: {DEFAULT_CHUNKSIZE})")
+    parser.add_argument("--cache", default=os.environ.get("ANALYZER_CACHE_DB") or None,
+                        help="SQLite extraction cache shared with the API (default: ANALYZER_CACHE_DB)")
+    parser.add_argument("--restart", action="store_true",
+                        help="overwrite the output instead of resuming from it")
+    args = parser.parse_args(argv)
+
+    if not os.path.isdir(args.directory):
+        parser.error(f"not a directory: {args.directory}")
+    try:
+        summary = run(args.directory, args.output, args.workers, max(1, args.chunksize),
+                      args.cache, resume=not args.restart)
+    except KeyboardInterrupt:
+        print("interrupted; rerun the same command to continue", file=sys.stderr)
+        return 130
+    except BrokenProcessPool:
+        print("a worker process died; rerun the same command to continue", file=sys.stderr)
+        return 1
+    print(dumps({"summary": summary}).decode(), file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
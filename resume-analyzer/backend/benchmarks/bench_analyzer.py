@@ -0,0 +1,224 @@
+"""Benchmark: every analyzer function and both extractors on the synthetic corpus.
+
+Usage (from resume-analyzer/backend):
+    python benchmarks/bench_analyzer.py [--repeat 20] [--rounds 3] [--only ats] [--save baseline.json]
+    python benchmarks/bench_analyzer.py --compare baseline.json [--threshold 0.25]
+
+Each function is timed on raw text, so it pays for its own lowercasing and
+tokenizing exactly as a standalone call would; "pipeline" is the whole
+/analyze body (tasks.build_analysis) with its shared AnalysisContext, and
+"pipeline[reanalysis]" the same for an edited resume whose other sections
+are served from the section cache. The
+median and minimum of --repeat runs are reported per function and corpus case.
+The runs are split over --rounds passes through the whole suite (with the
+garbage collector off while timing, as timeit does), so a burst of load
+from elsewhere on the machine cannot skew a single benchmark.
+
+--save writes the results as a JSON baseline. --compare re-runs the suite
+and exits with status 1 if any function is more than --threshold (default
+25%) slower than in the baseline. The minimum is compared by default: for
+deterministic CPU-bound code it is far less noisy than the median. Timings
+below --min-ms are ignored, since they are mostly timer noise, and a
+regression only counts if it persists through --confirm re-measurements.
+Baselines are only comparable on the same machine.
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from analyzer import (  # noqa: E402
+    ATS_KEYWORDS, advanced_skill_extractor, analyze_content_quality, analyze_keyword_density,
+    calculate_ats_score, detect_sections_advanced, generate_improvement_suggestions, rules_version,
+    section_features, split_sections,
+)
+from corpus import SEED, build_corpus  # noqa: E402
+from extraction import EXTRACTION_VERSION, extract_docx_document, extract_pdf_document  # noqa: E402
+from tasks import build_analysis, build_sectioned_analysis  # noqa: E402
+
+
+def _suggestions(text):
+    # Inputs come from the other analyzers, computed outside the timed call
+    skills = advanced_skill_extractor(text)
+    found, _ = detect_sections_advanced(text)
+    ats_score, _ = calculate_ats_score(text)
+    return lambda: generate_improvement_suggestions(text, skills, found, ats_score)
+
+
+def _reanalysis(text):
+    # An edit to the last section; the features of the others come from the cache
+    sections = split_sections(text)
+    known = {section["hash"]: section_features(section["text"]) for section in sections[:-1]}
+    document = {"text": text}
+    return lambda: build_sectioned_analysis(document, "resume.pdf", known)
+
+
+# name -> (input kind, factory returning the zero-argument call to time)
+BENCHMARKS = {
+    "advanced_skill_extractor": ("text", lambda text: lambda: advanced_skill_extractor(text)),
+    "detect_sections_advanced": ("text", lambda text: lambda: detect_sections_advanced(text)),
+    "analyze_keyword_density": ("text", lambda text: lambda: analyze_keyword_density(text, ATS_KEYWORDS)),
+    "calculate_ats_score": ("text", lambda text: lambda: calculate_ats_score(text)),
+    "analyze_content_quality": ("text", lambda text: lambda: analyze_content_quality(text)),
+    "generate_improvement_suggestions": ("text", _suggestions),
+    "pipeline": ("text", lambda text: lambda: build_analysis(text, "resume.pdf")),
+    "pipeline[reanalysis]": ("text", _reanalysis),
+    "extract_pdf[pdfium]": ("pdf", lambda data: lambda: extract_pdf_document(data, "pdfium", 0, 0)),
+    "extract_pdf[pdfplumber]": ("pdf", lambda data: lambda: extract_pdf_document(data, "pdfplumber", 0, 0)),
+    "extract_docx": ("docx", lambda data: lambda: extract_docx_document(data, 0)),
+}
+
+
+def time_call(call, repeat):
+    """Wall times of repeat calls in milliseconds"""
+    timings = []
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            call()
+            timings.append((time.perf_counter() - start) * 1000)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return timings
+
+
+def run_suite(repeat, rounds=3, only=None, keys=None):
+    corpus = build_corpus()
+    calls = {}
+    for name, (kind, factory) in BENCHMARKS.items():
+        if only and only not in name:
+            continue
+        for case in corpus:
+            if keys is not None and f"{name}/{case['name']}" not in keys:
+                continue
+            call = factory(case[kind])
+            call()  # warm-up
+            # The slow layout backend dominates the run time; a few repeats suffice
+            runs = max(3, repeat // 5) if "pdfplumber" in name else repeat
+            calls[f"{name}/{case['name']}"] = (call, max(1, runs // rounds))
+
+    timings = {key: [] for key in calls}
+    for _ in range(rounds):
+        for key, (call, runs) in calls.items():
+            timings[key].extend(time_call(call, runs))
+
+    results = {
+        key: {"median_ms": round(statistics.median(values), 4), "min_ms": round(min(values), 4)}
+        for key, values in timings.items()
+    }
+    return {
+        "meta": {
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "node": platform.node(),
+            "rules_version": rules_version(),
+            "extraction_version": EXTRACTION_VERSION,
+            "corpus_seed": SEED,
+            "repeat": repeat,
+            "rounds": rounds,
+        },
+        "results": results,
+    }
+
+
+def compare(baseline, current, threshold, min_ms, metric="min_ms"):
+    """Rows of (key, baseline ms, current ms, change, status); status is ok/REGRESSION/new"""
+    rows = []
+    for key, result in current["results"].items():
+        now = result[metric]
+        if key not in baseline["results"]:
+            rows.append((key, None, now, None, "new"))
+            continue
+        before = baseline["results"][key][metric]
+        change = now / before - 1 if before else 0.0
+        regressed = change > threshold and now >= min_ms
+        rows.append((key, before, now, change, "REGRESSION" if regressed else "ok"))
+    return rows
+
+
+def print_results(results):
+    print(f"{'benchmark':<52} {'median (ms)':>12} {'min (ms)':>10}")
+    for key, result in results["results"].items():
+        print(f"{key:<52} {result['median_ms']:12.3f} {result['min_ms']:10.3f}")
+
+
+def print_comparison(rows):
+    print(f"{'benchmark':<52} {'baseline':>10} {'current':>10} {'change':>8}")
+    for key, before, now, change, status in rows:
+        before_text = f"{before:10.3f}" if before is not None else f"{'-':>10}"
+        change_text = f"{change:+8.1%}" if change is not None else f"{'-':>8}"
+        flag = "" if status == "ok" else f"  {status}"
+        print(f"{key:<52} {before_text} {now:10.3f} {change_text}{flag}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--rounds", type=int, default=3,
+                        help="passes through the suite the runs are spread over (default: 3)")
+    parser.add_argument("--only", help="run only benchmarks whose name contains this string")
+    parser.add_argument("--save", metavar="PATH", help="write the results as a JSON baseline")
+    parser.add_argument("--compare", metavar="PATH", help="fail on regressions against a baseline")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="allowed slowdown before a regression is reported (default: 0.25)")
+    parser.add_argument("--metric", choices=("min_ms", "median_ms"), default="min_ms",
+                        help="timing compared against the baseline (default: min_ms)")
+    parser.add_argument("--confirm", type=int, default=2,
+                        help="re-measurements a regression must survive (default: 2)")
+    parser.add_argument("--min-ms", type=float, default=0.05,
+                        help="ignore regressions in timings below this (default: 0.05)")
+    args = parser.parse_args()
+
+    current = run_suite(args.repeat, args.rounds, args.only)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(current, f, indent=2)
+        print(f"baseline written to {args.save}")
+
+    if not args.compare:
+        print_results(current)
+        return 0
+
+    with open(args.compare) as f:
+        baseline = json.load(f)
+    for field in ("rules_version", "extraction_version", "corpus_seed"):
+        if baseline["meta"].get(field) != current["meta"][field]:
+            print(f"note: {field} differs from the baseline "
+                  f"({baseline['meta'].get(field)} -> {current['meta'][field]})")
+
+    rows = compare(baseline, current, args.threshold, args.min_ms, args.metric)
+    for _ in range(args.confirm):
+        suspects = {row[0] for row in rows if row[4] == "REGRESSION"}
+        if not suspects:
+            break
+        # Keep the best timing seen, so a transient slowdown does not count
+        retry = run_suite(args.repeat, args.rounds, args.only, suspects)
+        for key, result in retry["results"].items():
+            for metric, value in result.items():
+                current["results"][key][metric] = min(current["results"][key][metric], value)
+        rows = compare(baseline, current, args.threshold, args.min_ms, args.metric)
+
+    print_comparison(rows)
+    regressions = [row for row in rows if row[4] == "REGRESSION"]
+    if regressions:
+        print(f"\n{len(regressions)} benchmark(s) regressed by more than {args.threshold:.0%}")
+        return 1
+    print(f"\nno regressions beyond {args.threshold:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,137 @@
+"""Benchmark: streaming DOCX extractor vs the python-docx object model.
+
+Usage (from resume-analyzer/backend):
+    python benchmarks/bench_docx_extraction.py [--sizes 50,500,5000] [--repeat 3]
+
+Each measurement runs in a fresh process. Peak RSS growth is the fair memory
+comparison, since python-docx allocates in lxml's C heap, which tracemalloc
+cannot see; the Python-heap peak is reported alongside. On Linux the RSS
+high-water mark is reset before each run; elsewhere ru_maxrss is used, which
+under-reports runs that stay below the import-time peak.
+"""
+import argparse
+import io
+import multiprocessing
+import os
+import resource
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from docx import Document  # noqa: E402
+
+from extraction import extract_docx_document, extract_text_from_docx  # noqa: E402
+
+
+def make_docx(paragraphs):
+    """A resume-like DOCX with body paragraphs, skill tables and a header"""
+    doc = Document()
+    doc.sections[0].header.paragraphs[0].text = "Jane Doe | jane@example.com | 555-0100"
+    for i in range(paragraphs):
+        if i % 25 == 0:
+            doc.add_heading(f"Section {i // 25}", level=1)
+            table = doc.add_table(rows=3, cols=2)
+            for row, (label, skills) in enumerate([
+                ("Languages", "Python, Go, JavaScript"),
+                ("Cloud", "AWS, Docker, Kubernetes"),
+                ("Data", "SQL, pandas, numpy"),
+            ]):
+                table.cell(row, 0).text = label
+                table.cell(row, 1).text = skills
+        doc.add_paragraph(
+            f"Developed and implemented service {i}, improving latency by {i % 50}% "
+            "and leading a team of engineers through agile delivery."
+        )
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue()
+
+
+def _python_docx(data):
+    return extract_text_from_docx(io.BytesIO(data))
+
+
+def _streaming(data):
+    return extract_docx_document(data, max_chars=0)["text"]
+
+
+EXTRACTORS = {"python-docx": _python_docx, "docx-stream": _streaming}
+
+
+def _rss_kib(field):
+    with open("/proc/self/status") as status:
+        for line in status:
+            if line.startswith(field + ":"):
+                return int(line.split()[1])
+    raise OSError(field)
+
+
+def _start_peak_rss():
+    """Reset the peak-RSS counter if possible; returns the baseline in bytes"""
+    try:
+        with open("/proc/self/clear_refs", "w") as clear_refs:
+            clear_refs.write("5")
+        return _rss_kib("VmRSS") * 1024
+    except OSError:
+        # ru_maxrss is in KiB on Linux and bytes on macOS
+        scale = 1 if sys.platform == "darwin" else 1024
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+
+
+def _peak_rss():
+    try:
+        return _rss_kib("VmHWM") * 1024
+    except OSError:
+        scale = 1 if sys.platform == "darwin" else 1024
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+
+
+def _measure(name, data, repeat, queue):
+    extractor = EXTRACTORS[name]
+    extractor(data)  # warm up imports and caches
+
+    baseline = _start_peak_rss()
+    tracemalloc.start()
+    chars = len(extractor(data))
+    py_peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    rss_peak = _peak_rss() - baseline
+
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        extractor(data)
+        best = min(best, time.perf_counter() - start)
+    queue.put((best, rss_peak, py_peak, chars))
+
+
+def measure(name, data, repeat):
+    ctx = multiprocessing.get_context("spawn")
+    queue = ctx.Queue()
+    process = ctx.Process(target=_measure, args=(name, data, repeat, queue))
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="50,500,5000")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'paragraphs':>10} {'size (KB)':>10} {'extractor':>12} {'time (ms)':>10} "
+          f"{'RSS peak (MB)':>14} {'py peak (MB)':>13} {'chars':>9}")
+    for size in (int(s) for s in args.sizes.split(",")):
+        data = make_docx(size)
+        for name in EXTRACTORS:
+            best, rss_peak, py_peak, chars = measure(name, data, args.repeat)
+            print(f"{size:>10} {len(data) / 1024:10.1f} {name:>12} {best * 1000:10.1f} "
+                  f"{rss_peak / 1024 / 1024:14.1f} {py_peak / 1024 / 1024:13.1f} {chars:>9}")
+
+
+if __name__ == "__main__":
+    main()
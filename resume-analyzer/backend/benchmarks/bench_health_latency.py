@@ -0,0 +1,144 @@
+"""Check: /analysis/health stays responsive while the worker pool parses heavy uploads.
+
+Usage (from resume-analyzer/backend):
+    python benchmarks/bench_health_latency.py [--uploads 8] [--concurrency 4] [--budget-ms 50]
+
+The app runs in this process (httpx.ASGITransport, with its lifespan, so the
+worker pool starts as under uvicorn). --concurrency clients upload large
+corpus PDFs to /analyze, every one a distinct byte variant so the cache
+cannot answer it, while a probe requests /analysis/health every --interval
+seconds. Extraction and analysis run in the pool, so the event loop should
+answer the probes at once however busy the workers are.
+
+Health latency is reported idle and while pool tasks were in flight. The
+script exits with status 1 if the p95 of the busy probes exceeds
+--budget-ms, if no probe ran while the pool was busy, or if an upload failed.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_load import percentile, variant  # noqa: E402
+from corpus import make_pdf, make_resume_text  # noqa: E402
+
+IDLE_PROBES = 20
+
+
+async def probe(client, quiet, busy, stop, interval, pool):
+    """Request /analysis/health every interval seconds until stop is set"""
+    while not stop.is_set():
+        in_flight = pool.in_flight
+        start = time.perf_counter()
+        response = await client.get("/analysis/health")
+        ms = (time.perf_counter() - start) * 1000
+        response.raise_for_status()
+        (busy if in_flight else quiet).append(ms)
+        await asyncio.sleep(interval)
+
+
+async def upload_all(client, files, concurrency):
+    """POST every file to /analyze; returns the failures"""
+    pending = list(files)
+    failures = []
+
+    async def client_loop():
+        while pending:
+            filename, data = pending.pop()
+            response = await client.post("/analyze", files={"file": (filename, data, "application/pdf")})
+            if response.status_code != 200:
+                failures.append(f"{filename}: HTTP {response.status_code}")
+
+    await asyncio.gather(*(client_loop() for _ in range(concurrency)))
+    return failures
+
+
+async def run(args, files):
+    # Settings the app reads at import time
+    if args.workers is not None:
+        os.environ["ANALYZER_WORKERS"] = str(args.workers)
+    os.environ["ANALYZER_PDF_BACKEND"] = args.backend
+    os.environ.setdefault("ANALYZER_JOBS_DB", "")
+    os.environ.setdefault("ANALYZER_LOG_LEVEL", "WARNING")
+    directory = tempfile.mkdtemp(prefix="bench-health-")
+    os.environ.setdefault("ANALYZER_INDEX_DB", os.path.join(directory, "index.sqlite3"))
+    import main as app_module
+    from workers import pool
+
+    transport = httpx.ASGITransport(app=app_module.app)
+    async with app_module.app.router.lifespan_context(app_module.app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            idle = []
+            for _ in range(IDLE_PROBES):
+                start = time.perf_counter()
+                (await client.get("/analysis/health")).raise_for_status()
+                idle.append((time.perf_counter() - start) * 1000)
+
+            quiet, busy = [], []
+            stop = asyncio.Event()
+            prober = asyncio.create_task(probe(client, quiet, busy, stop, args.interval, pool))
+            start = time.perf_counter()
+            try:
+                failures = await upload_all(client, files, args.concurrency)
+            finally:
+                stop.set()
+                await prober
+            elapsed = time.perf_counter() - start
+    return idle, busy, failures, elapsed
+
+
+def describe(latencies):
+    values = sorted(latencies)
+    return (f"{len(values):5d} probes  p50 {percentile(values, 0.5):7.1f} ms  "
+            f"p95 {percentile(values, 0.95):7.1f} ms  max {values[-1]:7.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--uploads", type=int, default=8, help="heavy uploads sent (default: 8)")
+    parser.add_argument("--concurrency", type=int, default=4, help="clients uploading at once (default: 4)")
+    parser.add_argument("--size", type=int, default=300, help="bullets per uploaded resume (default: 300)")
+    parser.add_argument("--backend", default="pdfplumber",
+                        help="ANALYZER_PDF_BACKEND (default: pdfplumber, the slower one)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="ANALYZER_WORKERS for the in-process app (0 = thread fallback)")
+    parser.add_argument("--interval", type=float, default=0.05, help="seconds between health probes")
+    parser.add_argument("--budget-ms", type=float, default=50,
+                        help="limit for the p95 health latency while the pool is busy (default: 50)")
+    args = parser.parse_args()
+
+    data = make_pdf(make_resume_text(args.size))
+    files = [(f"heavy-{number}.pdf", variant(data, "pdf", number)) for number in range(args.uploads)]
+    print(f"{args.uploads} uploads of {len(data) // 1024} KB, {args.concurrency} at once, backend {args.backend}")
+
+    idle, busy, failures, elapsed = asyncio.run(run(args, files))
+    print(f"uploads done in {elapsed:.1f} s ({args.uploads / elapsed:.1f}/s)")
+    print(f"health idle: {describe(idle)}")
+    if busy:
+        print(f"health busy: {describe(busy)}  (budget p95 {args.budget_ms:.0f} ms)")
+
+    failures = [f"upload failed: {failure}" for failure in failures]
+    if not busy:
+        failures.append("no health probe ran while pool tasks were in flight")
+    elif percentile(sorted(busy), 0.95) > args.budget_ms:
+        failures.append(f"p95 health latency {percentile(sorted(busy), 0.95):.1f} ms "
+                        f"exceeds the {args.budget_ms:.0f} ms budget (idle median {statistics.median(idle):.1f} ms)")
+
+    if not failures:
+        print("OK")
+        return 0
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,115 @@
+"""Benchmark: cold `import main` time, with a budget check for fast cold starts.
+
+Usage (from resume-analyzer/backend):
+    python benchmarks/bench_import_time.py [--runs 7] [--budget-ms 150] [--total-budget-ms 0]
+
+Every run imports main in a fresh interpreter. Two figures are reported:
+  total  the whole import, FastAPI included
+  app    the import with FastAPI/Starlette/pydantic already loaded, i.e. the
+         cost of this project's own modules and whatever they pull in
+
+The script exits with status 1 if the app median exceeds --budget-ms (or the
+total median exceeds --total-budget-ms, when given), or if importing main
+loads any of the LAZY_MODULES, which must only be imported on first use.
+On failure the slowest imports are listed (python -X importtime).
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Heavy libraries that only specific endpoints need
+LAZY_MODULES = ("pdfplumber", "pypdfium2", "docx", "reportlab", "numpy")
+
+PRELOAD = "import fastapi, fastapi.responses, fastapi.middleware.cors, starlette, pydantic"
+
+PROBE = """
+import json, sys, time
+{preload}
+start = time.perf_counter()
+import main
+elapsed = (time.perf_counter() - start) * 1000
+loaded = sorted(m for m in {lazy!r} if m in sys.modules)
+print(json.dumps({{"ms": elapsed, "loaded": loaded}}))
+"""
+
+
+def _probe(preload):
+    code = PROBE.format(preload=PRELOAD if preload else "", lazy=LAZY_MODULES)
+    env = dict(os.environ, ANALYZER_INDEX_DB="", ANALYZER_JOBS_DB="")
+    output = subprocess.run(
+        [sys.executable, "-c", code], cwd=BACKEND_DIR, env=env,
+        capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def _import_times(code):
+    env = dict(os.environ, ANALYZER_INDEX_DB="", ANALYZER_JOBS_DB="")
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True,
+    ).stderr
+    times = {}
+    for line in stderr.splitlines():
+        if line.startswith("import time:") and "cumulative" not in line:
+            _, cumulative, name = line.split("|")
+            times[name.strip()] = (int(cumulative) / 1000, name.rstrip())
+    return times
+
+
+def slowest_imports(limit=15):
+    """(cumulative ms, module) of the slowest imports main adds on top of FastAPI"""
+    preloaded = _import_times(PRELOAD)
+    times = _import_times(f"{PRELOAD}\nimport main")
+    rows = [row for name, row in times.items() if name not in preloaded]
+    return sorted(rows, reverse=True)[:limit]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=7)
+    parser.add_argument("--budget-ms", type=float, default=150,
+                        help="limit for the app's own import time (default: 150)")
+    parser.add_argument("--total-budget-ms", type=float, default=0,
+                        help="limit for the full import, FastAPI included (default: none)")
+    args = parser.parse_args()
+
+    totals, apps, loaded = [], [], set()
+    for _ in range(args.runs):
+        total = _probe(preload=False)
+        app = _probe(preload=True)
+        totals.append(total["ms"])
+        apps.append(app["ms"])
+        loaded.update(total["loaded"])
+
+    total_ms = statistics.median(totals)
+    app_ms = statistics.median(apps)
+    print(f"import main, total: median {total_ms:7.1f} ms  min {min(totals):7.1f} ms")
+    print(f"import main, app:   median {app_ms:7.1f} ms  min {min(apps):7.1f} ms  (budget {args.budget_ms:.0f} ms)")
+
+    failures = []
+    if loaded:
+        failures.append(f"import main loaded lazy modules: {', '.join(sorted(loaded))}")
+    if app_ms > args.budget_ms:
+        failures.append(f"app import time {app_ms:.0f} ms exceeds the {args.budget_ms:.0f} ms budget")
+    if args.total_budget_ms and total_ms > args.total_budget_ms:
+        failures.append(f"total import time {total_ms:.0f} ms exceeds the {args.total_budget_ms:.0f} ms budget")
+
+    if not failures:
+        print("OK")
+        return 0
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    print("\nslowest imports (cumulative ms):")
+    for ms, name in slowest_imports():
+        print(f"  {ms:8.1f}  {name}")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
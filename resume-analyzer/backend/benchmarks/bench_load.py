@@ -0,0 +1,438 @@
+"""Benchmark: end-to-end load and soak test of the API, with memory-leak detection.
+
+Usage (from resume-analyzer/backend):
+    python benchmarks/bench_load.py [--requests 500] [--concurrency 8] [--mix analyze=6,export=2,compare=1,search=1,health=1]
+    python benchmarks/bench_load.py --soak [--requests 5000] [--sample-every 100] [--workers 0]
+    python benchmarks/bench_load.py --url http://localhost:8000 [--pid SERVER_PID] ...
+
+By default the app runs in this process (httpx.ASGITransport, with its
+lifespan, so the worker pool and job runner behave as under uvicorn);
+--url drives a running server instead. --concurrency clients send requests
+back to back, each picking an endpoint by the --mix weights and a corpus
+file of the --sizes and --formats given. Every corpus file exists in
+--variants byte-level variants (a PDF comment or a ZIP comment appended),
+so the content-addressed cache does not answer every repeat; --variants 1
+measures the cached path. Reported per endpoint and overall: requests,
+errors (status >= 400 other than 429/503, or a failed request), rejections
+(429/503), throughput and p50/p95/p99 latency.
+
+--soak samples, every --sample-every requests, the RSS of the server
+process and of its children (the worker pool) and, in-process, the
+tracemalloc total. The first quarter of the samples is treated as warm-up
+(caches filling); over the rest, a least-squares slope above
+--leak-mb-per-1000 that also rises from third to third is flagged as a leak,
+and the allocation sites that grew most are listed. With --workers 0
+extraction and analysis run in this process too, so tracemalloc sees them.
+
+The script exits with status 1 if the error rate exceeds --max-error-rate
+or a leak is flagged. httpx is required (pip install httpx).
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from corpus import DENSITIES, SEED, make_docx, make_pdf, make_resume_text  # noqa: E402
+
+DEFAULT_MIX = "analyze=6,export=2,compare=1,search=1,health=1"
+
+JOB_DESCRIPTION = (
+    "Senior backend engineer. Python, FastAPI and PostgreSQL; Docker, Kubernetes and AWS. "
+    "Experience with machine learning pipelines and mentoring a team is a plus."
+)
+
+CONTENT_TYPES = {
+    "pdf": "application/pdf",
+    "docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+}
+
+
+def variant(data, kind, number):
+    """A byte-level variant of a PDF/DOCX that extracts to the same text"""
+    marker = f"load-test variant {number}".encode()
+    if kind == "pdf":
+        return data + b"\n%" + marker + b"\n"
+    # Set the ZIP comment: the end-of-central-directory record ends with its length
+    if data[-22:-18] != b"PK\x05\x06":
+        raise ValueError("DOCX has an unexpected ZIP trailer")
+    return data[:-2] + len(marker).to_bytes(2, "little") + marker
+
+
+def build_files(sizes, formats, variants):
+    """{(size, format): [(filename, data, content type), ...]} over the densities of the corpus"""
+    files = {}
+    for size in sizes:
+        for kind in formats:
+            entries = files.setdefault((size, kind), [])
+            for density in DENSITIES:
+                text = make_resume_text(size, density, SEED)
+                data = make_pdf(text) if kind == "pdf" else make_docx(text)
+                for number in range(variants):
+                    entries.append((f"{size}-{density}-{number}.{kind}", variant(data, kind, number),
+                                    CONTENT_TYPES[kind]))
+    return files
+
+
+# Endpoint name -> function(rng, pick_file) returning (method, url, httpx request kwargs)
+ENDPOINTS = {
+    "analyze": lambda rng, pick: ("POST", "/analyze", {"files": {"file": pick()}}),
+    "export": lambda rng, pick: ("POST", "/analysis/export", {"files": {"file": pick()}}),
+    "compare": lambda rng, pick: ("POST", "/analysis/compare",
+                                  {"files": [("files", pick()) for _ in range(2)]}),
+    "bulk": lambda rng, pick: ("POST", "/analysis/bulk",
+                               {"files": [("files", pick()) for _ in range(4)]}),
+    "match": lambda rng, pick: ("POST", "/analysis/match",
+                                {"files": [("files", pick())], "data": {"job_description": JOB_DESCRIPTION}}),
+    "search": lambda rng, pick: ("GET", "/analysis/search",
+                                 {"params": {"q": rng.choice(["python, aws", "machine learning", "react"])}}),
+    "health": lambda rng, pick: ("GET", "/analysis/health", {}),
+}
+
+
+def parse_mix(text):
+    """{endpoint: weight} from "analyze=6,health=1" """
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in ENDPOINTS:
+            raise ValueError(f"unknown endpoint {name!r} (choose from {', '.join(ENDPOINTS)})")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an ascending list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+class LoadStats:
+    """Latencies and outcomes per endpoint"""
+
+    def __init__(self):
+        self.latencies = {}
+        self.outcomes = {}
+        self.start = time.perf_counter()
+        self.end = None
+
+    def record(self, endpoint, ms, outcome):
+        self.latencies.setdefault(endpoint, []).append(ms)
+        counts = self.outcomes.setdefault(endpoint, {"ok": 0, "error": 0, "rejected": 0})
+        counts[outcome] += 1
+
+    def summary(self):
+        elapsed = (self.end or time.perf_counter()) - self.start
+        rows = {}
+        all_latencies = []
+        totals = {"ok": 0, "error": 0, "rejected": 0}
+        for endpoint, latencies in self.latencies.items():
+            all_latencies.extend(latencies)
+            for outcome, count in self.outcomes[endpoint].items():
+                totals[outcome] += count
+            rows[endpoint] = self._row(latencies, self.outcomes[endpoint], elapsed)
+        rows["all"] = self._row(all_latencies, totals, elapsed)
+        return {"seconds": round(elapsed, 2), "endpoints": rows}
+
+    @staticmethod
+    def _row(latencies, outcomes, elapsed):
+        ordered = sorted(latencies)
+        requests = len(ordered)
+        return {
+            "requests": requests,
+            "errors": outcomes["error"],
+            "rejected": outcomes["rejected"],
+            "error_rate": round(outcomes["error"] / requests, 4) if requests else 0.0,
+            "throughput_rps": round(requests / elapsed, 2) if elapsed > 0 else 0.0,
+            "p50_ms": round(percentile(ordered, 0.50), 2),
+            "p95_ms": round(percentile(ordered, 0.95), 2),
+            "p99_ms": round(percentile(ordered, 0.99), 2),
+            "max_ms": round(ordered[-1], 2) if ordered else 0.0,
+        }
+
+
+# Memory of the server process tree (Linux /proc)
+
+def _status_rss(pid):
+    try:
+        with open(f"/proc/{pid}/status") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+def _children(pid):
+    children = []
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as stat:
+                # The command name may contain spaces; the parent pid follows its closing ")"
+                fields = stat.read().rsplit(")", 1)[1].split()
+        except OSError:
+            continue
+        if int(fields[1]) == pid:
+            children.append(int(entry))
+    return children
+
+
+def process_memory(pid):
+    """(RSS of pid, total RSS of its child processes) in bytes; None where unknown"""
+    rss = _status_rss(pid)
+    if rss is None:
+        return None, None
+    return rss, sum(_status_rss(child) or 0 for child in _children(pid))
+
+
+class MemorySampler:
+    """RSS (and tracemalloc, in-process) samples taken every `every` requests"""
+
+    def __init__(self, pid, every, trace):
+        self.pid = pid
+        self.every = every
+        self.trace = trace
+        self.samples = []
+        self.baseline_snapshot = None
+
+    def maybe_sample(self, completed):
+        if completed % self.every:
+            return
+        rss, children = process_memory(self.pid) if self.pid else (None, None)
+        sample = {"requests": completed, "rss": rss, "children_rss": children}
+        if self.trace:
+            sample["traced"] = tracemalloc.get_traced_memory()[0]
+        self.samples.append(sample)
+
+    def take_baseline(self):
+        if self.trace:
+            self.baseline_snapshot = tracemalloc.take_snapshot()
+
+    def top_growth(self, limit=10):
+        """(size growth in bytes, count growth, traceback line) of the allocation sites that grew most"""
+        if self.baseline_snapshot is None:
+            return []
+        snapshot = tracemalloc.take_snapshot()
+        stats = snapshot.compare_to(self.baseline_snapshot, "lineno")
+        return [(stat.size_diff, stat.count_diff, str(stat.traceback)) for stat in stats[:limit]
+                if stat.size_diff > 0]
+
+
+def growth_per_1000(samples, key):
+    """Least-squares slope of samples[key] in MB per 1000 requests"""
+    points = [(sample["requests"], sample[key]) for sample in samples if sample.get(key) is not None]
+    if len(points) < 2:
+        return None
+    xs = [x for x, _ in points]
+    ys = [y / 1024 / 1024 for _, y in points]
+    mean_x, mean_y = statistics.fmean(xs), statistics.fmean(ys)
+    variance = sum((x - mean_x) ** 2 for x in xs)
+    if not variance:
+        return None
+    return sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / variance * 1000
+
+
+def detect_leaks(samples, threshold_mb):
+    """{series: {"mb_per_1000": slope, "leak": bool}} over the samples after warm-up"""
+    steady = samples[len(samples) // 4:]
+    report = {}
+    for key in ("rss", "children_rss", "traced"):
+        slope = growth_per_1000(steady, key)
+        if slope is None:
+            continue
+        values = [sample[key] for sample in steady]
+        third = max(1, len(values) // 3)
+        medians = [statistics.median(values[:third]), statistics.median(values[third:-third] or values),
+                   statistics.median(values[-third:])]
+        sustained = medians[0] < medians[1] < medians[2]
+        report[key] = {"mb_per_1000": round(slope, 3), "leak": slope > threshold_mb and sustained}
+    return report
+
+
+async def run_load(client, mix, files, requests, concurrency, seed, sampler=None, warmup=0):
+    """Send warmup + requests requests from `concurrency` clients; returns LoadStats of the measured ones"""
+    rng = random.Random(seed)
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    pools = list(files.values())
+    sent = 0
+    completed = 0
+    stats = None
+
+    def pick():
+        return rng.choice(rng.choice(pools))
+
+    async def client_loop():
+        nonlocal sent, completed, stats
+        while sent < warmup + requests:
+            number = sent
+            sent += 1
+            if number >= warmup and stats is None:
+                # The measured run starts with its first request
+                stats = LoadStats()
+                if sampler is not None:
+                    sampler.take_baseline()
+            endpoint = rng.choices(names, weights)[0]
+            method, url, kwargs = ENDPOINTS[endpoint](rng, pick)
+            start = time.perf_counter()
+            try:
+                response = await client.request(method, url, **kwargs)
+                status = response.status_code
+            except httpx.HTTPError:
+                status = None
+            ms = (time.perf_counter() - start) * 1000
+            if number < warmup:
+                continue
+            if status is None or (status >= 400 and status not in (429, 503)):
+                outcome = "error"
+            else:
+                outcome = "rejected" if status in (429, 503) else "ok"
+            stats.record(endpoint, ms, outcome)
+            completed += 1
+            if sampler is not None:
+                sampler.maybe_sample(completed)
+
+    await asyncio.gather(*(client_loop() for _ in range(concurrency)))
+    stats = stats or LoadStats()
+    stats.end = time.perf_counter()
+    return stats
+
+
+async def run_in_process(args, mix, files, sampler):
+    # Settings the app reads at import time
+    if args.workers is not None:
+        os.environ["ANALYZER_WORKERS"] = str(args.workers)
+    os.environ.setdefault("ANALYZER_JOBS_DB", "")
+    os.environ.setdefault("ANALYZER_LOG_LEVEL", "WARNING")
+    directory = tempfile.mkdtemp(prefix="bench-load-")
+    os.environ.setdefault("ANALYZER_INDEX_DB", os.path.join(directory, "index.sqlite3"))
+    import main as app_module
+
+    transport = httpx.ASGITransport(app=app_module.app)
+    async with app_module.app.router.lifespan_context(app_module.app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            return await run_load(client, mix, files, args.requests, args.concurrency, args.seed,
+                                  sampler, args.warmup)
+
+
+async def run_remote(args, mix, files, sampler):
+    limits = httpx.Limits(max_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.url, timeout=None, limits=limits) as client:
+        return await run_load(client, mix, files, args.requests, args.concurrency, args.seed,
+                              sampler, args.warmup)
+
+
+def print_summary(summary):
+    print(f"{'endpoint':<10} {'requests':>9} {'errors':>7} {'rejected':>9} {'req/s':>8} "
+          f"{'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for endpoint, row in summary["endpoints"].items():
+        print(f"{endpoint:<10} {row['requests']:9d} {row['errors']:7d} {row['rejected']:9d} "
+              f"{row['throughput_rps']:8.1f} {row['p50_ms']:9.1f} {row['p95_ms']:9.1f} "
+              f"{row['p99_ms']:9.1f} {row['max_ms']:9.1f}")
+
+
+def print_memory(samples, leaks, growth):
+    mb = lambda value: f"{value / 1024 / 1024:8.1f}" if value is not None else f"{'-':>8}"  # noqa: E731
+    print(f"\n{'requests':>9} {'rss MB':>8} {'workers MB':>11} {'traced MB':>10}")
+    step = max(1, len(samples) // 12)
+    for sample in samples[::step]:
+        print(f"{sample['requests']:9d} {mb(sample['rss'])} {mb(sample['children_rss']):>11} "
+              f"{mb(sample.get('traced')):>10}")
+    for key, result in leaks.items():
+        flag = "  LEAK" if result["leak"] else ""
+        print(f"{key}: {result['mb_per_1000']:+.3f} MB per 1000 requests after warm-up{flag}")
+    if growth:
+        print("\ntop allocation growth since warm-up:")
+        for size, count, where in growth:
+            print(f"  {size / 1024:+10.1f} KB {count:+8d} blocks  {where}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", help="base URL of a running server (default: run the app in-process)")
+    parser.add_argument("--pid", type=int, help="server pid whose memory --soak samples (with --url)")
+    parser.add_argument("--requests", type=int, default=None,
+                        help="measured requests (default: 500, 5000 with --soak)")
+    parser.add_argument("--warmup", type=int, default=20, help="unmeasured requests sent first (default: 20)")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"endpoint weights (default: {DEFAULT_MIX})")
+    parser.add_argument("--sizes", default="small,medium,large", help="corpus sizes to upload")
+    parser.add_argument("--formats", default="pdf,docx", help="file formats to upload")
+    parser.add_argument("--variants", type=int, default=20,
+                        help="distinct byte variants of every corpus file (default: 20)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="ANALYZER_WORKERS for the in-process app (0 = analysis in this process)")
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("--soak", action="store_true", help="track memory and flag sustained growth")
+    parser.add_argument("--sample-every", type=int, default=100, help="requests between memory samples")
+    parser.add_argument("--leak-mb-per-1000", type=float, default=2.0,
+                        help="sustained growth flagged as a leak (default: 2 MB per 1000 requests)")
+    parser.add_argument("--max-error-rate", type=float, default=0.01)
+    parser.add_argument("--save", metavar="PATH", help="write the results as JSON")
+    args = parser.parse_args()
+
+    if args.requests is None:
+        args.requests = 5000 if args.soak else 500
+    mix = parse_mix(args.mix)
+    files = build_files(args.sizes.split(","), args.formats.split(","), max(1, args.variants))
+
+    sampler = None
+    if args.soak:
+        in_process = args.url is None
+        if in_process:
+            tracemalloc.start()
+        sampler = MemorySampler(os.getpid() if in_process else args.pid, args.sample_every, in_process)
+
+    runner = run_remote if args.url else run_in_process
+    stats = asyncio.run(runner(args, mix, files, sampler))
+    summary = stats.summary()
+    print_summary(summary)
+
+    failures = []
+    error_rate = summary["endpoints"]["all"]["error_rate"]
+    if error_rate > args.max_error_rate:
+        failures.append(f"error rate {error_rate:.2%} exceeds {args.max_error_rate:.2%}")
+
+    results = {"config": {key: value for key, value in vars(args).items()}, "load": summary}
+    if sampler is not None:
+        leaks = detect_leaks(sampler.samples, args.leak_mb_per_1000)
+        growth = sampler.top_growth()
+        print_memory(sampler.samples, leaks, growth)
+        failures.extend(f"sustained {key} growth of {result['mb_per_1000']:.2f} MB per 1000 requests"
+                        for key, result in leaks.items() if result["leak"])
+        results["memory"] = {"samples": sampler.samples, "leaks": leaks,
+                             "top_growth": [{"bytes": size, "blocks": count, "where": where}
+                                            for size, count, where in growth]}
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nresults written to {args.save}")
+
+    if not failures:
+        print("\nOK")
+        return 0
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,92 @@
+"""Benchmark: /analyze payload size and JSON serialization time per response mode.
+
+Usage (from resume-analyzer/backend):
+    python benchmarks/bench_payload.py [--repeat 200] [--fields ats_score,completeness]
+
+For every corpus case the /analyze result is built once and shaped as the
+endpoint would for the full response, ?compact=true and ?fields=. Each mode
+reports its size raw, gzipped and (if the brotli package is installed)
+brotli-compressed, and how long serializing it takes with:
+  json      json.dumps, as FastAPI's default JSONResponse does
+  encoder   jsonable_encoder + json.dumps, what a returned dict costs
+  dumps     responses.dumps (orjson when installed), used by FastJSONResponse
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+import zlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+
+from corpus import build_corpus  # noqa: E402
+from responses import BROTLI_QUALITY, GZIP_LEVEL, brotli, dumps, orjson, parse_fields, shape_result  # noqa: E402
+from tasks import build_sectioned_analysis  # noqa: E402
+
+
+def _json(content):
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+SERIALIZERS = {
+    "json": _json,
+    "encoder": lambda content: _json(jsonable_encoder(content)),
+    "dumps": dumps,
+}
+
+
+def sizes(body):
+    """Raw, gzip and brotli (None without the package) sizes of a body"""
+    gzipper = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+    gzipped = gzipper.compress(body) + gzipper.flush()
+    brotlied = brotli.compress(body, quality=BROTLI_QUALITY) if brotli is not None else None
+    return len(body), len(gzipped), len(brotlied) if brotlied is not None else None
+
+
+def time_serializer(serialize, content, repeat):
+    """Median milliseconds of serialize(content)"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        serialize(content)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--fields", default="ats_score,completeness,missing_sections",
+                        help="field selection used for the fields mode")
+    args = parser.parse_args()
+
+    fields = parse_fields(args.fields)
+    modes = {
+        "full": lambda result: result,
+        "compact": lambda result: shape_result(result, compact=True),
+        "fields": lambda result: shape_result(result, fields),
+    }
+    print(f"serializer: {'orjson' if orjson is not None else 'json'}, "
+          f"brotli: {'yes' if brotli is not None else 'not installed'}")
+    print(f"{'case/mode':<22} {'raw':>8} {'gzip':>7} {'br':>7} "
+          + " ".join(f"{name + ' ms':>10}" for name in SERIALIZERS))
+    for case in build_corpus():
+        result, _, _ = build_sectioned_analysis({"text": case["text"]}, "resume.pdf", {})
+        result = dict(result, diff=None)
+        for mode, shape in modes.items():
+            content = shape(result)
+            raw, gzipped, brotlied = sizes(dumps(content))
+            timings = [time_serializer(serialize, content, args.repeat) for serialize in SERIALIZERS.values()]
+            brotli_text = f"{brotlied:7d}" if brotlied is not None else f"{'-':>7}"
+            print(f"{case['name'] + '/' + mode:<22} {raw:8d} {gzipped:7d} {brotli_text} "
+                  + " ".join(f"{ms:10.3f}" for ms in timings))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
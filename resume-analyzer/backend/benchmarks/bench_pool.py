@@ -0,0 +1,102 @@
+"""Benchmark: pool analytics (similarity, neighbors, coverage, clustering) on a synthetic index.
+
+Usage (from resume-analyzer/backend):
+    python benchmarks/bench_pool.py [--resumes 5000] [--repeat 5]
+
+A temporary search index is filled with --resumes resumes whose skills are
+drawn from a few overlapping role profiles, so clusters and neighbors are
+meaningful. Reported per operation: the median and minimum wall time of
+--repeat runs; "matrix build" is the one-off load of the index into the
+NumPy skill matrix that the other operations share.
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analytics import (  # noqa: E402
+    build_skill_matrix, kmeans_clusters, most_similar_pairs, nearest_neighbors, skill_coverage,
+)
+from analyzer import SKILLS_DATABASE  # noqa: E402
+from search import ResumeIndex  # noqa: E402
+
+SEED = 1234
+
+# Role profiles: skill categories a synthetic resume mostly draws from
+PROFILES = (
+    ("Programming Languages", "Frameworks & Libraries"),
+    ("Programming Languages", "Cloud & DevOps"),
+    ("Data & AI", "Programming Languages"),
+    ("Soft Skills",),
+)
+
+
+def synthetic_skills(rng):
+    """advanced_skill_extractor-like output for one synthetic resume"""
+    categories = rng.choice(PROFILES)
+    skills = {}
+    for category in categories:
+        names = list(SKILLS_DATABASE[category])
+        for name in rng.sample(names, rng.randint(1, len(names))):
+            skills[name] = category
+    # A little noise from the rest of the taxonomy
+    for category, names in SKILLS_DATABASE.items():
+        if rng.random() < 0.2:
+            skills.setdefault(rng.choice(list(names)), category)
+    return [
+        {"skill": name, "category": category, "confidence": round(0.4 * rng.randint(1, 10), 1)}
+        for name, category in skills.items()
+    ]
+
+
+def fill_index(index, resumes, seed=SEED):
+    rng = random.Random(seed)
+    entries = [(f"resume-{i}.pdf", f"synthetic resume {i}", synthetic_skills(rng)) for i in range(resumes)]
+    return index.add_many(entries)
+
+
+def time_call(call, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        call()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--resumes", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        index = ResumeIndex(os.path.join(directory, "index.sqlite3"))
+        resume_ids = fill_index(index, args.resumes)
+        table = index.skill_table()
+        matrix = build_skill_matrix(*table)
+        targets = [("python", 4.0), ("aws", 3.0), ("docker", 2.5), ("rust", 2.0), ("leadership", 2.0)]
+
+        benchmarks = {
+            "matrix build": lambda: build_skill_matrix(*index.skill_table()),
+            "most similar pairs (k=20)": lambda: most_similar_pairs(matrix, 20),
+            "nearest neighbors (k=10)": lambda: nearest_neighbors(matrix, resume_ids[0], 10),
+            "skill coverage (5 skills)": lambda: skill_coverage(matrix, targets),
+            "k-means (k=5)": lambda: kmeans_clusters(matrix, 5),
+        }
+        print(f"pool: {len(matrix)} resumes x {len(matrix.skills)} skills")
+        print(f"{'operation':<28} {'median (ms)':>12} {'min (ms)':>10}")
+        for name, call in benchmarks.items():
+            timings = time_call(call, args.repeat)
+            print(f"{name:<28} {statistics.median(timings):12.1f} {min(timings):10.1f}")
+        index.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,97 @@
+"""Benchmark: search index add/query latency on a synthetic resume corpus.
+
+Usage (from resume-analyzer/backend):
+    python benchmarks/bench_search.py [--resumes 100000] [--db /tmp/bench_index.sqlite3]
+
+Builds an index of generated resumes (skills drawn from SKILLS_DATABASE plus
+filler vocabulary), then times single adds, deletes and typical queries.
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analyzer import SKILLS_DATABASE, advanced_skill_extractor  # noqa: E402
+from search import ResumeIndex  # noqa: E402
+
+FILLER = ("developed managed designed built improved reduced optimized led team project "
+          "customer platform service pipeline system product feature release quality delivery "
+          "stakeholder requirement analysis report migration performance scalable reliable").split()
+
+QUERIES = [
+    "python",
+    "python, aws",
+    "machine learning, tensorflow",
+    "react, javascript, node",
+    "kubernetes, docker, terraform",
+    "project management, leadership",
+    "c++, rust",
+    "scalable platform migration",
+]
+
+
+def synthetic_resume(rng, variations):
+    skills = rng.sample(variations, rng.randint(3, 12))
+    words = [rng.choice(FILLER) for _ in range(rng.randint(150, 400))]
+    for skill in skills:
+        words.insert(rng.randrange(len(words)), skill)
+    return " ".join(words)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--resumes", type=int, default=100000)
+    parser.add_argument("--db", default="/tmp/bench_index.sqlite3")
+    parser.add_argument("--batch", type=int, default=1000)
+    args = parser.parse_args()
+
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(args.db + suffix):
+            os.remove(args.db + suffix)
+
+    rng = random.Random(7)
+    variations = [v for skills in SKILLS_DATABASE.values() for vs in skills.values() for v in vs]
+    index = ResumeIndex(args.db)
+
+    start = time.perf_counter()
+    batch = []
+    for i in range(args.resumes):
+        text = synthetic_resume(rng, variations)
+        batch.append((f"resume_{i}.pdf", text, advanced_skill_extractor(text)))
+        if len(batch) >= args.batch:
+            index.add_many(batch)
+            batch = []
+    if batch:
+        index.add_many(batch)
+    build = time.perf_counter() - start
+    print(f"indexed {args.resumes} resumes in {build:.1f} s "
+          f"({args.resumes / build:.0f}/s incl. skill extraction), "
+          f"{os.path.getsize(args.db) / 1024 / 1024:.0f} MB")
+
+    text = synthetic_resume(rng, variations)
+    skills = advanced_skill_extractor(text)
+    start = time.perf_counter()
+    resume_id = index.add("single.pdf", text, skills)
+    print(f"single add: {(time.perf_counter() - start) * 1000:.2f} ms")
+    start = time.perf_counter()
+    index.delete(resume_id)
+    print(f"single delete: {(time.perf_counter() - start) * 1000:.2f} ms")
+
+    print(f"{'query':<36} {'p50 (ms)':>9} {'max (ms)':>9}")
+    for query in QUERIES:
+        timings = []
+        for _ in range(20):
+            start = time.perf_counter()
+            index.search(query, k=10)
+            timings.append((time.perf_counter() - start) * 1000)
+        print(f"{query:<36} {statistics.median(timings):9.2f} {max(timings):9.2f}")
+
+    index.close()
+
+
+if __name__ == "__main__":
+    main()
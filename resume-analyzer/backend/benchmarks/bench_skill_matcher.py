@@ -0,0 +1,147 @@
+"""Benchmark: compiled skill matcher vs the legacy per-variation regex loop.
+
+Usage (from resume-analyzer/backend):
+    python benchmarks/bench_skill_matcher.py [--sizes 100,1000,5000,20000] [--legacy-max 5000]
+
+For every taxonomy size the script times the legacy loop and the compiled
+matcher on the same document and checks that both return identical output.
+The matcher's scan time should stay flat as the taxonomy grows.
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analyzer import SKILLS_DATABASE  # noqa: E402
+from matcher import SkillMatcher  # noqa: E402
+
+SAMPLE_RESUME = """
+John Doe - Software Engineer
+Email: john@example.com | Phone: 555-0100 | LinkedIn: linkedin.com/in/johndoe
+
+Summary
+Backend engineer with 6+ years building Python and Go services on AWS.
+
+Experience
+Senior Engineer, Acme Corp (2019 - present)
+- Developed REST APIs with Django, FastAPI and Flask serving 2M requests/day
+- Led migration of 40 services to Docker and Kubernetes (k8s), reducing costs by 30%
+- Implemented CI/CD pipelines in Jenkins and Terraform for three product teams
+- Managed a team of 5 engineers using agile and scrum practices
+
+Engineer, Initech (2016 - 2019)
+- Built data analysis tooling with pandas, numpy and PostgreSQL
+- Created machine learning prototypes in PyTorch and TensorFlow
+- Improved C++ and C# integration layers with .NET services
+
+Education
+B.Sc. Computer Science, State University
+
+Skills
+Python, Go, JavaScript, React, Redux, Node, SQL, MongoDB, AWS, GCP, Azure,
+Docker, Kubernetes, Terraform, communication, leadership, problem solving
+"""
+
+
+def legacy_skill_extractor(text, skills_database):
+    """Reference copy of the original per-variation regex implementation"""
+    text_lower = text.lower()
+    detected_skills = []
+
+    for category, skills in skills_database.items():
+        for skill_name, variations in skills.items():
+            confidence = 0
+            matches = []
+
+            for variation in variations:
+                if re.search(r'\b' + re.escape(variation) + r'\b', text_lower):
+                    confidence += 0.8
+                    matches.append(variation)
+                elif variation in text_lower:
+                    confidence += 0.4
+                    matches.append(variation)
+
+            if confidence > 0.3:
+                detected_skills.append({
+                    "skill": skill_name,
+                    "category": category,
+                    "confidence": round(confidence, 2),
+                    "matches": matches,
+                    "variations_found": len(matches)
+                })
+
+    detected_skills.sort(key=lambda x: x["confidence"], reverse=True)
+    return detected_skills
+
+
+def synthetic_taxonomy(size, seed=42):
+    """SKILLS_DATABASE plus `size` random skills with 1-4 variations each"""
+    rng = random.Random(seed)
+    alphabet = "abcdefghijklmnopqrstuvwxyz"
+    taxonomy = {category: dict(skills) for category, skills in SKILLS_DATABASE.items()}
+    generated = {}
+    for i in range(size):
+        variations = []
+        for _ in range(rng.randint(1, 4)):
+            words = ["".join(rng.choice(alphabet) for _ in range(rng.randint(4, 10)))
+                     for _ in range(rng.randint(1, 3))]
+            variations.append(" ".join(words))
+        generated[f"skill {i}"] = variations
+    taxonomy["Generated"] = generated
+    return taxonomy
+
+
+def best_of(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="0,100,1000,5000,20000")
+    parser.add_argument("--legacy-max", type=int, default=5000,
+                        help="skip the (slow) legacy loop above this taxonomy size")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--doc-copies", type=int, default=3,
+                        help="repeat the sample resume to make the document longer")
+    args = parser.parse_args()
+
+    text = SAMPLE_RESUME * args.doc_copies
+    print(f"document: {len(text)} chars")
+    print(f"{'skills':>8} {'build (ms)':>11} {'matcher (ms)':>13} {'legacy (ms)':>12}  same output")
+
+    for size in (int(s) for s in args.sizes.split(",")):
+        taxonomy = synthetic_taxonomy(size)
+
+        start = time.perf_counter()
+        matcher = SkillMatcher(taxonomy)
+        build = time.perf_counter() - start
+
+        result = matcher.extract(text.lower())
+        matcher_time = best_of(lambda: matcher.extract(text.lower()), args.repeat)
+
+        if size <= args.legacy_max:
+            expected = legacy_skill_extractor(text, taxonomy)
+            legacy_time = best_of(lambda: legacy_skill_extractor(text, taxonomy), 1)
+            legacy_col = f"{legacy_time * 1000:12.1f}"
+            same = "yes" if result == expected else "NO"
+        else:
+            legacy_col = f"{'skipped':>12}"
+            same = "-"
+
+        total = sum(len(skills) for skills in taxonomy.values())
+        print(f"{total:>8} {build * 1000:11.1f} {matcher_time * 1000:13.2f} {legacy_col}  {same}")
+        if same == "NO":
+            sys.exit("matcher output differs from the legacy implementation")
+
+
+if __name__ == "__main__":
+    main()
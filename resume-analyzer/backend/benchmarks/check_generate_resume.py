@@ -0,0 +1,133 @@
+"""Check: concurrent /generate_resume requests get their own report and leave no files behind.
+
+Usage (from resume-analyzer/backend):
+    python benchmarks/check_generate_resume.py [--requests 40] [--concurrency 40] [--workers 4]
+
+The app runs in this process (httpx.ASGITransport, with its lifespan, so the
+worker pool starts as under uvicorn). --requests distinct uploads, PDFs and
+DOCX files alternating, are sent --concurrency at a time; each one's first
+line names its candidate with a unique marker ("Candidate 0007"). Uploads
+turned away with 429 or 503 (admission limit or pool queue full) are sent
+again after a short pause, so every upload is checked:
+  own report  the returned PDF holds the upload's marker and no other
+  no files    the temp directory and the working directory hold no new
+              entries afterwards (reports are rendered in memory)
+
+The script exits with status 1 on any mismatch, failed request or left-over file.
+"""
+import argparse
+import asyncio
+import os
+import re
+import sys
+import tempfile
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from corpus import make_docx, make_pdf, make_resume_text  # noqa: E402
+
+CONTENT_TYPES = {
+    "pdf": "application/pdf",
+    "docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+}
+MARKER = re.compile(r"Candidate (\d{4})")
+RETRY_DELAY = 0.2
+
+
+def build_uploads(count, size):
+    """(filename, data, content type, marker number) per upload, each with its own candidate"""
+    base = make_resume_text(size)
+    uploads = []
+    for number in range(count):
+        text = f"Candidate {number:04d}\n{base}"
+        kind = "pdf" if number % 2 == 0 else "docx"
+        data = make_pdf(text) if kind == "pdf" else make_docx(text)
+        uploads.append((f"resume-{number:04d}.{kind}", data, CONTENT_TYPES[kind], f"{number:04d}"))
+    return uploads
+
+
+def directory_entries():
+    return set(os.listdir(tempfile.gettempdir())), set(os.listdir(os.getcwd()))
+
+
+async def generate(client, upload, semaphore):
+    """The report for one upload; rejections (429/503) are retried"""
+    filename, data, content_type, _ = upload
+    while True:
+        async with semaphore:
+            response = await client.post("/generate_resume", files={"file": (filename, data, content_type)})
+        if response.status_code not in (429, 503):
+            return response
+        await asyncio.sleep(RETRY_DELAY)
+
+
+async def run(args, uploads):
+    # Settings the app reads at import time
+    if args.workers is not None:
+        os.environ["ANALYZER_WORKERS"] = str(args.workers)
+    os.environ["ANALYZER_JOBS_DB"] = ""
+    os.environ["ANALYZER_INDEX_DB"] = ""
+    os.environ.setdefault("ANALYZER_LOG_LEVEL", "WARNING")
+    import main as app_module
+
+    semaphore = asyncio.Semaphore(args.concurrency)
+    transport = httpx.ASGITransport(app=app_module.app)
+    async with app_module.app.router.lifespan_context(app_module.app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            return await asyncio.gather(*(generate(client, upload, semaphore) for upload in uploads))
+
+
+def check_report(upload, response):
+    """Failure message for one response, or None"""
+    from extraction import extract_pdf_document
+
+    filename, _, _, marker = upload
+    if response.status_code != 200:
+        return f"{filename}: HTTP {response.status_code}"
+    if response.headers.get("content-type") != "application/pdf":
+        return f"{filename}: content type {response.headers.get('content-type')}"
+    try:
+        text = extract_pdf_document(response.content)["text"]
+    except Exception as e:
+        return f"{filename}: report is not a readable PDF ({type(e).__name__})"
+    markers = set(MARKER.findall(text))
+    if markers != {marker}:
+        return f"{filename}: report names candidates {sorted(markers) or 'none'}, expected {marker}"
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=40)
+    parser.add_argument("--concurrency", type=int, default=40, help="requests in flight at once (default: 40)")
+    parser.add_argument("--size", type=int, default=12, help="bullets per uploaded resume (default: 12)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="ANALYZER_WORKERS for the in-process app (0 = thread fallback)")
+    args = parser.parse_args()
+
+    uploads = build_uploads(args.requests, args.size)
+    temp_before, cwd_before = directory_entries()
+    responses = asyncio.run(run(args, uploads))
+    temp_after, cwd_after = directory_entries()
+
+    failures = [failure for failure in map(check_report, uploads, responses) if failure]
+    print(f"{len(uploads)} reports, {len(uploads) - len(failures)} with only their own candidate")
+    for directory, before, after in ((tempfile.gettempdir(), temp_before, temp_after),
+                                     (os.getcwd(), cwd_before, cwd_after)):
+        left = sorted(after - before)
+        if left:
+            failures.append(f"files left in {directory}: {', '.join(left)}")
+
+    if not failures:
+        print("OK")
+        return 0
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
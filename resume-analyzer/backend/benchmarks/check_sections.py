@@ -0,0 +1,99 @@
+"""Check: section headings, found sections and ATS scores of the sample resumes.
+
+Usage (from resume-analyzer/backend):
+    python benchmarks/check_sections.py [--backend pdfium] [--backend pdfplumber]
+
+Both sample PDFs are extracted with every PDF backend (default: all) and
+analyzed as /analyze would. For each one the script compares:
+  headings  the layout's heading lines and the sections each one names
+  sections  the sections found, which must include the ones found before
+            the layout model (substring matching over the whole text)
+  ats       the ATS score, which must not fall below that baseline
+
+The script exits with status 1 on any difference and prints "OK" otherwise.
+"""
+import argparse
+import os
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from analyzer import calculate_ats_score, detect_sections_advanced, get_context  # noqa: E402
+from extraction import PDF_BACKENDS, extract_pdf_document  # noqa: E402
+
+# Expected per sample: heading lines with the sections they name, and the
+# sections and ATS score per backend before the layout model.
+# structured_resume.pdf mentioned "certifications" only in its Education
+# bullets, so the baseline's certifications section is not expected there.
+SAMPLES = {
+    "RESUME.pdf": {
+        "path": os.path.join(BACKEND_DIR, "..", "..", "RESUME.pdf"),
+        "headings": [
+            ("Skills", ("skills",)),
+            ("Education", ("education",)),
+            ("Experience and certifications", ("experience", "certifications")),
+            ("Projects", ("projects",)),
+        ],
+        "sections": ["experience", "education", "skills", "projects", "certifications"],
+        "ats_score": {"pdfium": 75, "pdfplumber": 75},
+    },
+    "structured_resume.pdf": {
+        "path": os.path.join(BACKEND_DIR, "structured_resume.pdf"),
+        "headings": [
+            ("CONTACT INFORMATION", ("contact",)),
+            ("PROFESSIONAL SUMMARY", ("summary",)),
+            ("TECHNICAL SKILLS", ("skills",)),
+            ("PROFESSIONAL EXPERIENCE", ("experience",)),
+            ("EDUCATION", ("education",)),
+            ("KEY ACHIEVEMENTS", ("projects",)),
+        ],
+        "sections": ["contact", "summary", "experience", "education", "skills", "projects"],
+        "ats_score": {"pdfium": 100, "pdfplumber": 88},
+    },
+}
+
+
+def check_sample(name, sample, backend):
+    """Failure messages for one sample extracted with one backend"""
+    with open(sample["path"], "rb") as f:
+        document = extract_pdf_document(f.read(), backend=backend)
+    ctx = get_context(document["text"], document["line_styles"])
+    headings = [(section.heading, section.names) for section in ctx.layout.sections if section.heading is not None]
+    found, _ = detect_sections_advanced(ctx)
+    score, _ = calculate_ats_score(ctx)
+    print(f"{name:<22} {backend:<11} styles {'yes' if document['line_styles'] else 'no ':<4} "
+          f"ats {score:3d}  sections {', '.join(found)}")
+
+    failures = []
+    if headings != sample["headings"]:
+        failures.append(f"{name} ({backend}): headings {headings}, expected {sample['headings']}")
+    missing = [section for section in sample["sections"] if section not in found]
+    if missing:
+        failures.append(f"{name} ({backend}): sections {', '.join(missing)} not found")
+    if score < sample["ats_score"][backend]:
+        failures.append(f"{name} ({backend}): ATS score {score} below the baseline {sample['ats_score'][backend]}")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--backend", action="append", choices=sorted(PDF_BACKENDS),
+                        help="PDF backend to check (repeatable, default: all)")
+    args = parser.parse_args()
+
+    failures = []
+    for backend in args.backend or sorted(PDF_BACKENDS):
+        for name, sample in SAMPLES.items():
+            failures.extend(check_sample(name, sample, backend))
+
+    if not failures:
+        print("OK")
+        return 0
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,142 @@
+"""Deterministic synthetic resume corpus for the benchmarks.
+
+Every resume is built from a seeded random generator, so the same size,
+density and seed always produce the same text, PDF and DOCX bytes (apart
+from the timestamps reportlab and python-docx embed in file metadata).
+
+    size     number of experience bullets ("small" 12, "medium" 60, "large" 300)
+    density  share of words that are skill variations ("low" 2%, "high" 10%)
+"""
+import io
+import os
+import random
+import sys
+import textwrap
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from docx import Document  # noqa: E402
+from reportlab.lib.pagesizes import letter  # noqa: E402
+from reportlab.pdfgen import canvas  # noqa: E402
+
+from analyzer import ACTION_VERBS, SKILLS_DATABASE  # noqa: E402
+
+SIZES = {"small": 12, "medium": 60, "large": 300}
+DENSITIES = {"low": 0.02, "high": 0.10}
+SEED = 1234
+
+FILLER = ("service platform pipeline feature release customers stakeholders requirements "
+          "quality delivery latency throughput reliability migration roadmap reporting "
+          "dashboards integration onboarding automation tooling infrastructure workflow "
+          "the a for with across and of to in by on new internal critical").split()
+
+SECTION_TITLES = ["Summary", "Experience", "Projects", "Education", "Skills", "Certifications"]
+
+SKILL_VARIATIONS = sorted({v for skills in SKILLS_DATABASE.values()
+                           for variations in skills.values() for v in variations})
+
+
+def _words(rng, count, density):
+    words = []
+    for _ in range(count):
+        if rng.random() < density:
+            words.append(rng.choice(SKILL_VARIATIONS))
+        else:
+            words.append(rng.choice(FILLER))
+    return words
+
+
+def _bullet(rng, density):
+    verb = rng.choice(ACTION_VERBS).capitalize()
+    words = _words(rng, rng.randint(12, 24), density)
+    metric = rng.choice([f"by {rng.randint(5, 80)}%", f"for {rng.randint(2, 50)}+ teams",
+                         f"saving ${rng.randint(10, 900)}k", f"{rng.randint(2, 10)}x faster"])
+    return f"• {verb} {' '.join(words)} {metric}"
+
+
+def make_resume_text(size="medium", density="low", seed=SEED):
+    """Plain-text resume with the usual sections and bullets"""
+    rng = random.Random(f"{seed}:{size}:{density}")
+    bullets = SIZES[size] if isinstance(size, str) else size
+    skill_share = DENSITIES[density] if isinstance(density, str) else density
+
+    lines = [
+        "Jane Doe - Senior Software Engineer",
+        "Email: jane.doe@example.com | Phone: 555-0100 | LinkedIn: linkedin.com/in/janedoe",
+        "",
+        "Summary",
+        " ".join(_words(rng, 40, skill_share)).capitalize() + ".",
+        "",
+        "Experience",
+    ]
+    for i in range(bullets):
+        if i % 6 == 0:
+            lines.append(f"Engineer, Company {i // 6} ({2024 - i // 6 - 2} - {2024 - i // 6})")
+        lines.append(_bullet(rng, skill_share))
+
+    lines += ["", "Projects"]
+    lines += [_bullet(rng, skill_share) for _ in range(max(2, bullets // 6))]
+    lines += ["", "Education", "B.Sc. Computer Science, State University (degree 2014)"]
+    listed = min(len(SKILL_VARIATIONS), max(5, int(bullets * skill_share * 4)))
+    lines += ["", "Skills", ", ".join(rng.sample(SKILL_VARIATIONS, listed))]
+    lines += ["", "Certifications", "AWS Certified Solutions Architect"]
+    return "\n".join(lines)
+
+
+def make_pdf(text):
+    """Render text into a simple one-column PDF; section titles are set in larger bold type"""
+    buffer = io.BytesIO()
+    c = canvas.Canvas(buffer, pagesize=letter)
+    width, height = letter
+    y = height - 50
+    for paragraph in text.split("\n"):
+        font = ("Helvetica-Bold", 12) if paragraph in SECTION_TITLES else ("Helvetica", 10)
+        for line in textwrap.wrap(paragraph, 95) or [""]:
+            if y < 50:
+                c.showPage()
+                y = height - 50
+            c.setFont(*font)
+            c.drawString(50, y, line)
+            y -= 13
+    c.save()
+    return buffer.getvalue()
+
+
+def make_docx(text):
+    """Render text into a DOCX: section titles become headings, the skills a table"""
+    doc = Document()
+    lines = text.split("\n")
+    for index, line in enumerate(lines):
+        if line in SECTION_TITLES:
+            doc.add_heading(line, level=1)
+        elif index > 0 and lines[index - 1] == "Skills":
+            skills = [s.strip() for s in line.split(",")]
+            table = doc.add_table(rows=(len(skills) + 3) // 4, cols=4)
+            for i, skill in enumerate(skills):
+                table.cell(i // 4, i % 4).text = skill
+        elif line:
+            doc.add_paragraph(line)
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue()
+
+
+def build_corpus(sizes=None, densities=None, seed=SEED):
+    """All size x density combinations as dicts with name, text, pdf and docx"""
+    corpus = []
+    for size in sizes or SIZES:
+        for density in densities or DENSITIES:
+            text = make_resume_text(size, density, seed)
+            corpus.append({
+                "name": f"{size}-{density}",
+                "text": text,
+                "pdf": make_pdf(text),
+                "docx": make_docx(text),
+            })
+    return corpus
+
+
+if __name__ == "__main__":
+    for case in build_corpus():
+        print(f"{case['name']:>12}: {len(case['text'].split()):6d} words, "
+              f"pdf {len(case['pdf']) / 1024:7.1f} KB, docx {len(case['docx']) / 1024:6.1f} KB")
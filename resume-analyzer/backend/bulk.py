@@ -0,0 +1,152 @@
+# Parallel, streaming bulk analysis
+#
+# Files (or the members of uploaded ZIP archives) are analyzed in the worker
+# pool with a fixed number in flight. Each result is written out as one NDJSON
+# line as soon as it finishes, so memory stays bounded by the window size
+# rather than the batch size. When other requests fill the pool queue, bulk
+# items wait for room instead of failing with 503.
+import asyncio
+import json
+import os
+import zipfile
+
+from cache import cached_analysis
+from extraction import is_supported, upload_error
+from responses import dumps
+from workers import pool
+
+# Most files accepted in one multipart request
+BULK_MAX_FILES = int(os.environ.get("ANALYZER_BULK_MAX_FILES") or 5000)
+
+# Largest single resume accepted from a ZIP archive (guards against zip bombs)
+BULK_MAX_MEMBER_BYTES = int(os.environ.get("ANALYZER_BULK_MAX_MEMBER_BYTES") or 20 * 1024 * 1024)
+
+
+async def iter_bulk_items(files):
+    """Yield (filename, data, error) for each upload and each ZIP member.
+
+    Bytes are read only when the caller advances the iterator, so at most one
+    window of files is held in memory. Reads from the spooled uploads and
+    archives happen in threads, off the event loop.
+    """
+    for upload in files:
+        if upload.filename.lower().endswith(".zip"):
+            async for item in _iter_zip(upload):
+                yield item
+        elif not is_supported(upload.filename):
+            yield upload.filename, None, "Unsupported file type"
+        else:
+            data = await upload.read()
+            yield upload.filename, data, upload_error(upload.filename, data)
+
+
+async def _iter_zip(upload):
+    try:
+        # Reads the central directory from the end of the spooled file
+        archive = await asyncio.to_thread(zipfile.ZipFile, upload.file)
+    except zipfile.BadZipFile:
+        yield upload.filename, None, "Invalid ZIP archive"
+        return
+
+    with archive:
+        for info in archive.infolist():
+            name = os.path.basename(info.filename)
+            if info.is_dir() or not name or info.filename.startswith("__MACOSX/"):
+                continue
+            if not is_supported(name):
+                yield name, None, "Unsupported file type"
+            elif info.file_size > BULK_MAX_MEMBER_BYTES:
+                yield name, None, "File too large"
+            else:
+                data = await asyncio.to_thread(archive.read, info)
+                yield name, data, upload_error(name, data)
+
+
+async def _analyze_item(index, filename, data, kind, builder):
+    try:
+        result = await cached_analysis(kind, builder, data, filename, wait=True)
+        return {"index": index, **result}
+    except Exception as e:
+        detail = getattr(e, "detail", None) or str(e)
+        return {"index": index, "filename": filename, "error": detail}
+
+
+def _line(record):
+    return dumps(record) + b"\n"
+
+
+async def stream_bulk_analysis(files, kind, builder, concurrency=None, shape=None):
+    """Analyze every file and yield one NDJSON line per result as each completes.
+
+    shape, if given, is applied to each result record. A final line
+    {"summary": {...}} reports the totals.
+    """
+    window = concurrency or pool.parallelism
+    pending = set()
+    total = errors = 0
+
+    def drain(done):
+        nonlocal errors
+        for task in done:
+            record = task.result()
+            if "error" in record:
+                errors += 1
+            yield _line(shape(record) if shape is not None else record)
+
+    try:
+        async for filename, data, error in iter_bulk_items(files):
+            index = total
+            total += 1
+            if error is not None:
+                errors += 1
+                yield _line({"index": index, "filename": filename, "error": error})
+                continue
+
+            pending.add(asyncio.create_task(_analyze_item(index, filename, data, kind, builder)))
+            if len(pending) >= window:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for line in drain(done):
+                    yield line
+
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for line in drain(done):
+                yield line
+    finally:
+        # Client went away: don't keep analyzing for nobody
+        for task in pending:
+            task.cancel()
+
+    yield _line({"summary": {"total": total, "succeeded": total - errors, "failed": errors}})
+
+
+async def read_bulk_form(request):
+    """Parse the multipart body of a bulk request.
+
+    Uploads are spooled to disk past 1 MB by Starlette, so a large batch does
+    not sit in memory. The caller owns the form and must close() it once the
+    stream has finished, which FastAPI's UploadFile parameters don't allow.
+    """
+    form = await request.form(max_files=BULK_MAX_FILES)
+    files = [value for value in form.getlist("files") if not isinstance(value, str)]
+    return form, files
+
+
+async def stream_bulk_form(form, files, kind, builder, shape=None):
+    """stream_bulk_analysis over a parsed form, closing it when done"""
+    try:
+        async for line in stream_bulk_analysis(files, kind, builder, shape=shape):
+            yield line
+    finally:
+        await form.close()
+
+
+async def analyze_all(files, kind, builder, concurrency=None):
+    """Non-streaming variant: all records (without the summary), in upload order"""
+    records = []
+    async for line in stream_bulk_analysis(files, kind, builder, concurrency):
+        record = json.loads(line)
+        if "summary" not in record:
+            records.append(record)
+    records.sort(key=lambda record: record["index"])
+    return records
@@ -0,0 +1,303 @@
+# Content-addressed result cache for uploaded resumes
+#
+# Keys are the SHA-256 of the uploaded bytes. Extracted text (with its
+# extraction metadata) and analysis results are cached separately: text
+# entries carry the extractor version and settings, analysis entries add the
+# rule table version (analyzer.rules_version), so changing SKILLS_DATABASE /
+# ATS_KEYWORDS / SECTIONS re-runs analysis but not PDF parsing.
+#
+# /analyze additionally caches the analyzer findings of each resume section
+# by the hash of its text, so re-uploading an edited resume only scans the
+# sections that changed (see incremental_analysis).
+#
+# The memory tier is answered on the event loop; lookups and writes that
+# reach the SQLite tier (a shared file with a 10 s busy timeout) run in a
+# thread, so ResultCache.get/set are coroutines.
+#
+# Configuration (environment variables):
+#   ANALYZER_CACHE_SIZE  in-memory entries (default: 256, 0 disables the memory tier)
+#   ANALYZER_CACHE_TTL   seconds before an entry expires (default: 86400)
+#   ANALYZER_CACHE_DB    path of an optional SQLite file shared by all uvicorn
+#                        workers and kept across restarts (default: disabled)
+#   ANALYZER_CACHE_DB_MAX_ENTRIES  rows kept in the SQLite tier (default: 10000)
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from analyzer import rules_version, split_sections
+from extraction import EXTRACTION_VERSION, PDF_BACKEND, MAX_PAGES, MAX_CHARS
+from metrics import record_cache, record_stages
+from workers import _env_int, run_in_pool
+import tasks
+
+
+CACHE_SIZE = _env_int("ANALYZER_CACHE_SIZE", 256)
+CACHE_TTL = _env_int("ANALYZER_CACHE_TTL", 86400)
+CACHE_DB = os.environ.get("ANALYZER_CACHE_DB") or None
+CACHE_DB_MAX_ENTRIES = _env_int("ANALYZER_CACHE_DB_MAX_ENTRIES", 10000)
+
+
+class MemoryCache:
+    """LRU cache with a maximum entry count and per-entry TTL"""
+
+    def __init__(self, max_entries=CACHE_SIZE, ttl=CACHE_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires < time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.time() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class SQLiteCache:
+    """On-disk tier; one SQLite file can be shared by several processes"""
+
+    def __init__(self, path, ttl=CACHE_TTL, max_entries=CACHE_DB_MAX_ENTRIES):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._conn = sqlite3.connect(path, timeout=10, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, created REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS cache_created ON cache (created)")
+        self._conn.commit()
+
+    def get(self, key):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM cache WHERE key = ? AND created > ?",
+                (key, time.time() - self.ttl),
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set(self, key, value):
+        payload = json.dumps(value, ensure_ascii=False)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, created) VALUES (?, ?, ?)",
+                (key, payload, time.time()),
+            )
+            self._writes += 1
+            if self._writes % 100 == 0:
+                self._prune()
+            self._conn.commit()
+
+    def _prune(self):
+        self._conn.execute("DELETE FROM cache WHERE created <= ?", (time.time() - self.ttl,))
+        self._conn.execute(
+            "DELETE FROM cache WHERE key IN ("
+            "SELECT key FROM cache ORDER BY created DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        )
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM cache")
+            self._conn.commit()
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+
+
+class ResultCache:
+    """Memory tier in front of an optional disk tier, with hit/miss counters"""
+
+    def __init__(self, memory=None, disk=None):
+        self.memory = memory if memory is not None else MemoryCache()
+        self.disk = disk
+        self.stats = {
+            kind: {"memory_hits": 0, "disk_hits": 0, "misses": 0}
+            for kind in ("text", "analysis", "section", "version")
+        }
+
+    async def get(self, kind, key):
+        value = self.memory.get(key)
+        if value is not None:
+            self.stats[kind]["memory_hits"] += 1
+            return value
+        if self.disk is not None:
+            value = await asyncio.to_thread(self.disk.get, key)
+            if value is not None:
+                self.stats[kind]["disk_hits"] += 1
+                self.memory.set(key, value)
+                return value
+        self.stats[kind]["misses"] += 1
+        return None
+
+    async def set(self, key, value):
+        self.memory.set(key, value)
+        if self.disk is not None:
+            await asyncio.to_thread(self.disk.set, key, value)
+
+    def clear(self):
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+
+    async def info(self):
+        return {
+            "rules_version": rules_version(),
+            "memory_entries": len(self.memory),
+            "disk_entries": await asyncio.to_thread(len, self.disk) if self.disk is not None else None,
+            "stats": self.stats,
+        }
+
+
+result_cache = ResultCache(disk=SQLiteCache(CACHE_DB) if CACHE_DB else None)
+
+
+def file_digest(data):
+    """SHA-256 of the uploaded bytes"""
+    return hashlib.sha256(data).hexdigest()
+
+
+def text_key(digest, filename):
+    ext = os.path.splitext(filename)[1].lower()
+    # Extraction settings change the text, so they are part of the key
+    return f"text:{EXTRACTION_VERSION}:{PDF_BACKEND}:{MAX_PAGES}:{MAX_CHARS}:{ext}:{digest}"
+
+
+def analysis_key(kind, digest, filename):
+    return f"{kind}:{rules_version()}:{text_key(digest, filename)}"
+
+
+def section_key(section_hash):
+    return f"section:{rules_version()}:{section_hash}"
+
+
+# Fields that depend on the upload rather than its content
+def _personalize(result, filename):
+    result = dict(result)
+    if "filename" in result:
+        result["filename"] = filename
+    if "file_info" in result:
+        result["file_info"] = dict(result["file_info"], filename=filename)
+    return result
+
+
+async def cached_document(data, filename):
+    """Extracted document for the upload, from the text cache or the worker pool"""
+    t_key = text_key(file_digest(data), filename)
+    document = await result_cache.get("text", t_key)
+    if document is None:
+        document = await run_in_pool(tasks.extract_document, data, filename)
+        await result_cache.set(t_key, document)
+    return document
+
+
+async def cached_analysis(kind, builder, data, filename, wait=False):
+    """Return builder(text, filename) for the upload, reusing cached documents/results.
+
+    kind names the result shape ("analyze", "export", "compare") and builder is
+    the matching tasks.build_* function. wait is passed on to run_in_pool.
+    """
+    digest = file_digest(data)
+    result_key = analysis_key(kind, digest, filename)
+
+    result = await result_cache.get("analysis", result_key)
+    if result is not None:
+        record_cache("hit")
+        return _personalize(result, filename)
+
+    t_key = text_key(digest, filename)
+    document = await result_cache.get("text", t_key)
+    start = time.perf_counter()
+    if document is not None:
+        record_cache("text-hit")
+        result, stages = await run_in_pool(tasks.build_from_document, builder, document, filename, wait=wait)
+    else:
+        record_cache("miss")
+        document, result, stages = await run_in_pool(tasks.extract_and_build, builder, data, filename, wait=wait)
+        await result_cache.set(t_key, document)
+
+    # Whatever the worker did not account for was spent queueing and pickling
+    worker_ms = stages.get("extract", 0.0) + stages.get("analysis", 0.0)
+    stages["queue"] = max(0.0, (time.perf_counter() - start) * 1000 - worker_ms)
+    record_stages(stages, filename, document.get("total_pages"))
+
+    await result_cache.set(result_key, result)
+    return result
+
+
+async def incremental_analysis(data, filename):
+    """The /analyze result for the upload, scanning only sections not seen before.
+
+    Like cached_analysis("analyze", tasks.build_analysis, ...), but on a
+    result miss the document is extracted first, then analyzed with the
+    cached features of its unchanged sections. The response lists the
+    sections with their hashes and whether they were reused.
+    """
+    digest = file_digest(data)
+    result_key = analysis_key("analyze", digest, filename)
+
+    result = await result_cache.get("analysis", result_key)
+    if result is not None:
+        record_cache("hit")
+        return _personalize(result, filename)
+
+    t_key = text_key(digest, filename)
+    document = await result_cache.get("text", t_key)
+    start = time.perf_counter()
+    stages = {}
+    if document is not None:
+        record_cache("text-hit")
+    else:
+        record_cache("miss")
+        document, stages = await run_in_pool(tasks.extract_measured, data, filename)
+        await result_cache.set(t_key, document)
+
+    known = {}
+    for section in split_sections(document["text"], document.get("line_styles")):
+        features = await result_cache.get("section", section_key(section["hash"]))
+        if features is not None:
+            known[section["hash"]] = features
+    result, computed, analysis_stages = await run_in_pool(
+        tasks.build_sectioned_analysis, document, filename, known
+    )
+    for section_hash, features in computed.items():
+        await result_cache.set(section_key(section_hash), features)
+
+    stages.update(analysis_stages)
+    worker_ms = stages.get("extract", 0.0) + stages.get("analysis", 0.0)
+    stages["queue"] = max(0.0, (time.perf_counter() - start) * 1000 - worker_ms)
+    record_stages(stages, filename, document.get("total_pages"))
+
+    await result_cache.set(result_key, result)
+    return result
@@ -0,0 +1,442 @@
+# Text extraction from uploaded resume files
+#
+# PDFs go through a small extraction engine: pages are produced lazily by a
+# backend and consumed until the page/character budget runs out, so a
+# pathological 200-page upload stops early instead of tying up a worker.
+#
+# Backends:
+#   pdfium      fast text-only extraction (pypdfium2, installed with pdfplumber)
+#   pdfplumber  full layout analysis; slower, used as the high-fidelity fallback
+#
+# DOCX files are streamed straight from the zip (see iter_docx_paragraphs).
+#
+# Besides the text, documents carry "line_styles": one character per line of
+# the text telling how the line was set, for the layout model in layout.py:
+#   h  heading: larger font than the page's body text, or a Word heading style
+#   b  bold body-size line
+#   l  Word list paragraph (bullets that are not part of the text)
+#   t  anything else
+# pdfplumber reads them from the page characters, pdfium from a few sampled
+# glyphs per line (their font size and weight), DOCX from the paragraph
+# properties.
+#
+# The PDF and python-docx libraries are imported on first use, so importing
+# this module (and starting the API) stays fast; load_backends() imports
+# them ahead of time.
+#
+# Configuration (environment variables):
+#   ANALYZER_PDF_BACKEND  "pdfium" (default) or "pdfplumber"
+#   ANALYZER_MAX_PAGES    pages extracted per document (default: 30, 0 = no limit)
+#   ANALYZER_MAX_CHARS    characters extracted per document (default: 100000, 0 = no limit)
+import io
+import os
+import re
+import threading
+import time
+import zipfile
+from collections import Counter
+from xml.etree.ElementTree import iterparse
+
+SUPPORTED_EXTENSIONS = (".pdf", ".docx")
+
+# Bump when extractor output changes, so cached text is re-extracted
+EXTRACTION_VERSION = 5
+
+PDF_BACKEND = os.environ.get("ANALYZER_PDF_BACKEND") or "pdfium"
+MAX_PAGES = int(os.environ.get("ANALYZER_MAX_PAGES") or 30)
+MAX_CHARS = int(os.environ.get("ANALYZER_MAX_CHARS") or 100000)
+
+# A line this much larger than the page's body text is a heading
+HEADING_SIZE_RATIO = 1.15
+_BOLD_FONT = re.compile(r"bold|black|heavy|semibold|demi", re.IGNORECASE)
+# pdfium: glyphs sampled per line for its font, and the weight counted as bold
+PDFIUM_STYLE_SAMPLES = 8
+PDFIUM_BOLD_WEIGHT = 600
+
+# pdfium is not thread-safe; matters when the pool runs in thread mode
+_pdfium_lock = threading.Lock()
+
+
+def is_supported(filename):
+    """True if the file type can be extracted"""
+    return filename.endswith(SUPPORTED_EXTENSIONS)
+
+
+def detect_file_type(data):
+    """"pdf", "docx", "zip" or None, judged from the content rather than the name.
+
+    Only the leading bytes and, for zip files, the central directory are read.
+    """
+    # Readers accept the PDF header anywhere in the first kilobyte
+    if b"%PDF-" in data[:1024]:
+        return "pdf"
+    if data[:4] == b"PK\x03\x04":
+        try:
+            with zipfile.ZipFile(io.BytesIO(data)) as archive:
+                names = set(archive.namelist())
+        except zipfile.BadZipFile:
+            return None
+        return "docx" if "word/document.xml" in names else "zip"
+    return None
+
+
+def upload_error(filename, data):
+    """Why an upload cannot be extracted, or None if it can"""
+    if not is_supported(filename):
+        return "Unsupported file type. Use PDF or DOCX."
+    expected = os.path.splitext(filename)[1].lstrip(".")
+    if detect_file_type(data) != expected:
+        return f"File content is not a valid {expected.upper()} document"
+    return None
+
+
+def load_backends():
+    """Import the configured PDF backend now rather than on the first upload"""
+    if PDF_BACKEND == "pdfplumber":
+        import pdfplumber  # noqa: F401
+    else:
+        import pypdfium2  # noqa: F401
+
+
+# Helper: extract PDF text
+def extract_text_from_pdf(file):
+    import pdfplumber
+
+    with pdfplumber.open(file) as pdf:
+        pages = [p.extract_text() or "" for p in pdf.pages]
+    return "\n".join(pages)
+
+
+# Helper: extract DOCX text
+def extract_text_from_docx(file):
+    from docx import Document
+
+    doc = Document(file)
+    return "\n".join([p.text for p in doc.paragraphs])
+
+
+def iter_pages_pdfium(data):
+    """Yield (total_pages, page_text, None) lazily using pdfium's text layer"""
+    import pypdfium2
+
+    with _pdfium_lock:
+        pdf = pypdfium2.PdfDocument(data)
+    try:
+        total = len(pdf)
+        for index in range(total):
+            with _pdfium_lock:
+                page = pdf[index]
+                textpage = page.get_textpage()
+                text = textpage.get_text_bounded()
+                styles = _pdfium_line_styles(textpage, text)
+                textpage.close()
+                page.close()
+            text = text.replace("\r\n", "\n").replace("\r", "\n")
+            if styles is not None and len(styles) != text.count("\n") + 1:
+                styles = None
+            yield total, text, styles
+    finally:
+        with _pdfium_lock:
+            pdf.close()
+
+
+def iter_pages_pdfplumber(data):
+    """Yield (total_pages, page_text, line_styles) lazily using pdfplumber's layout analysis"""
+    import pdfplumber
+
+    with pdfplumber.open(io.BytesIO(data)) as pdf:
+        total = len(pdf.pages)
+        for page in pdf.pages:
+            # One clustering pass over the characters gives the text lines
+            # (joined, they are exactly extract_text()) and their fonts
+            lines = page.extract_text_lines(return_chars=True)
+            text = "\n".join(line["text"] for line in lines)
+            styles = _line_styles(lines) or "t"
+            page.close()  # release the page's cached layout objects
+            yield total, text, styles
+
+
+def _line_styles(lines):
+    """Style code per text line from its characters' font sizes and names"""
+    fonts = []
+    for line in lines:
+        glyphs = [char for char in line["chars"] if not char["text"].isspace()]
+        fonts.append((
+            len(glyphs),
+            [char["size"] for char in glyphs],
+            [bool(_BOLD_FONT.search(char.get("fontname") or "")) for char in glyphs],
+        ))
+    return _font_styles(fonts)
+
+
+def _pdfium_line_styles(textpage, text):
+    """Style code per line of a pdfium text page (text as returned by it), or None"""
+    import pypdfium2.raw as pdfium_c
+
+    # Character indexes of the text page are positions in its text
+    if textpage.count_chars() != len(text):
+        return None
+    fonts = []
+    offset = 0
+    for line in text.split("\n"):
+        glyphs = [offset + position for position, char in enumerate(line) if not char.isspace()]
+        offset += len(line) + 1
+        samples = glyphs[::-(-len(glyphs) // PDFIUM_STYLE_SAMPLES)] if glyphs else []
+        fonts.append((
+            len(glyphs),
+            [pdfium_c.FPDFText_GetFontSize(textpage.raw, index) for index in samples],
+            [pdfium_c.FPDFText_GetFontWeight(textpage.raw, index) >= PDFIUM_BOLD_WEIGHT for index in samples],
+        ))
+    return _font_styles(fonts)
+
+
+def _font_styles(lines):
+    """Style codes from (glyph count, font sizes, bold flags) per line, sizes and flags of all or some glyphs"""
+    sizes = Counter()
+    for count, line_sizes, _ in lines:
+        for size in line_sizes:
+            sizes[round(size, 1)] += count / len(line_sizes)
+    if not sizes:
+        return "t" * len(lines)
+    body_size = sizes.most_common(1)[0][0]
+
+    styles = []
+    for _, line_sizes, bold in lines:
+        if not line_sizes:
+            styles.append("t")
+            continue
+        size = sorted(line_sizes)[len(line_sizes) // 2]
+        if size >= body_size * HEADING_SIZE_RATIO:
+            styles.append("h")
+        elif sum(bold) * 5 >= len(bold) * 4:
+            styles.append("b")
+        else:
+            styles.append("t")
+    return "".join(styles)
+
+
+PDF_BACKENDS = {
+    "pdfium": iter_pages_pdfium,
+    "pdfplumber": iter_pages_pdfplumber,
+}
+
+
+def extract_pdf_document(data, backend=None, max_pages=None, max_chars=None):
+    """Extract PDF text page by page within the page/character budget.
+
+    Returns a dict with the text and extraction metadata: backend used, page
+    counts, per-page timings and whether the output was truncated. If the fast
+    backend fails or finds no text at all, pdfplumber is tried instead.
+    """
+    backend = backend or PDF_BACKEND
+    max_pages = MAX_PAGES if max_pages is None else max_pages
+    max_chars = MAX_CHARS if max_chars is None else max_chars
+
+    try:
+        document = _run_pdf_backend(backend, data, max_pages, max_chars)
+    except Exception:
+        if backend == "pdfplumber":
+            raise
+        document = None
+
+    if backend != "pdfplumber" and (document is None or not document["text"].strip()):
+        document = _run_pdf_backend("pdfplumber", data, max_pages, max_chars)
+    return document
+
+
+def _run_pdf_backend(backend, data, max_pages, max_chars):
+    pages = []
+    page_styles = []
+    page_timings = []
+    chars = 0
+    total_pages = 0
+    truncated = False
+
+    page_iter = PDF_BACKENDS[backend](data)
+    try:
+        while True:
+            start = time.perf_counter()
+            try:
+                total_pages, text, styles = next(page_iter)
+            except StopIteration:
+                break
+            page_timings.append(round((time.perf_counter() - start) * 1000, 2))
+
+            # The line break joining a page to the previous one counts against the budget
+            separator = 1 if pages else 0
+            if max_chars and chars + separator + len(text) > max_chars:
+                truncated = True
+                room = max_chars - chars - separator
+                if room <= 0:
+                    break
+                text = text[:room]
+            pages.append(text)
+            page_styles.append(styles[:text.count("\n") + 1] if styles is not None else None)
+            chars += separator + len(text)
+
+            if truncated or (max_pages and len(pages) >= max_pages and total_pages > len(pages)):
+                truncated = True
+                break
+    finally:
+        page_iter.close()
+
+    return {
+        "text": "\n".join(pages),
+        "line_styles": "".join(page_styles) if page_styles and None not in page_styles else None,
+        "backend": backend,
+        "pages_extracted": len(pages),
+        "total_pages": total_pages,
+        "truncated": truncated,
+        "page_timings_ms": page_timings,
+    }
+
+
+# WordprocessingML element names used by the streaming DOCX extractor
+_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_MC_FALLBACK = "{http://schemas.openxmlformats.org/markup-compatibility/2006}Fallback"
+_DOCX_TEXT = _W + "t"
+_DOCX_PARAGRAPH = _W + "p"
+_DOCX_RUN = _W + "r"
+_DOCX_BOLD = _W + "b"
+_DOCX_STYLE = _W + "pStyle"
+_DOCX_NUMBERING = _W + "numPr"
+_DOCX_VAL = _W + "val"
+_DOCX_CELL = _W + "tc"
+_DOCX_BREAKS = {_W + "tab": "\t", _W + "br": "\n", _W + "cr": "\n"}
+_DOCX_HEADER_FOOTER = re.compile(r"^word/(header|footer)\d*\.xml$")
+
+
+def docx_parts(archive):
+    """Text-bearing parts in reading order: headers, body, footers"""
+    names = archive.namelist()
+    headers = sorted(n for n in names if _DOCX_HEADER_FOOTER.match(n) and "/header" in n)
+    footers = sorted(n for n in names if _DOCX_HEADER_FOOTER.match(n) and "/footer" in n)
+    return headers + ["word/document.xml"] + footers
+
+
+def iter_docx_paragraphs(data):
+    """Yield (text, style code) for the paragraphs of a DOCX file in document order.
+
+    Streams the XML parts straight from the zip with an incremental parser,
+    without building python-docx's object model. Unlike doc.paragraphs this
+    includes table cells, text boxes, headers and footers.
+    """
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        for part in docx_parts(archive):
+            with archive.open(part) as stream:
+                yield from _iter_part_paragraphs(stream)
+
+
+def _iter_part_paragraphs(stream):
+    # Stack of [text parts, style, all text bold, has text, open runs]: text
+    # boxes nest paragraphs inside paragraphs
+    paragraphs = []
+    fallback_depth = 0  # text boxes are repeated inside mc:Fallback; skip the copy
+    run_bold = False
+
+    for event, elem in iterparse(stream, events=("start", "end")):
+        tag = elem.tag
+        if event == "start":
+            if tag == _DOCX_PARAGRAPH and not fallback_depth:
+                paragraphs.append([[], None, True, False, 0])
+            elif tag == _DOCX_RUN:
+                run_bold = False
+                if paragraphs and not fallback_depth:
+                    paragraphs[-1][4] += 1
+            elif tag == _MC_FALLBACK:
+                fallback_depth += 1
+            continue
+
+        if tag == _MC_FALLBACK:
+            fallback_depth -= 1
+        elif fallback_depth or not paragraphs:
+            pass
+        elif tag == _DOCX_TEXT:
+            paragraph = paragraphs[-1]
+            paragraph[0].append(elem.text or "")
+            if elem.text and not elem.text.isspace():
+                paragraph[2] = paragraph[2] and run_bold
+                paragraph[3] = True
+        elif tag == _DOCX_RUN:
+            paragraphs[-1][4] -= 1
+        elif tag in _DOCX_BREAKS:
+            # w:tab also defines tab stops in w:pPr; only a run's tab is text
+            if paragraphs[-1][4]:
+                paragraphs[-1][0].append(_DOCX_BREAKS[tag])
+        elif tag == _DOCX_BOLD:
+            run_bold = elem.get(_DOCX_VAL) not in ("0", "false")
+        elif tag == _DOCX_STYLE:
+            style = (elem.get(_DOCX_VAL) or "").lower()
+            if style.startswith(("heading", "title")):
+                paragraphs[-1][1] = "h"
+            elif style.startswith("list"):
+                paragraphs[-1][1] = "l"
+        elif tag == _DOCX_NUMBERING:
+            if paragraphs[-1][1] is None:
+                paragraphs[-1][1] = "l"
+        elif tag == _DOCX_PARAGRAPH:
+            parts, style, bold, has_text, _ = paragraphs.pop()
+            yield "".join(parts), style or ("b" if bold and has_text else "t")
+
+        # Finished paragraphs and cells are no longer needed
+        if tag == _DOCX_PARAGRAPH or tag == _DOCX_CELL:
+            elem.clear()
+
+
+def extract_docx_document(data, max_chars=None):
+    """Extract DOCX text within the character budget (same result shape as PDFs)"""
+    max_chars = MAX_CHARS if max_chars is None else max_chars
+    start = time.perf_counter()
+    lines = []
+    styles = []
+    chars = 0
+    truncated = False
+
+    paragraphs = iter_docx_paragraphs(data)
+    try:
+        for text, style in paragraphs:
+            # The line break joining a paragraph to the previous one counts against the budget
+            separator = 1 if lines else 0
+            if max_chars and chars + separator + len(text) > max_chars:
+                truncated = True
+                room = max_chars - chars - separator
+                if room <= 0:
+                    break
+                text = text[:room]
+            lines.append(text)
+            # Line breaks inside a paragraph continue it as plain text
+            styles.append(style + "t" * text.count("\n"))
+            chars += separator + len(text)
+            if truncated:
+                break
+    finally:
+        paragraphs.close()
+
+    return {
+        "text": "\n".join(lines),
+        "line_styles": "".join(styles),
+        "backend": "docx-stream",
+        "pages_extracted": None,
+        "total_pages": None,
+        "truncated": truncated,
+        "page_timings_ms": [round((time.perf_counter() - start) * 1000, 2)],
+    }
+
+
+def extract_document(data, filename):
+    """Extract text plus metadata from the raw bytes of an uploaded PDF or DOCX file"""
+    if filename.endswith(".pdf"):
+        return extract_pdf_document(data)
+    if filename.endswith(".docx"):
+        return extract_docx_document(data)
+    raise ValueError(f"Unsupported file type: {filename}")
+
+
+def extract_text(data, filename):
+    """Extract plain text from the raw bytes of an uploaded PDF or DOCX file"""
+    return extract_document(data, filename)["text"]
+
+
+def extraction_info(document):
+    """Document metadata for API responses (everything but the text and line styles)"""
+    return {key: value for key, value in document.items() if key not in ("text", "line_styles")}
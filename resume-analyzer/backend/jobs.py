@@ -0,0 +1,297 @@
+# Durable asynchronous analysis jobs
+#
+# POST /analyze/jobs stores the upload in a local SQLite queue and returns at
+# once; dispatcher tasks in the API process claim queued jobs (highest
+# priority first) and run the regular /analyze logic on them in the worker
+# pool. The queue survives restarts and can be shared by several uvicorn
+# workers: claims are atomic, and a claimed job carries a lease, so a job
+# whose process died is picked up again once the lease runs out.
+#
+# Failed attempts caused by the infrastructure (a crashed worker, a full
+# pool) are retried with backoff up to JOB_MAX_ATTEMPTS; errors caused by the
+# file itself fail the job right away. Finished jobs are kept for
+# ANALYZER_JOB_RESULT_TTL seconds.
+#
+# Configuration (environment variables):
+#   ANALYZER_JOBS_DB          path of the queue file (default: analyzer_jobs.sqlite3, "" disables)
+#   ANALYZER_JOB_CONCURRENCY  jobs processed at once per API process (default: pool workers)
+#   ANALYZER_JOB_RESULT_TTL   seconds results are kept (default: 3600)
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+
+from fastapi import HTTPException
+
+from workers import POOL_WORKERS, _env_int
+
+
+JOBS_DB = os.environ.get("ANALYZER_JOBS_DB", "analyzer_jobs.sqlite3")
+JOB_CONCURRENCY = _env_int("ANALYZER_JOB_CONCURRENCY", max(POOL_WORKERS, 1))
+JOB_RESULT_TTL = _env_int("ANALYZER_JOB_RESULT_TTL", 3600)
+
+JOB_MAX_ATTEMPTS = 3
+# A running job not finished within its lease is assumed lost and re-queued
+JOB_LEASE_SECONDS = 600
+# Idle dispatchers re-check the queue this often (other processes may enqueue)
+POLL_INTERVAL = 1.0
+PURGE_INTERVAL = 60
+# A dispatcher whose queue access failed (e.g. "database is locked") waits
+# POLL_INTERVAL, doubling per consecutive failure up to this many seconds
+MAX_ERROR_BACKOFF = 30.0
+
+logger = logging.getLogger(__name__)
+
+
+class JobQueue:
+    """SQLite work queue with priorities, leases, retries and result expiry"""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        # Autocommit mode; claims use explicit BEGIN IMMEDIATE transactions
+        self._conn = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "id TEXT PRIMARY KEY, status TEXT NOT NULL, priority INTEGER NOT NULL, "
+            "filename TEXT NOT NULL, payload BLOB, attempts INTEGER NOT NULL DEFAULT 0, "
+            "created_at REAL NOT NULL, available_at REAL NOT NULL, started_at REAL, "
+            "finished_at REAL, lease_until REAL, expires_at REAL, result TEXT, error TEXT)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS jobs_ready ON jobs (status, priority DESC, created_at)"
+        )
+
+    def enqueue(self, filename, data, priority=0):
+        """Queue an upload for analysis; returns the job id"""
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO jobs (id, status, priority, filename, payload, created_at, available_at) "
+                "VALUES (?, 'queued', ?, ?, ?, ?, ?)",
+                (job_id, priority, filename, data, now, now),
+            )
+        return job_id
+
+    def claim(self):
+        """Take the next runnable job (id, filename, data, attempt) or None"""
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                # Lost jobs that used up their attempts fail instead of running again
+                self._conn.execute(
+                    "UPDATE jobs SET status = 'failed', error = 'Job was interrupted too many times', "
+                    "payload = NULL, finished_at = ?, expires_at = ? "
+                    "WHERE status = 'running' AND lease_until < ? AND attempts >= ?",
+                    (now, now + JOB_RESULT_TTL, now, JOB_MAX_ATTEMPTS),
+                )
+                row = self._conn.execute(
+                    "SELECT id, filename, payload, attempts FROM jobs "
+                    "WHERE (status = 'queued' AND available_at <= ?) "
+                    "OR (status = 'running' AND lease_until < ?) "
+                    "ORDER BY priority DESC, created_at LIMIT 1",
+                    (now, now),
+                ).fetchone()
+                if row is not None:
+                    self._conn.execute(
+                        "UPDATE jobs SET status = 'running', attempts = attempts + 1, "
+                        "started_at = ?, lease_until = ? WHERE id = ?",
+                        (now, now + JOB_LEASE_SECONDS, row[0]),
+                    )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        if row is None:
+            return None
+        job_id, filename, data, attempts = row
+        return job_id, filename, data, attempts + 1
+
+    def complete(self, job_id, result):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = 'done', result = ?, payload = NULL, finished_at = ?, "
+                "expires_at = ?, lease_until = NULL WHERE id = ?",
+                (json.dumps(result, ensure_ascii=False), now, now + JOB_RESULT_TTL, job_id),
+            )
+
+    def release(self, job_id):
+        """Put a claimed job back without counting the attempt (e.g. on shutdown)"""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = 'queued', attempts = attempts - 1, lease_until = NULL "
+                "WHERE id = ? AND status = 'running'",
+                (job_id,),
+            )
+
+    def fail(self, job_id, error, retry=False, attempt=JOB_MAX_ATTEMPTS):
+        """Record a failed attempt; retryable failures are re-queued with backoff"""
+        now = time.time()
+        with self._lock:
+            if retry and attempt < JOB_MAX_ATTEMPTS:
+                self._conn.execute(
+                    "UPDATE jobs SET status = 'queued', error = ?, available_at = ?, "
+                    "lease_until = NULL WHERE id = ?",
+                    (error, now + 2 ** attempt, job_id),
+                )
+            else:
+                self._conn.execute(
+                    "UPDATE jobs SET status = 'failed', error = ?, payload = NULL, finished_at = ?, "
+                    "expires_at = ?, lease_until = NULL WHERE id = ?",
+                    (error, now, now + JOB_RESULT_TTL, job_id),
+                )
+
+    def get(self, job_id):
+        """Public view of a job, or None if unknown or expired"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id, status, priority, filename, attempts, created_at, started_at, "
+                "finished_at, expires_at, result, error FROM jobs WHERE id = ?",
+                (job_id,),
+            ).fetchone()
+            if row is None or (row[8] is not None and row[8] < time.time()):
+                return None
+            position = None
+            if row[1] == "queued":
+                position = self._conn.execute(
+                    "SELECT COUNT(*) FROM jobs WHERE status = 'queued' "
+                    "AND (priority > ? OR (priority = ? AND created_at < ?))",
+                    (row[2], row[2], row[5]),
+                ).fetchone()[0]
+
+        (job_id, status, priority, filename, attempts, created_at,
+         started_at, finished_at, expires_at, result, error) = row
+        job = {
+            "job_id": job_id,
+            "status": status,
+            "priority": priority,
+            "filename": filename,
+            "attempts": attempts,
+            "created_at": _iso(created_at),
+            "started_at": _iso(started_at),
+            "finished_at": _iso(finished_at),
+        }
+        if position is not None:
+            job["queue_position"] = position
+        if status == "done":
+            job["expires_at"] = _iso(expires_at)
+            job["result"] = json.loads(result)
+        elif error:
+            job["error"] = error
+        return job
+
+    def purge_expired(self):
+        with self._lock:
+            return self._conn.execute(
+                "DELETE FROM jobs WHERE expires_at < ?", (time.time(),)
+            ).rowcount
+
+    def stats(self):
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        return {"path": self.path, **dict(rows)}
+
+    def close(self):
+        self._conn.close()
+
+
+def _iso(timestamp):
+    return datetime.fromtimestamp(timestamp).isoformat() if timestamp is not None else None
+
+
+def _is_retryable(error):
+    """Failures caused by the pool rather than the file itself"""
+    if isinstance(error, BrokenProcessPool):
+        return True
+    return isinstance(error, HTTPException) and error.status_code in (429, 503)
+
+
+class JobRunner:
+    """Dispatcher tasks pulling jobs from the queue and running handler(data, filename)"""
+
+    def __init__(self, queue, handler, concurrency=JOB_CONCURRENCY):
+        self.queue = queue
+        self.handler = handler
+        self.concurrency = concurrency
+        self._wakeup = asyncio.Event()
+        self._tasks = []
+        self._last_purge = 0.0
+
+    def start(self):
+        self._tasks = [asyncio.create_task(self._dispatch()) for _ in range(self.concurrency)]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def notify(self):
+        """Wake idle dispatchers after a local enqueue"""
+        self._wakeup.set()
+
+    async def _dispatch(self):
+        # Queue calls block on SQLite (up to its 30 s busy timeout), so they run in threads
+        errors = 0
+        while True:
+            try:
+                await self._purge()
+                job = await asyncio.to_thread(self.queue.claim)
+                if job is not None:
+                    await self._run(*job)
+                errors = 0
+            except Exception:
+                delay = min(POLL_INTERVAL * 2 ** errors, MAX_ERROR_BACKOFF)
+                errors += 1
+                logger.exception("Job queue error, retrying in %.1f s", delay)
+                await asyncio.sleep(delay)
+                continue
+
+            if job is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), POLL_INTERVAL)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def _run(self, job_id, filename, data, attempt):
+        try:
+            result = await self.handler(data, filename)
+        except asyncio.CancelledError:
+            # Shutting down: hand the job back for the next start
+            self.queue.release(job_id)
+            raise
+        except Exception as e:
+            retry = _is_retryable(e)
+            detail = getattr(e, "detail", None) or str(e) or type(e).__name__
+            logger.warning("Job %s (%s) attempt %d failed: %s", job_id, filename, attempt, detail)
+            await asyncio.to_thread(self.queue.fail, job_id, detail, retry=retry, attempt=attempt)
+        else:
+            await asyncio.to_thread(self.queue.complete, job_id, result)
+
+    async def _purge(self):
+        now = time.monotonic()
+        if now - self._last_purge >= PURGE_INTERVAL:
+            self._last_purge = now
+            await asyncio.to_thread(self.queue.purge_expired)
+
+
+_queue = None
+
+
+def get_job_queue():
+    """The process-wide job queue, opened on first use (None when disabled)"""
+    global _queue
+    if _queue is None and JOBS_DB:
+        _queue = JobQueue(JOBS_DB)
+    return _queue
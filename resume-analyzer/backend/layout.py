@@ -0,0 +1,138 @@
+# Layout model of an extracted document
+#
+# One pass over the lines of the text, together with the per-line style
+# codes from extraction.py where the backend provides them, classifies every
+# line as heading, bullet or body text and groups the lines into section
+# spans. The analyzers read section names and bullets from here instead of
+# guessing them from substrings of the raw text.
+#
+# Headings are recognized from their wording (a short line naming a section,
+# "Work Experience:"); a heading naming several sections ("Experience and
+# Certifications") opens all of them. With font information, lines set
+# larger than the body text also start a section, named "other" if the
+# wording is unknown, and when most lines naming a section are set larger or
+# bold, the fonts mark the headings: a plain line naming a section is then
+# body text ("Cochin University" under Education).
+# Records use __slots__ and line kinds are one character per line, so a
+# layout costs little more than the list of lines.
+import re
+
+HEADING = "h"
+BOLD = "b"
+BULLET = "l"
+BODY = "t"
+
+# Bullet glyphs (including Symbol-font private-use ones and pdfminer's
+# "(cid:n)" placeholders), dashes and "1." / "1)" numbering
+_BULLET_LINE = re.compile(
+    r'^\s*(?:[•●○◦▪▫■□►▸‣⁃∙·✓✔➢➤]|\(cid:\d+\)|[-–—*]\s|\d{1,2}[.)]\s)'
+)
+_WORD = re.compile(r'\w+')
+# Lines that look like body text rather than a heading
+_NOT_HEADING = re.compile(r'[\d,;.!?|@]|^[•*\-–]')
+
+
+class Section:
+    """Lines [start, end) of the document; heading is the title line (None for the header).
+
+    names are all sections the heading names, name the first of them.
+    """
+
+    __slots__ = ("name", "names", "heading", "start", "end")
+
+    def __init__(self, name, heading, start, end, names=None):
+        self.name = name
+        self.names = names or (name,)
+        self.heading = heading
+        self.start = start
+        self.end = end
+
+
+class DocumentLayout:
+    """Lines of a document with their kinds (HEADING/BULLET/BODY) and section spans"""
+
+    __slots__ = ("lines", "kinds", "sections")
+
+    def __init__(self, lines, kinds, sections):
+        self.lines = lines
+        self.kinds = kinds
+        self.sections = sections
+
+    @property
+    def bullet_count(self):
+        return self.kinds.count(BULLET)
+
+    def section_text(self, section):
+        """The section's text, with the line break that ends it (texts concatenate to the document)"""
+        text = "\n".join(self.lines[section.start:section.end])
+        return text + "\n" if section.end < len(self.lines) else text
+
+
+def heading_words(line):
+    """Lowercased words of a line that could be a heading, else None"""
+    stripped = line.strip().rstrip(":").strip()
+    if not stripped or len(stripped) > 40 or _NOT_HEADING.search(stripped):
+        return None
+    words = _WORD.findall(stripped.lower())
+    return words if 1 <= len(words) <= 4 else None
+
+
+def heading_names(words, headings):
+    """Every section named by heading words via headings ({synonym: section name}), in order"""
+    names = []
+    index = 0
+    while index < len(words):
+        # Two-word synonyms ("work samples") take precedence over their words
+        pair = " ".join(words[index:index + 2])
+        if index + 1 < len(words) and pair in headings:
+            name = headings[pair]
+            index += 2
+        else:
+            name = headings.get(words[index])
+            index += 1
+        if name is not None and name not in names:
+            names.append(name)
+    return tuple(names)
+
+
+def build_layout(text, line_styles, headings):
+    """Classify the lines of text and group them into sections.
+
+    line_styles has one extraction style code per line of text.split("\\n")
+    (or is None); headings maps section synonyms to section names. Lines
+    before the first heading form the "header" section.
+    """
+    lines = text.split("\n")
+    if line_styles is not None and len(line_styles) != len(lines):
+        line_styles = None
+
+    candidates = []
+    for index, line in enumerate(lines):
+        style = line_styles[index] if line_styles is not None else BODY
+        words = heading_words(line) if style != BULLET else None
+        candidates.append((style, words, heading_names(words, headings) if words else ()))
+    named = [style for style, _, names in candidates if names]
+    font_headings = sum(1 for style in named if style in (HEADING, BOLD)) * 2 > len(named)
+
+    kinds = []
+    sections = [Section("header", None, 0, 0)]
+    for index, (line, (style, words, names)) in enumerate(zip(lines, candidates)):
+        if font_headings and style not in (HEADING, BOLD):
+            names = ()
+        if not names and words and style == HEADING and len(sections) > 1:
+            names = ("other",)
+
+        if names:
+            kinds.append(HEADING)
+            sections[-1].end = index
+            sections.append(Section(names[0], line.strip(), index, index, names))
+        elif style == BULLET or _BULLET_LINE.match(line):
+            kinds.append(BULLET)
+        else:
+            kinds.append(BODY)
+    sections[-1].end = len(lines)
+
+    # An empty header (the text starts with a heading) is dropped
+    if len(sections) > 1 and sections[0].end == 0:
+        sections.pop(0)
+    return DocumentLayout(lines, "".join(kinds), sections)
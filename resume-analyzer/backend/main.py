@@ -1,18 +1,64 @@
-from fastapi import FastAPI, UploadFile, File, HTTPException
+from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, FileResponse
-import pdfplumber
-from docx import Document
-from analyzer import (
-    advanced_skill_extractor, detect_sections_advanced, calculate_completeness_advanced,
-    analyze_keyword_density, calculate_ats_score, analyze_content_quality,
-    generate_improvement_suggestions, ATS_KEYWORDS, simple_skill_extractor, detect_sections
-)
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from contextlib import asynccontextmanager
+from extraction import extract_text_from_pdf, extract_text_from_docx, is_supported, upload_error
+from admission import AdmissionMiddleware, check_upload
+import tasks
+from workers import pool, run_in_pool
+from cache import cached_analysis, cached_document, incremental_analysis, result_cache
+from versions import record_version
+from responses import CompressionMiddleware, FastJSONResponse, parse_fields, shape_result
+from search import get_resume_index, INDEX_DB
+from jobs import JobRunner, get_job_queue
+from bulk import analyze_all, read_bulk_form, stream_bulk_form
+from analyzer import compile_job_description, get_job_index, rank_job_matches
+from analyzer import warmup as warmup_analyzer
+from extraction import extract_text
+from metrics import observe_request, render_metrics, server_timing_header, start_request_timings
+import asyncio
+import functools
+import logging
 import json
 import os
+import time
 from datetime import datetime
 
-app = FastAPI()
+logging.basicConfig(level=os.environ.get("ANALYZER_LOG_LEVEL") or "INFO")
+logger = logging.getLogger(__name__)
+
+# ANALYZER_WARMUP=1 prepares the analyzer and the worker pool in the background after startup
+WARMUP = os.environ.get("ANALYZER_WARMUP") == "1"
+
+async def _warmup():
+    """Build the rule tables here and start/prime every pool worker, off the request path"""
+    try:
+        start = time.perf_counter()
+        # JD compilation and search run the analyzer in this process too
+        await asyncio.to_thread(warmup_analyzer)
+        pids = await asyncio.gather(*(run_in_pool(tasks.warmup) for _ in range(max(pool.workers, 1))))
+        logger.info("Warmup done in %.0f ms (%d workers)", (time.perf_counter() - start) * 1000, len(set(pids)))
+    except Exception:
+        logger.exception("Warmup failed")
+
+@asynccontextmanager
+async def lifespan(app):
+    queue = get_job_queue()
+    app.state.job_runner = JobRunner(queue, _analyze_upload) if queue is not None else None
+    if app.state.job_runner is not None:
+        app.state.job_runner.start()
+    warmup_task = asyncio.create_task(_warmup()) if WARMUP else None
+    yield
+    if warmup_task is not None:
+        warmup_task.cancel()
+    if app.state.job_runner is not None:
+        await app.state.job_runner.stop()
+    pool.shutdown()
+
+app = FastAPI(lifespan=lifespan, default_response_class=FastJSONResponse)
+
+# Upload size/concurrency limits; added before CORS so rejections still carry CORS headers
+app.add_middleware(AdmissionMiddleware)
 
 # CORS middleware - Allow all origins for production
 app.add_middleware(
@@ -23,156 +69,132 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.middleware("http")
+async def timing_middleware(request: Request, call_next):
+    """Record request latency and report per-stage timings in a Server-Timing header"""
+    start = time.perf_counter()
+    timings = start_request_timings()
+    response = await call_next(request)
+    elapsed = time.perf_counter() - start
+
+    # Label by route template so /analysis/index/{resume_id} stays one series
+    route = request.scope.get("route")
+    observe_request(request.method, getattr(route, "path", "unmatched"), response.status_code, elapsed)
+    response.headers["Server-Timing"] = server_timing_header(timings, elapsed * 1000)
+    response.headers["Timing-Allow-Origin"] = "*"
+    return response
+
+# Outermost, so every response (errors and Server-Timing included) can be compressed
+app.add_middleware(CompressionMiddleware)
 
 
-from fastapi.responses import FileResponse
-from reportlab.lib.pagesizes import letter
-from reportlab.pdfgen import canvas
-import os
 
 @app.post("/generate_resume")
 async def generate_resume(file: UploadFile = File(...)):
-    # 1️⃣ Extract text
-    if file.filename.endswith(".pdf"):
-        text = extract_text_from_pdf(file.file)
-    elif file.filename.endswith(".docx"):
-        text = extract_text_from_docx(file.file)
-    else:
+    # 1️⃣ Extract text, 2️⃣ analyze and 3️⃣ render the PDF in memory (in the worker pool)
+    if not is_supported(file.filename):
         return {"error": "Unsupported file type"}
+    data = await file.read()
+    check_upload(file.filename, data)
+    pdf = await run_in_pool(tasks.report_file, data, file.filename)
 
-    # 2️⃣ Analyze
-    result = simple_skill_extractor(text)
-    skills = result["skills_found"]
-    found_sections, missing_sections = detect_sections(text)
-    suggestions = [f"Add {sec} section" for sec in missing_sections]
-
-    # 3️⃣ Generate PDF
-    output_file = "improved_resume.pdf"
-    c = canvas.Canvas(output_file, pagesize=letter)
-    width, height = letter
-    y = height - 50
-
-    # Header
-    c.setFont("Helvetica-Bold", 16)
-    c.drawString(50, y, "Improved Resume")
-    y -= 30
-
-    # Original snippet
-    c.setFont("Helvetica", 12)
-    c.drawString(50, y, "Original Text Snippet:")
-    y -= 20
-    for line in text[:1000].split("\n"):
-        c.drawString(50, y, line[:80])
-        y -= 15
-        if y < 50:
-            c.showPage()
-            y = height - 50
-
-    y -= 20
-    # Skills
-    c.setFont("Helvetica-Bold", 12)
-    c.drawString(50, y, "Detected Skills:")
-    y -= 20
-    c.setFont("Helvetica", 12)
-    c.drawString(50, y, ", ".join(skills))
-    y -= 30
-
-    # Suggestions
-    c.setFont("Helvetica-Bold", 12)
-    c.drawString(50, y, "Improvement Suggestions:")
-    y -= 20
-    c.setFont("Helvetica", 12)
-    for s in suggestions:
-        c.drawString(50, y, f"- {s}")
-        y -= 15
-        if y < 50:
-            c.showPage()
-            y = height - 50
-
-    c.save()
-
-    return FileResponse(output_file, media_type="application/pdf", filename="improved_resume.pdf")
-
-# Helper: extract PDF text
-def extract_text_from_pdf(file):
-    with pdfplumber.open(file) as pdf:
-        pages = [p.extract_text() or "" for p in pdf.pages]
-    return "\n".join(pages)
-
-# Helper: extract DOCX text
-def extract_text_from_docx(file):
-    doc = Document(file)
-    return "\n".join([p.text for p in doc.paragraphs])
+    return Response(
+        content=pdf,
+        media_type="application/pdf",
+        headers={"Content-Disposition": 'attachment; filename="improved_resume.pdf"'}
+    )
 
 @app.post("/analyze")
-async def analyze_resume(file: UploadFile = File(...)):
-    """Advanced resume analysis with comprehensive insights"""
+async def analyze_resume(
+    file: UploadFile = File(...),
+    previous_version: str = Form(None),
+    fields: str = None,
+    compact: bool = False
+):
+    """Advanced resume analysis with comprehensive insights.
+
+    The result includes a diff against previous_version (a version_id from an
+    earlier response), if given and still cached.
+    compact=true lists skills once and fields=a,b keeps only those keys.
+    """
     try:
         # 1️⃣ Extract text based on file type
-        if file.filename.endswith(".pdf"):
-            text = extract_text_from_pdf(file.file)
-        elif file.filename.endswith(".docx"):
-            text = extract_text_from_docx(file.file)
-        else:
+        if not is_supported(file.filename):
             raise HTTPException(status_code=400, detail="Unsupported file type. Use PDF or DOCX.")
 
-        # 2️⃣ Advanced skill analysis
-        skills_advanced = advanced_skill_extractor(text)
-        skills_simple = [skill["skill"] for skill in skills_advanced]
-
-        # 3️⃣ Section analysis
-        found_sections, missing_sections = detect_sections_advanced(text)
-
-        # 4️⃣ ATS optimization analysis
-        ats_score, ats_checks = calculate_ats_score(text)
-        keyword_analysis = analyze_keyword_density(text, ATS_KEYWORDS)
-
-        # 5️⃣ Content quality analysis
-        content_analysis = analyze_content_quality(text)
-
-        # 6️⃣ Calculate advanced completeness
-        completeness = calculate_completeness_advanced(found_sections, skills_advanced, ats_score)
-
-        # 7️⃣ Generate comprehensive suggestions
-        suggestions = generate_improvement_suggestions(text, skills_advanced, found_sections, ats_score)
-
-        # 8️⃣ Skill categorization
-        skills_by_category = {}
-        for skill in skills_advanced:
-            category = skill["category"]
-            if category not in skills_by_category:
-                skills_by_category[category] = []
-            skills_by_category[category].append(skill)
-
-        return {
-            "text_snippet": text[:1000],
-            "skills_detected": skills_simple,
-            "skills_advanced": skills_advanced,
-            "skills_by_category": skills_by_category,
-            "found_sections": found_sections,
-            "missing_sections": missing_sections,
-            "completeness": completeness,
-            "ats_score": ats_score,
-            "ats_checks": ats_checks,
-            "keyword_analysis": keyword_analysis,
-            "content_analysis": content_analysis,
-            "suggestions": suggestions,
-            "analysis_timestamp": datetime.now().isoformat(),
-            "file_info": {
-                "filename": file.filename,
-                "file_size": len(text),
-                "word_count": content_analysis["word_count"]
-            }
-        }
+        data = await file.read()
+        check_upload(file.filename, data)
+        result = await _analyze_upload(data, file.filename, previous_version)
+        return FastJSONResponse(shape_result(result, parse_fields(fields), compact))
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
 
+async def _analyze_upload(data, filename, previous_version=None):
+    """The /analyze body for a validated upload; also run by the job queue"""
+    # 2️⃣-8️⃣ Extraction and full analysis run in the worker pool (see tasks.build_analysis),
+    # unless this exact file was analyzed before under the current rules; of an edited
+    # resume only the changed sections are scanned again
+    result = await incremental_analysis(data, filename)
+    result = dict(result, diff=await record_version(result, previous_version))
+
+    # 9️⃣ Keep it searchable (see /analysis/search)
+    await _index_upload(data, filename, result["skills_advanced"])
+    return result
+
+@app.post("/analyze/jobs", status_code=202)
+async def create_analysis_job(file: UploadFile = File(...), priority: int = Form(0)):
+    """Queue a resume for analysis and return a job id immediately (poll GET /analyze/jobs/{id})"""
+    queue = get_job_queue()
+    if queue is None:
+        raise HTTPException(status_code=404, detail="Job queue is disabled")
+    if not is_supported(file.filename):
+        raise HTTPException(status_code=400, detail="Unsupported file type. Use PDF or DOCX.")
+
+    data = await file.read()
+    check_upload(file.filename, data)
+    # The insert may wait on the queue's lock (and a payload of megabytes takes a while)
+    job_id = await asyncio.to_thread(queue.enqueue, file.filename, data, priority)
+    app.state.job_runner.notify()
+    return {"job_id": job_id, "status": "queued", "status_url": f"/analyze/jobs/{job_id}"}
+
+@app.get("/analyze/jobs/{job_id}")
+async def get_analysis_job(job_id: str, fields: str = None, compact: bool = False):
+    """Status of an analysis job; includes the /analyze result once it is done
+    (shaped by compact/fields as for /analyze)"""
+    queue = get_job_queue()
+    job = await asyncio.to_thread(queue.get, job_id) if queue is not None else None
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found or expired")
+    if "result" in job:
+        job["result"] = shape_result(job["result"], parse_fields(fields), compact)
+    return FastJSONResponse(job)
+
 @app.get("/analysis/health")
 async def health_check():
     """Health check endpoint"""
     return {"status": "healthy", "timestamp": datetime.now().isoformat()}
 
+@app.get("/analysis/cache")
+async def cache_info():
+    """Result cache size and hit/miss counters"""
+    return await result_cache.info()
+
+@app.get("/metrics")
+async def metrics():
+    """Prometheus metrics: request and per-stage latency histograms, pool and cache state"""
+    cache_stats = result_cache.stats
+    extra = [
+        ("resume_analyzer_pool_in_flight", "gauge", "Tasks running or queued in the worker pool",
+         [({}, pool.in_flight)]),
+        ("resume_analyzer_cache_lookups_total", "counter", "Result cache lookups by entry kind and outcome",
+         [({"kind": kind, "outcome": outcome}, count)
+          for kind, counts in cache_stats.items() for outcome, count in counts.items()]),
+    ]
+    return Response(render_metrics(extra), media_type="text/plain; version=0.0.4; charset=utf-8")
+
 @app.options("/analyze")
 async def analyze_options():
     """Handle preflight requests for CORS"""
@@ -189,71 +211,212 @@ async def compare_resumes(files: list[UploadFile] = File(...)):
     if len(files) < 2:
         raise HTTPException(status_code=400, detail="At least 2 files required for comparison")
     
+    # Files are analyzed in parallel; unsupported ones are skipped as before
     results = []
-    for file in files:
-        try:
-            if file.filename.endswith(".pdf"):
-                text = extract_text_from_pdf(file.file)
-            elif file.filename.endswith(".docx"):
-                text = extract_text_from_docx(file.file)
-            else:
-                continue
-            
-            skills = advanced_skill_extractor(text)
-            sections, _ = detect_sections_advanced(text)
-            ats_score, _ = calculate_ats_score(text)
-            
-            results.append({
-                "filename": file.filename,
-                "skills_count": len(skills),
-                "sections_count": len(sections),
-                "ats_score": ats_score,
-                "skills": [skill["skill"] for skill in skills]
-            })
-        except Exception as e:
-            results.append({
-                "filename": file.filename,
-                "error": str(e)
-            })
+    for record in await analyze_all(files, "compare", tasks.build_comparison_entry):
+        record.pop("index")
+        if record.get("error") != "Unsupported file type":
+            results.append(record)
     
     return {"comparison_results": results}
 
+@app.post("/analysis/bulk")
+async def bulk_analysis(request: Request, detail: str = "summary", fields: str = None, compact: bool = False):
+    """Analyze many resumes (or ZIP archives of resumes) in parallel.
+
+    Send them as multipart "files" fields. Streams one NDJSON line per resume as soon as it is analyzed, with
+    per-file errors inline, followed by a final {"summary": ...} line.
+    detail=summary gives /analysis/compare rows, detail=full /analysis/export payloads;
+    compact and fields shape each row as for /analyze.
+    """
+    if detail == "summary":
+        kind, builder = "compare", tasks.build_comparison_entry
+    elif detail == "full":
+        kind, builder = "export", tasks.build_export
+    else:
+        raise HTTPException(status_code=400, detail="detail must be 'summary' or 'full'")
+
+    form, files = await read_bulk_form(request)
+    if not files:
+        await form.close()
+        raise HTTPException(status_code=400, detail="No files uploaded")
+
+    selected = parse_fields(fields)
+    return StreamingResponse(
+        stream_bulk_form(form, files, kind, builder, lambda record: shape_result(record, selected, compact)),
+        media_type="application/x-ndjson"
+    )
+
 @app.post("/analysis/export")
 async def export_analysis(file: UploadFile = File(...), format: str = "json"):
     """Export detailed analysis in various formats"""
     try:
         # Perform analysis
-        if file.filename.endswith(".pdf"):
-            text = extract_text_from_pdf(file.file)
-        elif file.filename.endswith(".docx"):
-            text = extract_text_from_docx(file.file)
-        else:
+        if not is_supported(file.filename):
             raise HTTPException(status_code=400, detail="Unsupported file type")
         
         # Get comprehensive analysis
-        skills_advanced = advanced_skill_extractor(text)
-        found_sections, missing_sections = detect_sections_advanced(text)
-        ats_score, ats_checks = calculate_ats_score(text)
-        content_analysis = analyze_content_quality(text)
-        
-        analysis_data = {
-            "filename": file.filename,
-            "timestamp": datetime.now().isoformat(),
-            "skills": skills_advanced,
-            "sections": {
-                "found": found_sections,
-                "missing": missing_sections
-            },
-            "ats_score": ats_score,
-            "ats_checks": ats_checks,
-            "content_analysis": content_analysis,
-            "text_preview": text[:500]
-        }
+        data = await file.read()
+        check_upload(file.filename, data)
+        analysis_data = await cached_analysis("export", tasks.build_export, data, file.filename)
         
         if format.lower() == "json":
             return JSONResponse(content=analysis_data)
         else:
             raise HTTPException(status_code=400, detail="Unsupported export format")
             
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Export failed: {str(e)}")
+
+async def _resolve_job_index(job_id=None, job_description=None, file=None):
+    """Find a compiled job index by id, or compile one from text or an uploaded JD file"""
+    if job_id:
+        index = get_job_index(job_id)
+        if index is not None:
+            return index
+    if file is not None:
+        if not is_supported(file.filename):
+            raise HTTPException(status_code=400, detail="Unsupported file type. Use PDF or DOCX.")
+        data = await file.read()
+        check_upload(file.filename, data)
+        job_description = await run_in_pool(extract_text, data, file.filename)
+    if job_description and job_description.strip():
+        return await asyncio.to_thread(compile_job_description, job_description)
+    if job_id:
+        # Indexes live per process; resend the description to recompile it
+        raise HTTPException(status_code=404, detail="Unknown job_id, send job_description again")
+    raise HTTPException(status_code=400, detail="Provide job_description text or a job description file")
+
+@app.post("/analysis/job")
+async def compile_job(job_description: str = Form(None), file: UploadFile = File(None)):
+    """Compile a job description into a reusable keyword/skill target index"""
+    index = await _resolve_job_index(job_description=job_description, file=file)
+    return {"job_id": index["job_id"], "targets": index["targets"]}
+
+@app.post("/analysis/match")
+async def match_resumes(
+    files: list[UploadFile] = File(...),
+    job_id: str = Form(None),
+    job_description: str = Form(None)
+):
+    """Score resumes (or ZIP archives of resumes) against a job description, best match first"""
+    index = await _resolve_job_index(job_id=job_id, job_description=job_description)
+    builder = functools.partial(tasks.build_job_match, index)
+
+    results = []
+    for record in await analyze_all(files, f"match:{index['job_id']}", builder):
+        record.pop("index")
+        results.append(record)
+
+    return {"job_id": index["job_id"], "results": rank_job_matches(results)}
+
+async def _index_upload(data, filename, skills=None):
+    """Add an upload to the search index; indexing problems never fail the request"""
+    if not INDEX_DB:
+        return None
+    try:
+        document = await cached_document(data, filename)
+        return await run_in_pool(tasks.index_resume, filename, document["text"], skills)
+    except Exception:
+        logger.exception("Indexing %s failed", filename)
+        return None
+
+@app.post("/analysis/index")
+async def index_resumes(files: list[UploadFile] = File(...)):
+    """Add resumes to the search index without returning a full analysis"""
+    if not INDEX_DB:
+        raise HTTPException(status_code=404, detail="Search index is disabled")
+
+    indexed = []
+    for file in files:
+        if not is_supported(file.filename):
+            indexed.append({"filename": file.filename, "error": "Unsupported file type"})
+            continue
+        data = await file.read()
+        error = upload_error(file.filename, data)
+        if error:
+            indexed.append({"filename": file.filename, "error": error})
+            continue
+        entry = await _index_upload(data, file.filename)
+        indexed.append(entry or {"filename": file.filename, "error": "Indexing failed"})
+    return {"indexed": indexed}
+
+@app.delete("/analysis/index/{resume_id}")
+async def delete_indexed_resume(resume_id: str):
+    """Remove a resume from the search index"""
+    index = get_resume_index()
+    if index is None or not await asyncio.to_thread(index.delete, resume_id):
+        raise HTTPException(status_code=404, detail="Resume not found in index")
+    return {"deleted": resume_id}
+
+@app.get("/analysis/search")
+async def search_resumes(q: str, k: int = 10):
+    """Top-k indexed resumes for a skill/keyword query, ranked by BM25 plus skill confidence"""
+    index = get_resume_index()
+    if index is None:
+        raise HTTPException(status_code=404, detail="Search index is disabled")
+    # FTS5 ranking and the count are SQLite work; keep them off the event loop
+    result = await asyncio.to_thread(index.search, q, k=max(1, min(k, 100)))
+    result["indexed_resumes"] = (await asyncio.to_thread(index.stats))["resumes"]
+    return result
+
+# Resumes a similarity matrix can be requested for at once
+MAX_SIMILARITY_IDS = 500
+
+async def _pool_analytics(analysis, *args, **options):
+    """Run an analytics function on the skill matrix of the indexed pool, off the event loop"""
+    index = get_resume_index()
+    if index is None:
+        raise HTTPException(status_code=404, detail="Search index is disabled")
+    # NumPy is only loaded once pool analytics are used
+    import analytics
+
+    def run():
+        start = time.perf_counter()
+        matrix = analytics.get_skill_matrix(index)
+        result = getattr(analytics, analysis)(
+            matrix, *args, **{name: value for name, value in options.items() if value is not None}
+        )
+        result["pool_size"] = len(matrix)
+        result["took_ms"] = round((time.perf_counter() - start) * 1000, 2)
+        return result
+
+    return await asyncio.to_thread(run)
+
+@app.get("/analysis/pool/similarity")
+async def pool_similarity(ids: str = None, k: int = 20, min_similarity: float = None):
+    """Skill-profile cosine similarity of indexed resumes: the matrix of the given ids, else the k most similar pairs"""
+    if ids:
+        resume_ids = list(dict.fromkeys(i.strip() for i in ids.split(",") if i.strip()))
+        if len(resume_ids) > MAX_SIMILARITY_IDS:
+            raise HTTPException(status_code=400, detail=f"At most {MAX_SIMILARITY_IDS} ids at once")
+        return await _pool_analytics("similarity_matrix", resume_ids)
+    return await _pool_analytics("most_similar_pairs", max(1, min(k, 1000)), min_similarity=min_similarity)
+
+@app.get("/analysis/pool/nearest/{resume_id}")
+async def pool_nearest(resume_id: str, k: int = 10):
+    """The indexed resumes most similar to one, with the skills they share"""
+    return await _pool_analytics("nearest_neighbors", resume_id, max(1, min(k, 100)))
+
+@app.post("/analysis/pool/coverage")
+async def pool_coverage(
+    job_id: str = Form(None),
+    job_description: str = Form(None),
+    file: UploadFile = File(None),
+    min_confidence: float = Form(None),
+    k: int = Form(10)
+):
+    """How the indexed pool covers a job description's skills: per-skill share, gaps and best candidates"""
+    index = await _resolve_job_index(job_id=job_id, job_description=job_description, file=file)
+    targets = [(target["term"], target["weight"]) for target in index["targets"] if target["kind"] == "skill"]
+    if not targets:
+        raise HTTPException(status_code=400, detail="The job description names no known skills")
+    result = await _pool_analytics("skill_coverage", targets, min_confidence=min_confidence, k=max(1, min(k, 100)))
+    return {"job_id": index["job_id"], **result}
+
+@app.get("/analysis/pool/clusters")
+async def pool_clusters(k: int = 5, members: int = 10):
+    """Group the indexed resumes into k clusters of similar skill profiles (k-means)"""
+    return await _pool_analytics("kmeans_clusters", max(1, min(k, 50)), max(0, min(members, 100)))
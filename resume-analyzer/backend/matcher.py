@@ -0,0 +1,144 @@
+# Compiled skill matcher (Aho-Corasick)
+from collections import deque
+
+EXACT = 2
+PARTIAL = 1
+
+
+def _is_word_char(ch):
+    """Mirror the semantics of regex \\w for a single character"""
+    return ch.isalnum() or ch == "_"
+
+
+class SkillMatcher:
+    """Find every skill variation of a taxonomy in a single pass over the text.
+
+    The automaton is built once per taxonomy. Scanning a document costs
+    O(len(text) + matches) no matter how many variations the taxonomy holds.
+    """
+
+    def __init__(self, skills_database):
+        self.skills = []            # [(category, skill_name, variations)] in taxonomy order
+        self.patterns = []          # unique variation strings
+        self._pattern_skills = []   # pattern id -> skill indices using it
+        pattern_ids = {}
+
+        for category, skills in skills_database.items():
+            for skill_name, variations in skills.items():
+                skill_index = len(self.skills)
+                self.skills.append((category, skill_name, list(variations)))
+                for variation in variations:
+                    if not variation:
+                        continue
+                    pid = pattern_ids.get(variation)
+                    if pid is None:
+                        pid = pattern_ids[variation] = len(self.patterns)
+                        self.patterns.append(variation)
+                        self._pattern_skills.append([])
+                    if skill_index not in self._pattern_skills[pid]:
+                        self._pattern_skills[pid].append(skill_index)
+
+        self._build_automaton()
+
+    def _build_automaton(self):
+        goto = [{}]
+        output = [[]]
+        for pid, pattern in enumerate(self.patterns):
+            state = 0
+            for ch in pattern:
+                nxt = goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[state][ch] = nxt
+                    goto.append({})
+                    output.append([])
+                state = nxt
+            output[state].append(pid)
+
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in goto[state].items():
+                queue.append(nxt)
+                f = fail[state]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                fail[nxt] = goto[f].get(ch, 0)
+                if output[fail[nxt]]:
+                    output[nxt] = output[nxt] + output[fail[nxt]]
+
+        self._goto = goto
+        self._fail = fail
+        self._output = output
+        self._lengths = [len(p) for p in self.patterns]
+        # Boundary requirements equivalent to r'\b' + re.escape(p) + r'\b'
+        self._head_word = [_is_word_char(p[0]) for p in self.patterns]
+        self._tail_word = [_is_word_char(p[-1]) for p in self.patterns]
+
+    def scan(self, text_lower):
+        """Return {pattern id: EXACT | PARTIAL} for every variation found in the text"""
+        goto, fail, output = self._goto, self._fail, self._output
+        lengths, head_word, tail_word = self._lengths, self._head_word, self._tail_word
+        n = len(text_lower)
+        found = {}
+        state = 0
+
+        for i, ch in enumerate(text_lower):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if not output[state]:
+                continue
+            for pid in output[state]:
+                if found.get(pid) == EXACT:
+                    continue
+                start = i - lengths[pid] + 1
+                before = start > 0 and _is_word_char(text_lower[start - 1])
+                after = i + 1 < n and _is_word_char(text_lower[i + 1])
+                if before != head_word[pid] and after != tail_word[pid]:
+                    found[pid] = EXACT
+                else:
+                    found[pid] = PARTIAL
+
+        return found
+
+    def extract(self, text_lower):
+        """Skill detection with the same confidence scoring as the legacy regex loop"""
+        return self.rank(self.scan(text_lower))
+
+    def rank(self, found):
+        """Scored skill list for scan() output (possibly merged from several scans)"""
+        status = {self.patterns[pid]: kind for pid, kind in found.items()}
+
+        touched = set()
+        for pid in found:
+            touched.update(self._pattern_skills[pid])
+
+        detected_skills = []
+        for skill_index in sorted(touched):
+            category, skill_name, variations = self.skills[skill_index]
+            confidence = 0
+            matches = []
+
+            for variation in variations:
+                kind = status.get(variation)
+                if kind == EXACT:
+                    confidence += 0.8
+                    matches.append(variation)
+                elif kind == PARTIAL:
+                    confidence += 0.4
+                    matches.append(variation)
+
+            if confidence > 0.3:  # threshold for detection
+                detected_skills.append({
+                    "skill": skill_name,
+                    "category": category,
+                    "confidence": round(confidence, 2),
+                    "matches": matches,
+                    "variations_found": len(matches)
+                })
+
+        # Sort by confidence (stable, so ties keep taxonomy order)
+        detected_skills.sort(key=lambda x: x["confidence"], reverse=True)
+        return detected_skills
@@ -0,0 +1,295 @@
+# Request and stage latency metrics
+#
+# Pool tasks time their stages with `with stage("skills"):` blocks inside a
+# collect_stages() scope and hand the durations back with their result. The
+# API process records them in Prometheus histograms (served by /metrics) and
+# in the Server-Timing header of the request that caused them.
+#
+# Histograms live in process memory: with several uvicorn workers every
+# process exposes its own series, so scrape each one (or aggregate by
+# instance) as usual for multi-process Python apps.
+#
+# Configuration (environment variables):
+#   ANALYZER_PROFILE_THRESHOLD_MS  keep a cProfile of sampled tasks slower than this (default: 0 = off)
+#   ANALYZER_PROFILE_SAMPLE_RATE   share of tasks run under the profiler (default: 0.05)
+#   ANALYZER_PROFILE_DIR           directory for the .prof files (default: profiles)
+import bisect
+import cProfile
+import contextvars
+import logging
+import os
+import random
+import re
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+PROFILE_THRESHOLD_MS = float(os.environ.get("ANALYZER_PROFILE_THRESHOLD_MS") or 0)
+PROFILE_SAMPLE_RATE = float(os.environ.get("ANALYZER_PROFILE_SAMPLE_RATE") or 0.05)
+PROFILE_DIR = os.environ.get("ANALYZER_PROFILE_DIR") or "profiles"
+
+# Seconds; covers a sub-millisecond regex pass up to a pathological PDF
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Page counts are bucketed to keep the label cardinality small
+PAGE_BUCKETS = ((1, "1"), (2, "2"), (5, "3-5"), (10, "6-10"), (30, "11-30"))
+
+
+class Histogram:
+    """Prometheus histogram with a fixed label set"""
+
+    def __init__(self, name, help_text, labels, buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self.buckets = buckets
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                # Per-bucket counts (the last one is +Inf), then sum and count
+                series = self._series[label_values] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+            series[bisect.bisect_left(self.buckets, value)] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = sorted((key, list(values)) for key, values in self._series.items())
+        for label_values, values in series:
+            labels = _format_labels(zip(self.labels, label_values))
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), values):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f'{self.name}_bucket{{{labels},le="{le}"}} {cumulative}')
+            lines.append(f"{self.name}_sum{{{labels}}} {values[-2]!r}")
+            lines.append(f"{self.name}_count{{{labels}}} {values[-1]}")
+        return "\n".join(lines)
+
+
+REQUEST_SECONDS = Histogram(
+    "resume_analyzer_request_seconds", "HTTP request latency", ("method", "path", "status")
+)
+STAGE_SECONDS = Histogram(
+    "resume_analyzer_stage_seconds", "Time spent per processing stage",
+    ("stage", "file_type", "pages"),
+)
+
+
+def _format_labels(pairs):
+    return ",".join(f'{name}="{_escape(value)}"' for name, value in pairs)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def file_type(filename):
+    """Label value for the upload's type ("pdf", "docx", ...)"""
+    return os.path.splitext(filename)[1].lower().lstrip(".") or "unknown"
+
+
+def page_bucket(pages):
+    """Label value for a page count (DOCX files have none)"""
+    if not pages:
+        return "none"
+    for limit, label in PAGE_BUCKETS:
+        if pages <= limit:
+            return label
+    return "31+"
+
+
+# Stage timing inside pool tasks
+
+_task = threading.local()
+
+
+@contextmanager
+def collect_stages(label="task"):
+    """Collect stage() durations (ms) of the enclosed work into the yielded dict.
+
+    Nested scopes share the outer dict. A sampled share of the outermost
+    scopes runs under cProfile, and the profile is kept if the work took
+    longer than ANALYZER_PROFILE_THRESHOLD_MS.
+    """
+    stages = getattr(_task, "stages", None)
+    if stages is not None:
+        yield stages
+        return
+
+    stages = _task.stages = {}
+    profiler = None
+    if PROFILE_THRESHOLD_MS > 0 and random.random() < PROFILE_SAMPLE_RATE:
+        profiler = cProfile.Profile()
+        profiler.enable()
+    start = time.perf_counter()
+    try:
+        yield stages
+    finally:
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        _task.stages = None
+        if profiler is not None:
+            profiler.disable()
+            if elapsed_ms > PROFILE_THRESHOLD_MS:
+                _save_profile(profiler, label, elapsed_ms)
+
+
+@contextmanager
+def stage(name):
+    """Time the enclosed block as stage `name` of the current collect_stages() scope"""
+    stages = getattr(_task, "stages", None)
+    if stages is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        stages[name] = stages.get(name, 0.0) + (time.perf_counter() - start) * 1000
+
+
+def _save_profile(profiler, label, elapsed_ms):
+    try:
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        safe_label = re.sub(r"[^\w.-]+", "_", label)[:80]
+        path = os.path.join(
+            PROFILE_DIR, f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{safe_label}.prof"
+        )
+        profiler.dump_stats(path)
+        logger.warning("Slow task %s took %.0f ms; profile saved to %s", label, elapsed_ms, path)
+    except OSError:
+        logger.exception("Could not save profile for %s", label)
+
+
+# Process memory (Linux reads /proc; elsewhere only the lifetime peak is known)
+
+def _proc_status_bytes(field):
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+def rss_bytes():
+    """Current resident set size, or None if unknown"""
+    return _proc_status_bytes("VmRSS")
+
+
+def peak_rss_bytes():
+    """Peak resident set size since start (or since reset_peak_rss), or None"""
+    peak = _proc_status_bytes("VmHWM")
+    if peak is None:
+        try:
+            import resource
+        except ImportError:
+            return None
+        # ru_maxrss is in KiB on Linux and bytes on macOS
+        scale = 1 if sys.platform == "darwin" else 1024
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+    return peak
+
+
+def reset_peak_rss():
+    """Restart peak tracking at the current RSS where the OS allows it; returns the baseline"""
+    try:
+        with open("/proc/self/clear_refs", "w") as clear_refs:
+            clear_refs.write("5")
+        return rss_bytes()
+    except OSError:
+        return peak_rss_bytes()
+
+
+# Per-request timings in the API process
+
+_request_timings = contextvars.ContextVar("request_timings", default=None)
+
+
+def start_request_timings():
+    """Begin collecting Server-Timing entries for the current request"""
+    timings = {}
+    _request_timings.set(timings)
+    return timings
+
+
+def record_stages(stages, filename, pages=None):
+    """Record a task's stage durations (ms) in the histograms and the current request.
+
+    For requests covering several files the Server-Timing durations are sums
+    over all of them.
+    """
+    kind = file_type(filename)
+    pages_label = page_bucket(pages)
+    for name, ms in stages.items():
+        STAGE_SECONDS.observe(ms / 1000, name, kind, pages_label)
+    timings = _request_timings.get()
+    if timings is not None:
+        for name, ms in stages.items():
+            timings[name] = timings.get(name, 0.0) + ms
+
+
+_request_memory = contextvars.ContextVar("request_memory", default=None)
+
+
+def start_request_memory():
+    """Begin collecting worker memory figures for the current request"""
+    memory = {"worker_peak_bytes": None}
+    _request_memory.set(memory)
+    return memory
+
+
+def record_worker_memory(peak_bytes):
+    """Note how far a pool task raised its worker's RSS (the request keeps the maximum)"""
+    memory = _request_memory.get()
+    if memory is not None and peak_bytes is not None:
+        memory["worker_peak_bytes"] = max(memory["worker_peak_bytes"] or 0, peak_bytes)
+
+
+def record_cache(status):
+    """Note a cache hit/miss for the current request's Server-Timing header"""
+    timings = _request_timings.get()
+    if timings is not None:
+        timings["cache"] = status
+
+
+def observe_request(method, path, status, seconds):
+    REQUEST_SECONDS.observe(seconds, method, path, str(status))
+
+
+def server_timing_header(timings, total_ms):
+    """Server-Timing value: one entry per stage plus the request total"""
+    entries = []
+    for name, value in timings.items():
+        if isinstance(value, str):
+            entries.append(f'{name};desc="{value}"')
+        else:
+            entries.append(f"{name};dur={value:.1f}")
+    entries.append(f"total;dur={total_ms:.1f}")
+    return ", ".join(entries)
+
+
+def render_metrics(extra=()):
+    """Prometheus text exposition of the histograms plus extra metrics.
+
+    extra is an iterable of (name, type, help, [(labels dict, value), ...]),
+    type being "gauge" or "counter".
+    """
+    parts = [REQUEST_SECONDS.render(), STAGE_SECONDS.render()]
+    for name, metric_type, help_text, samples in extra:
+        lines = [f"# HELP {name} {help_text}", f"# TYPE {name} {metric_type}"]
+        for labels, value in samples:
+            label_text = "{" + _format_labels(labels.items()) + "}" if labels else ""
+            lines.append(f"{name}{label_text} {value}")
+        parts.append("\n".join(lines))
+    return "\n".join(parts) + "\n"
@@ -0,0 +1,68 @@
+# In-memory PDF rendering for /generate_resume
+import io
+
+from reportlab.lib.pagesizes import letter
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfgen import canvas
+
+# Static layout, shared by every report
+PAGE_WIDTH, PAGE_HEIGHT = letter
+MARGIN = 50
+TITLE_FONT = ("Helvetica-Bold", 16)
+HEADING_FONT = ("Helvetica-Bold", 12)
+BODY_FONT = ("Helvetica", 12)
+
+# Resolve the fonts once per process instead of on the first request
+for _font in (TITLE_FONT[0], BODY_FONT[0]):
+    pdfmetrics.getFont(_font)
+
+
+def render_report(text, skills, suggestions):
+    """Render the improved-resume report and return the PDF bytes.
+
+    Each call draws into its own buffer, so concurrent requests never share
+    a file and nothing touches the disk.
+    """
+    buffer = io.BytesIO()
+    c = canvas.Canvas(buffer, pagesize=letter)
+    y = PAGE_HEIGHT - MARGIN
+
+    # Header
+    c.setFont(*TITLE_FONT)
+    c.drawString(MARGIN, y, "Improved Resume")
+    y -= 30
+
+    # Original snippet
+    c.setFont(*BODY_FONT)
+    c.drawString(MARGIN, y, "Original Text Snippet:")
+    y -= 20
+    for line in text[:1000].split("\n"):
+        c.drawString(MARGIN, y, line[:80])
+        y -= 15
+        if y < MARGIN:
+            c.showPage()
+            y = PAGE_HEIGHT - MARGIN
+
+    y -= 20
+    # Skills
+    c.setFont(*HEADING_FONT)
+    c.drawString(MARGIN, y, "Detected Skills:")
+    y -= 20
+    c.setFont(*BODY_FONT)
+    c.drawString(MARGIN, y, ", ".join(skills))
+    y -= 30
+
+    # Suggestions
+    c.setFont(*HEADING_FONT)
+    c.drawString(MARGIN, y, "Improvement Suggestions:")
+    y -= 20
+    c.setFont(*BODY_FONT)
+    for s in suggestions:
+        c.drawString(MARGIN, y, f"- {s}")
+        y -= 15
+        if y < MARGIN:
+            c.showPage()
+            y = PAGE_HEIGHT - MARGIN
+
+    c.save()
+    return buffer.getvalue()
@@ -0,0 +1,214 @@
+# How responses go out: fast JSON, compact/field-selected results, compression
+#
+# JSON is serialized with orjson when it is installed (several times faster
+# than the standard library for analysis-sized payloads), else with json.
+# Endpoints returning large results hand them to FastJSONResponse directly,
+# which also skips FastAPI's jsonable_encoder pass.
+#
+# shape_result() implements the ?compact=true and ?fields= parameters:
+# compact mode lists every skill once (categories refer to it by index) and
+# drops the text snippet and zero-count keyword blocks; fields keeps only
+# the named top-level keys.
+#
+# CompressionMiddleware compresses JSON and text responses with brotli (if
+# the brotli package is installed) or gzip, whichever the client accepts.
+# NDJSON streams are compressed and flushed chunk by chunk, so lines still
+# arrive as soon as they are written; other responses are compressed whole.
+#
+# Configuration (environment variables):
+#   ANALYZER_COMPRESS_MIN_BYTES  smallest response body compressed (default: 1024, 0 disables)
+import json
+import os
+import zlib
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # optional speedup
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # optional; gzip is used instead
+    brotli = None
+
+COMPRESS_MIN_BYTES = int(os.environ.get("ANALYZER_COMPRESS_MIN_BYTES") or 1024)
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+# Sent compressed chunk by chunk instead of collected first
+STREAMED_CONTENT_TYPES = ("application/x-ndjson",)
+
+# Keys that are never dropped by ?fields=, so records stay identifiable
+ALWAYS_INCLUDED_FIELDS = ("index", "filename", "error")
+
+
+def dumps(content):
+    """Serialize content to compact UTF-8 JSON bytes"""
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse serialized by dumps()"""
+
+    def render(self, content):
+        return dumps(content)
+
+
+def parse_fields(fields):
+    """Set of field names from a comma-separated ?fields= value (None if not given)"""
+    if not fields:
+        return None
+    return {name.strip() for name in fields.split(",") if name.strip()}
+
+
+def shape_result(result, fields=None, compact=False):
+    """Apply compact mode and field selection (a set from parse_fields) to a result dict"""
+    if compact:
+        result = _compact(result)
+    if fields is not None:
+        result = {
+            key: value for key, value in result.items()
+            if key in fields or key in ALWAYS_INCLUDED_FIELDS
+        }
+    return result
+
+
+def _compact(result):
+    if "skills_advanced" in result:
+        skills = result["skills_advanced"]
+    elif result.get("skills") and isinstance(result["skills"][0], dict):
+        skills = result["skills"]
+    else:
+        skills = None
+
+    shaped = {}
+    for key, value in result.items():
+        if key in ("text_snippet", "text_preview", "skills_detected", "skills_by_category"):
+            continue
+        if key in ("skills_advanced", "skills") and skills is not None:
+            categories = {}
+            for index, skill in enumerate(skills):
+                categories.setdefault(skill["category"], []).append(index)
+            shaped["skills"] = [
+                {"skill": skill["skill"], "confidence": skill["confidence"], "matches": skill["matches"]}
+                for skill in skills
+            ]
+            shaped["skill_categories"] = categories
+        elif key == "keyword_analysis":
+            # Density and score follow from the count and the word count
+            shaped[key] = {keyword: info["count"] for keyword, info in value.items() if info["count"]}
+        else:
+            shaped[key] = value
+    return shaped
+
+
+def _compressible(content_type):
+    return content_type.startswith("text/") or "json" in content_type
+
+
+def _accepted_encoding(headers):
+    accept = dict(headers).get(b"accept-encoding", b"").decode("latin-1").lower()
+    offered = {
+        part.split(";")[0].strip() for part in accept.split(",")
+        if not part.strip().endswith(("q=0", "q=0.0"))
+    }
+    if brotli is not None and "br" in offered:
+        return "br"
+    if "gzip" in offered:
+        return "gzip"
+    return None
+
+
+class _Compressor:
+    def __init__(self, encoding):
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=BROTLI_QUALITY)
+            self._zlib = None
+        else:
+            self._brotli = None
+            self._zlib = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)  # 31: gzip container
+
+    def compress(self, data, final):
+        if self._brotli is not None:
+            return self._brotli.process(data) + (self._brotli.finish() if final else self._brotli.flush())
+        return self._zlib.compress(data) + self._zlib.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+
+class CompressionMiddleware:
+    """ASGI middleware compressing JSON/text responses (brotli or gzip).
+
+    Ordinary responses are collected until complete, so small ones can be
+    left alone and compressed ones get a Content-Length; STREAMED_CONTENT_TYPES
+    are compressed and flushed chunk by chunk as they are sent.
+    """
+
+    def __init__(self, app, minimum_size=COMPRESS_MIN_BYTES):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        encoding = _accepted_encoding(scope["headers"]) if scope["type"] == "http" else None
+        if encoding is None or not self.minimum_size:
+            await self.app(scope, receive, send)
+            return
+
+        start = None
+        headers = None
+        mode = None  # "pass", "buffer" or "stream", decided by the response headers
+        chunks = []
+        compressor = _Compressor(encoding)
+
+        def compressed_headers(length=None):
+            kept = [(name, value) for name, value in headers if name != b"content-length"]
+            kept.append((b"content-encoding", encoding.encode()))
+            kept.append((b"vary", b"Accept-Encoding"))
+            if length is not None:
+                kept.append((b"content-length", str(length).encode()))
+            return kept
+
+        async def compressing_send(message):
+            nonlocal start, headers, mode
+            if message["type"] == "http.response.start":
+                start = message
+                headers = [(name.lower(), value) for name, value in message["headers"]]
+                header_map = dict(headers)
+                content_type = header_map.get(b"content-type", b"").decode("latin-1")
+                if b"content-encoding" in header_map or not _compressible(content_type):
+                    mode = "pass"
+                    await send(message)
+                elif content_type.split(";")[0].strip() in STREAMED_CONTENT_TYPES:
+                    mode = "stream"
+                    await send(dict(message, headers=compressed_headers()))
+                else:
+                    mode = "buffer"
+                return
+            if message["type"] != "http.response.body" or mode == "pass":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if mode == "stream":
+                await send({
+                    "type": "http.response.body",
+                    "body": compressor.compress(body, final=not more_body),
+                    "more_body": more_body,
+                })
+                return
+
+            chunks.append(body)
+            if more_body:
+                return
+            body = b"".join(chunks)
+            if len(body) < self.minimum_size:
+                await send(start)
+            else:
+                body = compressor.compress(body, final=True)
+                await send(dict(start, headers=compressed_headers(len(body))))
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, compressing_send)
@@ -0,0 +1,243 @@
+# Persistent resume search index
+#
+# Every analyzed resume is stored in a local SQLite file: its text and skill
+# names in an FTS5 inverted index (ranked with BM25), and its
+# advanced_skill_extractor skills with their confidence in a side table.
+# Search combines both, so recruiters can find candidates without
+# re-uploading files. Resumes are identified by a hash of their extracted
+# text, so re-indexing the same resume replaces it.
+#
+# Configuration (environment variables):
+#   ANALYZER_INDEX_DB  path of the index file (default: resume_index.sqlite3, "" disables)
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+from analyzer import advanced_skill_extractor
+
+INDEX_DB = os.environ.get("ANALYZER_INDEX_DB", "resume_index.sqlite3")
+
+# How much one unit of skill confidence adds to the BM25 score
+SKILL_WEIGHT = 2.0
+
+# BM25 candidates fetched per requested result before the skill re-ranking
+CANDIDATE_FACTOR = 10
+
+# Matches scored with BM25 per query, newest first. Scoring every match of a
+# common skill costs hundreds of ms at 100k resumes; this keeps queries in the
+# tens of ms, at the price of older resumes only ranking if they are among
+# the newest MAX_RANKED_MATCHES that match.
+MAX_RANKED_MATCHES = 5000
+
+_QUERY_WORD = re.compile(r'[\w+#]+')
+
+
+def resume_id_for(text):
+    """Stable id of a resume: hash of its extracted text"""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+
+
+class ResumeIndex:
+    """FTS5/BM25 inverted index plus per-resume skill confidences"""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        # Changes made through this connection (PRAGMA data_version counts the others')
+        self._changes = 0
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS resumes ("
+                "rowid INTEGER PRIMARY KEY, resume_id TEXT UNIQUE NOT NULL, "
+                "filename TEXT, indexed_at TEXT)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS resume_skills ("
+                "resume_rowid INTEGER NOT NULL, skill TEXT NOT NULL, confidence REAL NOT NULL, "
+                "PRIMARY KEY (resume_rowid, skill)) WITHOUT ROWID"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS resume_skills_skill ON resume_skills (skill)"
+            )
+            exists = self._conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = 'resume_fts'"
+            ).fetchone()
+            if not exists:
+                # Keep "c++" / "c#" as single tokens; skill names weigh double in BM25
+                self._conn.execute(
+                    "CREATE VIRTUAL TABLE resume_fts USING fts5("
+                    "content, skills, tokenize = \"unicode61 tokenchars '+#'\")"
+                )
+                self._conn.execute(
+                    "INSERT INTO resume_fts (resume_fts, rank) VALUES ('rank', 'bm25(1.0, 2.0)')"
+                )
+
+    def add(self, filename, text, skills):
+        """Index (or re-index) a resume; skills is advanced_skill_extractor output"""
+        return self.add_many([(filename, text, skills)])[0]
+
+    def add_many(self, entries):
+        """Index (filename, text, skills) entries in one transaction; returns their ids"""
+        resume_ids = []
+        with self._lock, self._conn:
+            for filename, text, skills in entries:
+                resume_ids.append(self._add(filename, text, skills))
+            self._changes += 1
+        return resume_ids
+
+    def _add(self, filename, text, skills):
+        resume_id = resume_id_for(text)
+        self._delete(resume_id)
+        rowid = self._conn.execute(
+            "INSERT INTO resumes (resume_id, filename, indexed_at) VALUES (?, ?, ?)",
+            (resume_id, filename, datetime.now().isoformat()),
+        ).lastrowid
+        self._conn.execute(
+            "INSERT INTO resume_fts (rowid, content, skills) VALUES (?, ?, ?)",
+            (rowid, text, " ".join(skill["skill"] for skill in skills)),
+        )
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO resume_skills (resume_rowid, skill, confidence) VALUES (?, ?, ?)",
+            [(rowid, skill["skill"], skill["confidence"]) for skill in skills],
+        )
+        return resume_id
+
+    def delete(self, resume_id):
+        """Remove a resume; returns False if it was not indexed"""
+        with self._lock, self._conn:
+            self._changes += 1
+            return self._delete(resume_id)
+
+    def _delete(self, resume_id):
+        row = self._conn.execute(
+            "SELECT rowid FROM resumes WHERE resume_id = ?", (resume_id,)
+        ).fetchone()
+        if row is None:
+            return False
+        self._conn.execute("DELETE FROM resume_fts WHERE rowid = ?", row)
+        self._conn.execute("DELETE FROM resume_skills WHERE resume_rowid = ?", row)
+        self._conn.execute("DELETE FROM resumes WHERE rowid = ?", row)
+        return True
+
+    def search(self, query, k=10):
+        """Top-k resumes for a skill/keyword query ("python, machine learning, aws").
+
+        Comma-separated phrases are matched as phrases and word by word with
+        BM25 (over the newest MAX_RANKED_MATCHES matches); the best candidates
+        are then boosted by the confidence of the taxonomy skills the query
+        names.
+        """
+        start = time.perf_counter()
+        fts_query = _fts_query(query)
+        if not fts_query:
+            return {"query": query, "query_skills": [], "results": [], "took_ms": 0.0}
+        query_skills = _query_skills(query)
+
+        with self._lock:
+            # FTS5 walks matches in rowid order, so the LIMIT stops it before
+            # the rest are scored
+            candidates = self._conn.execute(
+                "SELECT r.rowid, r.resume_id, r.filename, -m.score FROM ("
+                "SELECT rowid, bm25(resume_fts, 1.0, 2.0) AS score FROM resume_fts "
+                "WHERE resume_fts MATCH ? ORDER BY rowid DESC LIMIT ?"
+                ") AS m JOIN resumes r ON r.rowid = m.rowid ORDER BY m.score LIMIT ?",
+                (fts_query, MAX_RANKED_MATCHES, k * CANDIDATE_FACTOR),
+            ).fetchall()
+
+            skill_scores = {}
+            if candidates and query_skills:
+                rowids = [row[0] for row in candidates]
+                rows = self._conn.execute(
+                    f"SELECT resume_rowid, skill, confidence FROM resume_skills "
+                    f"WHERE resume_rowid IN ({','.join('?' * len(rowids))}) "
+                    f"AND skill IN ({','.join('?' * len(query_skills))})",
+                    rowids + query_skills,
+                ).fetchall()
+                for rowid, skill, confidence in rows:
+                    skill_scores.setdefault(rowid, {})[skill] = confidence
+
+        results = []
+        for rowid, resume_id, filename, text_score in candidates:
+            skills = skill_scores.get(rowid, {})
+            skill_score = sum(skills.values())
+            results.append({
+                "resume_id": resume_id,
+                "filename": filename,
+                "score": round(text_score + SKILL_WEIGHT * skill_score, 4),
+                "text_score": round(text_score, 4),
+                "skill_score": round(skill_score, 2),
+                "matched_skills": sorted(skills),
+            })
+        results.sort(key=lambda r: r["score"], reverse=True)
+
+        return {
+            "query": query,
+            "query_skills": query_skills,
+            "results": results[:k],
+            "took_ms": round((time.perf_counter() - start) * 1000, 2),
+        }
+
+    def generation(self):
+        """Changes whenever the index is modified, by this process or another"""
+        with self._lock:
+            data_version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+            return data_version, self._changes
+
+    def skill_table(self):
+        """All indexed resumes as (rowid, resume_id, filename) and their (rowid, skill, confidence) rows"""
+        with self._lock:
+            resumes = self._conn.execute(
+                "SELECT rowid, resume_id, filename FROM resumes ORDER BY rowid"
+            ).fetchall()
+            skills = self._conn.execute(
+                "SELECT resume_rowid, skill, confidence FROM resume_skills"
+            ).fetchall()
+        return resumes, skills
+
+    def stats(self):
+        with self._lock:
+            count = self._conn.execute("SELECT COUNT(*) FROM resumes").fetchone()[0]
+        return {"path": self.path, "resumes": count}
+
+    def close(self):
+        self._conn.close()
+
+
+def _query_skills(query):
+    """Taxonomy skills named by the query (a variation equal to a query phrase or word)"""
+    wanted = set()
+    for phrase in query.lower().split(","):
+        phrase = phrase.strip()
+        wanted.add(phrase)
+        wanted.update(phrase.split())
+    return sorted({skill["skill"] for skill in advanced_skill_extractor(query)
+                   if wanted.intersection(skill["matches"])})
+
+
+def _fts_query(query):
+    """Build an FTS5 OR-query from comma-separated phrases and their words"""
+    terms = []
+    for phrase in query.lower().split(","):
+        words = _QUERY_WORD.findall(phrase)
+        if len(words) > 1:
+            terms.append('"' + " ".join(words) + '"')
+        terms.extend(f'"{word}"' for word in words)
+    return " OR ".join(dict.fromkeys(terms))
+
+
+_index = None
+
+
+def get_resume_index():
+    """The process-wide index, opened on first use (None when disabled)"""
+    global _index
+    if _index is None and INDEX_DB:
+        _index = ResumeIndex(INDEX_DB)
+    return _index
@@ -0,0 +1,233 @@
+# Extraction + analysis task bodies.
+# These run inside the worker pool (see workers.py), so they take plain
+# bytes/str arguments and return JSON-ready dicts that pickle cheaply.
+from datetime import datetime
+
+import os
+
+from analyzer import (
+    advanced_skill_extractor, detect_sections_advanced, calculate_completeness_advanced,
+    analyze_keyword_density, calculate_ats_score, analyze_content_quality,
+    generate_improvement_suggestions, ATS_KEYWORDS, simple_skill_extractor, detect_sections,
+    match_job_description, get_context, split_sections, section_features,
+    context_from_sections, section_hash
+)
+from analyzer import warmup as warmup_analyzer
+from extraction import extract_document, extraction_info, load_backends
+from metrics import collect_stages, stage
+from search import get_resume_index
+
+
+def build_analysis(text, filename):
+    """Full /analyze response body for already-extracted text (or a prepared AnalysisContext)"""
+    # Shared per-document state: lowercased/tokenized once, sub-results memoized
+    ctx = get_context(text)
+    text = ctx.text
+
+    # 2️⃣ Advanced skill analysis
+    with stage("skills"):
+        skills_advanced = advanced_skill_extractor(ctx)
+    skills_simple = [skill["skill"] for skill in skills_advanced]
+
+    # 3️⃣ Section analysis
+    with stage("sections"):
+        found_sections, missing_sections = detect_sections_advanced(ctx)
+
+    # 4️⃣ ATS optimization analysis
+    with stage("ats"):
+        ats_score, ats_checks = calculate_ats_score(ctx)
+    with stage("keywords"):
+        keyword_analysis = analyze_keyword_density(ctx, ATS_KEYWORDS)
+
+    # 5️⃣ Content quality analysis
+    with stage("content"):
+        content_analysis = analyze_content_quality(ctx)
+
+    # 6️⃣ Calculate advanced completeness
+    with stage("completeness"):
+        completeness = calculate_completeness_advanced(found_sections, skills_advanced, ats_score)
+
+    # 7️⃣ Generate comprehensive suggestions
+    with stage("suggestions"):
+        suggestions = generate_improvement_suggestions(ctx, skills_advanced, found_sections, ats_score)
+
+    # 8️⃣ Skill categorization
+    skills_by_category = {}
+    for skill in skills_advanced:
+        category = skill["category"]
+        if category not in skills_by_category:
+            skills_by_category[category] = []
+        skills_by_category[category].append(skill)
+
+    return {
+        "text_snippet": text[:1000],
+        "skills_detected": skills_simple,
+        "skills_advanced": skills_advanced,
+        "skills_by_category": skills_by_category,
+        "found_sections": found_sections,
+        "missing_sections": missing_sections,
+        "completeness": completeness,
+        "ats_score": ats_score,
+        "ats_checks": ats_checks,
+        "keyword_analysis": keyword_analysis,
+        "content_analysis": content_analysis,
+        "suggestions": suggestions,
+        "analysis_timestamp": datetime.now().isoformat(),
+        "file_info": {
+            "filename": filename,
+            "file_size": len(text),
+            "word_count": content_analysis["word_count"]
+        }
+    }
+
+
+def build_comparison_entry(text, filename):
+    """One /analysis/compare result row for already-extracted text"""
+    ctx = get_context(text)
+    skills = advanced_skill_extractor(ctx)
+    sections, _ = detect_sections_advanced(ctx)
+    ats_score, _ = calculate_ats_score(ctx)
+
+    return {
+        "filename": filename,
+        "skills_count": len(skills),
+        "sections_count": len(sections),
+        "ats_score": ats_score,
+        "skills": [skill["skill"] for skill in skills]
+    }
+
+
+def build_export(text, filename):
+    """/analysis/export payload for already-extracted text"""
+    ctx = get_context(text)
+    skills_advanced = advanced_skill_extractor(ctx)
+    found_sections, missing_sections = detect_sections_advanced(ctx)
+    ats_score, ats_checks = calculate_ats_score(ctx)
+    content_analysis = analyze_content_quality(ctx)
+
+    return {
+        "filename": filename,
+        "timestamp": datetime.now().isoformat(),
+        "skills": skills_advanced,
+        "sections": {
+            "found": found_sections,
+            "missing": missing_sections
+        },
+        "ats_score": ats_score,
+        "ats_checks": ats_checks,
+        "content_analysis": content_analysis,
+        "text_preview": ctx.text[:500]
+    }
+
+
+def build_job_match(job_index, text, filename):
+    """Score one resume against a compiled job index (bind job_index with functools.partial)"""
+    return {"filename": filename, **match_job_description(text, job_index)}
+
+
+def index_resume(filename, text, skills=None):
+    """Add a resume to the search index (skills are extracted if not given)"""
+    if skills is None:
+        skills = advanced_skill_extractor(text)
+    resume_id = get_resume_index().add(filename, text, skills)
+    return {"resume_id": resume_id, "filename": filename, "skills_indexed": len(skills)}
+
+
+def build_report_data(text, filename):
+    """Text, skills and suggestions used to render /generate_resume"""
+    ctx = get_context(text)
+    result = simple_skill_extractor(ctx)
+    found_sections, missing_sections = detect_sections(ctx)
+    return {
+        "text": ctx.text,
+        "skills": result["skills_found"],
+        "suggestions": [f"Add {sec} section" for sec in missing_sections]
+    }
+
+
+def document_context(document):
+    """AnalysisContext of an extracted document, with its line styles for the layout model"""
+    return get_context(document["text"], document.get("line_styles"))
+
+
+def build_from_document(builder, document, filename):
+    """Run builder on an extracted document and attach its extraction metadata.
+
+    Returns (result, stage timings in ms).
+    """
+    with collect_stages(filename) as stages:
+        with stage("analysis"):
+            result = builder(document_context(document), filename)
+    result["extraction"] = extraction_info(document)
+    return result, stages
+
+
+def extract_and_build(builder, data, filename):
+    """Extract the document and build on it; returns (document, result, stage timings)
+    so the document and result can be cached"""
+    with collect_stages(filename) as stages:
+        with stage("extract"):
+            document = extract_document(data, filename)
+        result, _ = build_from_document(builder, document, filename)
+    return document, result, stages
+
+
+def build_sectioned_analysis(document, filename, known):
+    """build_analysis for an extracted document, reusing cached section features.
+
+    known maps section hashes to section_features() from earlier documents;
+    only the other sections are scanned. Returns (result, the newly computed
+    features by hash, stage timings in ms).
+    """
+    with collect_stages(filename) as stages:
+        with stage("analysis"):
+            ctx = document_context(document)
+            sections = split_sections(ctx)
+            features = []
+            computed = {}
+            with stage("section_scan"):
+                for section in sections:
+                    feature = known.get(section["hash"]) or computed.get(section["hash"])
+                    if feature is None:
+                        feature = computed[section["hash"]] = section_features(section["text"])
+                    features.append(feature)
+            result = build_analysis(context_from_sections(ctx, features), filename)
+
+    result["extraction"] = extraction_info(document)
+    result["version_id"] = section_hash(document["text"])
+    result["sections"] = [
+        {
+            "name": section["name"],
+            "heading": section["heading"],
+            "hash": section["hash"],
+            "reused": section["hash"] in known
+        }
+        for section in sections
+    ]
+    return result, computed, stages
+
+
+def extract_measured(data, filename):
+    """extract_document plus its stage timings"""
+    with collect_stages(filename) as stages:
+        with stage("extract"):
+            document = extract_document(data, filename)
+    return document, stages
+
+
+def warmup():
+    """Prepare a worker: rule tables, PDF backend and one small analysis; returns the pid"""
+    warmup_analyzer()
+    load_backends()
+    build_analysis("Summary\nDeveloped Python services, improving latency by 20%.", "warmup.pdf")
+    return os.getpid()
+
+
+# Pool entry point: extract, analyze and render in one worker round-trip
+def report_file(data, filename):
+    """Extract, analyze and render the /generate_resume PDF; returns its bytes"""
+    # Imported here so only workers that render reports load reportlab
+    from report import render_report
+
+    report = build_report_data(document_context(extract_document(data, filename)), filename)
+    return render_report(report["text"], report["skills"], report["suggestions"])
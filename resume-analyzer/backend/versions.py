@@ -0,0 +1,82 @@
+# Resume version history for /analyze score diffs
+#
+# Every /analyze result leaves a small summary (scores, skills, section
+# hashes) in the result cache under its version_id, the hash of the
+# extracted text. An upload is compared only with the version its client
+# names in the previous_version field: version ids are never looked up by
+# filename, so one client's upload is never diffed against (and never
+# reveals) another client's resume that happens to share its name.
+#
+# Summaries are ordinary result cache entries. The in-memory tier is an LRU
+# of ANALYZER_CACHE_SIZE entries shared with text and analysis results, so a
+# busy server can evict a version within minutes; with ANALYZER_CACHE_DB the
+# disk tier keeps it up to ANALYZER_CACHE_TTL (and its row limit). A
+# previous_version that is no longer cached gets no diff (null).
+from cache import result_cache
+
+
+def _version_key(version_id):
+    return f"version:{version_id}"
+
+
+def version_summary(result):
+    """The parts of an /analyze result that later versions are compared with"""
+    content = result["content_analysis"]
+    return {
+        "version_id": result["version_id"],
+        "filename": result["file_info"]["filename"],
+        "analyzed_at": result["analysis_timestamp"],
+        "scores": {
+            "ats_score": result["ats_score"],
+            "completeness": result["completeness"],
+            "skills_count": len(result["skills_detected"]),
+            "word_count": content["word_count"],
+            "action_verb_count": content["action_verb_count"],
+            "number_count": content["number_count"],
+            "keyword_density": round(content["keyword_density"], 2),
+        },
+        "skills": result["skills_detected"],
+        "sections": {section["name"]: section["hash"] for section in result["sections"]},
+    }
+
+
+def diff_versions(previous, current):
+    """Score changes and changed sections between two version summaries"""
+    scores = {}
+    for name, value in current["scores"].items():
+        before = previous["scores"].get(name)
+        scores[name] = {
+            "previous": before,
+            "current": value,
+            "change": round(value - before, 2) if before is not None else None,
+        }
+    previous_skills = set(previous["skills"])
+    current_skills = set(current["skills"])
+    return {
+        "previous_version": previous["version_id"],
+        "previous_analyzed_at": previous["analyzed_at"],
+        "scores": scores,
+        "skills_added": [skill for skill in current["skills"] if skill not in previous_skills],
+        "skills_removed": [skill for skill in previous["skills"] if skill not in current_skills],
+        "sections_changed": [
+            name for name, section_hash in current["sections"].items()
+            if previous["sections"].get(name) not in (None, section_hash)
+        ],
+        "sections_added": [name for name in current["sections"] if name not in previous["sections"]],
+        "sections_removed": [name for name in previous["sections"] if name not in current["sections"]],
+    }
+
+
+async def record_version(result, previous_version=None):
+    """Remember this version of the resume; returns its diff against previous_version (or None)"""
+    current = version_summary(result)
+    previous_id = previous_version
+    if previous_id == current["version_id"]:
+        # The same text again: keep comparing with the version before it
+        stored = await result_cache.get("version", _version_key(previous_id))
+        previous_id = stored.get("previous_version") if stored else None
+
+    previous = await result_cache.get("version", _version_key(previous_id)) if previous_id else None
+    current["previous_version"] = previous["version_id"] if previous is not None else None
+    await result_cache.set(_version_key(current["version_id"]), current)
+    return diff_versions(previous, current) if previous is not None else None
@@ -0,0 +1,141 @@
+# Process-pool execution layer for blocking extraction and analysis
+#
+# pdfplumber, python-docx and the analyzer are CPU-bound and synchronous.
+# Running them inside an async endpoint blocks the uvicorn event loop, so the
+# endpoints hand them to this pool instead.
+#
+# Configuration (environment variables):
+#   ANALYZER_WORKERS              worker processes (default: CPU count, 0 = thread fallback)
+#   ANALYZER_QUEUE_SIZE           tasks allowed to wait for a worker before 503 (default: 32)
+#   ANALYZER_MAX_TASKS_PER_CHILD  recycle a worker after N tasks (default: 50, 0 = never)
+import asyncio
+import collections
+import functools
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from fastapi import HTTPException
+
+from metrics import peak_rss_bytes, record_worker_memory, reset_peak_rss
+
+
+def _env_int(name, default):
+    value = os.environ.get(name)
+    return int(value) if value not in (None, "") else default
+
+
+POOL_WORKERS = _env_int("ANALYZER_WORKERS", os.cpu_count() or 1)
+POOL_QUEUE_SIZE = _env_int("ANALYZER_QUEUE_SIZE", 32)
+POOL_MAX_TASKS_PER_CHILD = _env_int("ANALYZER_MAX_TASKS_PER_CHILD", 50)
+
+# Seconds a client is told to wait when the queue is full
+RETRY_AFTER_SECONDS = 5
+
+
+def _run_measured(fn, *args):
+    """Run fn in a worker process; returns (result, peak RSS growth in bytes or None)"""
+    baseline = reset_peak_rss()
+    result = fn(*args)
+    peak = peak_rss_bytes()
+    growth = peak - baseline if peak is not None and baseline is not None else None
+    return result, growth
+
+
+class WorkerPool:
+    """Bounded process pool; at most workers + queue_size tasks are in flight"""
+
+    def __init__(self, workers=POOL_WORKERS, queue_size=POOL_QUEUE_SIZE,
+                 max_tasks_per_child=POOL_MAX_TASKS_PER_CHILD):
+        self.workers = workers
+        self.queue_size = queue_size
+        self.max_tasks_per_child = max_tasks_per_child
+        self.capacity = max(workers, 1) + queue_size
+        self.in_flight = 0
+        self._executor = None
+        # Tasks waiting for capacity (run(..., wait=True)), oldest first
+        self._waiters = collections.deque()
+
+    @property
+    def parallelism(self):
+        """Tasks that can actually run at once: the worker processes, or the default thread pool's size"""
+        return self.workers if self.workers > 0 else min(32, (os.cpu_count() or 1) + 4)
+
+    def _get_executor(self):
+        if self.workers <= 0:
+            return None  # default thread pool: still off the event loop
+        if self._executor is None:
+            kwargs = {"max_workers": self.workers}
+            if self.max_tasks_per_child > 0 and sys.version_info >= (3, 11):
+                # Worker recycling needs Python 3.11+ and a non-fork start method
+                kwargs["max_tasks_per_child"] = self.max_tasks_per_child
+                kwargs["mp_context"] = multiprocessing.get_context("spawn")
+            self._executor = ProcessPoolExecutor(**kwargs)
+        return self._executor
+
+    async def run(self, fn, *args, wait=False):
+        """Run fn(*args) in the pool; if the queue is full, raise 503 or, with wait, wait for room"""
+        while self.in_flight >= self.capacity:
+            if not wait:
+                raise HTTPException(
+                    status_code=503,
+                    detail="Server busy, please retry shortly",
+                    headers={"Retry-After": str(RETRY_AFTER_SECONDS)},
+                )
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                # Woken just before being cancelled: pass the free slot on
+                if waiter.done() and not waiter.cancelled():
+                    self._wake_waiter()
+                raise
+            finally:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+
+        self.in_flight += 1
+        executor = None
+        try:
+            loop = asyncio.get_running_loop()
+            executor = self._get_executor()
+            if executor is None:
+                # Threads share the process, so per-task memory can't be told apart
+                return await loop.run_in_executor(None, functools.partial(fn, *args))
+            result, peak_growth = await loop.run_in_executor(
+                executor, functools.partial(_run_measured, fn, *args)
+            )
+            record_worker_memory(peak_growth)
+            return result
+        except BrokenProcessPool:
+            # A worker died (e.g. OOM on a huge PDF); start a fresh pool for later
+            # tasks, unless another task of the broken pool already has
+            if self._executor is executor:
+                self.shutdown(wait=False)
+            raise
+        finally:
+            self.in_flight -= 1
+            self._wake_waiter()
+
+    def _wake_waiter(self):
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                break
+
+    def shutdown(self, wait=True):
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait, cancel_futures=True)
+            self._executor = None
+
+
+pool = WorkerPool()
+
+
+async def run_in_pool(fn, *args, wait=False):
+    """Run a tasks.py function in the shared worker pool (wait: queue for room instead of 503)"""
+    return await pool.run(fn, *args, wait=wait)